@@ -0,0 +1,152 @@
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Protocol
+
+
+class LRUCache:
+    """
+    Size-bounded, thread-safe least-recently-used cache with hit/miss counters.
+    Values are shared between callers: treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable, default: any = None) -> any:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            return self.entries[key]
+
+    def set(self, key: Hashable, value: any) -> list[tuple[Hashable, any]]:
+        """Returns the (key, value) pairs evicted to make room."""
+        if self.maxsize <= 0:
+            return []
+
+        evicted = []
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                evicted.append(self.entries.popitem(last=False))
+
+        return evicted
+
+    def pop(self, key: Hashable) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def keys(self) -> list:
+        with self.lock:
+            return list(self.entries)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire `ttl` seconds after they were set."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: any = None) -> any:
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            return entry[1]
+
+    def set(self, key: Hashable, value: any, ttl: float | None = None) -> list[tuple[Hashable, any]]:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        return super().set(key, (expires_at, value))
+
+
+class CacheBackend(Protocol):
+    """Where the response cache keeps its entries and generations: MemoryBackend, or a shared one (e.g. redis)."""
+
+    id: str # names the generations: ETags issued against other counters never match
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def get_counter(self, key: str) -> int: ...
+
+    async def incr(self, key: str) -> int: ...
+
+    def info(self) -> dict[str, int | float]: ...
+
+
+class MemoryBackend:
+    """
+    In-process CacheBackend: every worker has its own entries and generations.
+    Counters are bounded too: an evicted one raises `floor`, where unknown counters start, so that no
+    counter ever goes back to a generation whose entries or ETags are out of date.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, counters: int = 10000) -> None:
+        self.id = uuid.uuid4().hex[:8] # per process: counters restart at 0
+        self.entries = TTLCache(maxsize, ttl)
+        self.counters = LRUCache(counters)
+        self.floor = 0
+
+    async def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.entries.set(key, value, ttl)
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, self.floor)
+
+    async def incr(self, key: str) -> int:
+        counter = self.counters.get(key, self.floor) + 1
+
+        for _, evicted in self.counters.set(key, counter):
+            self.floor = max(self.floor, evicted)
+
+        return counter
+
+    def info(self) -> dict[str, int | float]:
+        return {"size": len(self.entries), "maxsize": self.entries.maxsize, "counters": len(self.counters)}
@@ -0,0 +1,60 @@
+import os
+
+from functools import cache
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.metrics import listeners, services as metrics
+
+
+def get_env_int(name: str, default: int | None = None) -> int | None:
+    value = os.environ.get(name)
+
+    if value is None or value == "":
+        return default
+
+    return int(value)
+
+
+@cache
+def get_client_options() -> dict:
+    options = {
+        "maxPoolSize": get_env_int("DB_MAX_POOL_SIZE", 100),
+        "minPoolSize": get_env_int("DB_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": get_env_int("DB_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": get_env_int("DB_WAIT_QUEUE_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": get_env_int("DB_SERVER_SELECTION_TIMEOUT_MS", 3000),
+    }
+
+    if metrics.get_metrics_enabled():
+        options["event_listeners"] = [listeners.CommandTimer()]
+
+    return {key: val for key, val in options.items() if val is not None}
+
+
+class ClientRegistry:
+    """
+    Keeps one pooled AsyncIOMotorClient per connection string for the whole process.
+    The app opens it at startup and closes it at shutdown (see app.main.lifespan).
+    """
+
+    def __init__(self) -> None:
+        self.clients: dict[str, AsyncIOMotorClient] = {}
+
+    def get(self, conn_str: str) -> AsyncIOMotorClient:
+        client = self.clients.get(conn_str)
+
+        if client is None:
+            client = AsyncIOMotorClient(conn_str, **get_client_options())
+            self.clients[conn_str] = client
+
+        return client
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+        self.clients.clear()
+
+
+registry = ClientRegistry()
@@ -0,0 +1,64 @@
+import os
+
+from functools import cache
+
+from fastapi.datastructures import Headers
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from app.core import tokens
+from app.core.caches import LRUCache
+from app.storage import engines, memory
+
+
+COLLECTIONS_PER_CONTEXT: int = 256 # resource names come from the path: bounded
+
+
+class TokenContext:
+    """A validated token with its database handle and the collection handles built from it."""
+
+    def __init__(self, token: str, client: AsyncIOMotorClient) -> None:
+        self.token = token
+        self.client = client
+        self.in_memory = engines.is_in_memory(token)
+        self.database = None if self.in_memory else client[token]
+        self.collections: dict[str, AsyncIOMotorCollection] = {}
+
+    @property
+    def db(self) -> AsyncIOMotorDatabase:
+        # dropping an in-memory database or collection drops the object: never hold on to one
+        if self.in_memory:
+            return memory.client[self.token]
+
+        return self.database
+
+    def collection(self, name: str) -> AsyncIOMotorCollection:
+        if self.in_memory:
+            return self.db[name]
+
+        if (collection := self.collections.get(name)) is None:
+            if len(self.collections) >= COLLECTIONS_PER_CONTEXT:
+                self.collections.clear()
+
+            collection = self.collections[name] = self.database[name]
+
+        return collection
+
+
+@cache
+def get_contexts_cache() -> LRUCache:
+    return LRUCache(int(os.environ.get("TOKEN_CONTEXTS_CACHE_SIZE", 1024)))
+
+
+def get(headers: Headers, client: AsyncIOMotorClient) -> TokenContext:
+    # only validated tokens are cached: a hit skips the validation and the handles
+    token = tokens.find(headers)
+    contexts = get_contexts_cache()
+    context = contexts.get(token) if token is not None else None
+
+    if context is not None and context.client is client:
+        return context
+
+    tokens.validate(token, raise_if_invalid=True)
+    context = TokenContext(token, client)
+    contexts.set(token, context)
+    return context
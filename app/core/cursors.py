@@ -0,0 +1,82 @@
+import base64
+import binascii
+
+from bson import json_util
+
+from app.core import exceptions
+from app.core.validators import validate_field_name
+
+
+def get_field_value(document: dict, key: str) -> any:
+    value = document
+
+    for path in key.split("."):
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(path)
+
+    return value
+
+
+class Cursor:
+    """
+    Keyset pagination position: the sort key being walked and the (key, _id) of the last
+    document served. Encoded as an opaque url-safe token for the `__cursor` query parameter.
+    """
+
+    def __init__(self, key: str = "_id", value: any = None, id: any = None) -> None:
+        self.key = validate_field_name(key)
+        self.value = value
+        self.id = id
+
+    @property
+    def started(self) -> bool:
+        return self.id is not None
+
+    @classmethod
+    def decode(cls, token: str, key: str = "_id") -> "Cursor":
+        if not token:
+            return cls(key)
+
+        try:
+            padding = "=" * (-len(token) % 4)
+            payload = json_util.loads(base64.urlsafe_b64decode(token + padding))
+
+            # well-formed but not ours: [key, value, id]
+            if not isinstance(payload, list) or len(payload) != 3 or not isinstance(payload[0], str):
+                raise ValueError(payload)
+
+            return cls(*payload)
+        except (binascii.Error, ValueError, TypeError, AttributeError):
+            raise exceptions.BadRequest(f"Invalid cursor: '{token}'")
+
+    def encode(self) -> str:
+        data = json_util.dumps([self.key, self.value, self.id])
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def next(self, document: dict) -> "Cursor":
+        return Cursor(self.key, get_field_value(document, self.key), document["_id"])
+
+    def sort(self) -> list[tuple[str, int]]:
+        if self.key == "_id":
+            return [("_id", 1)]
+
+        return [(self.key, 1), ("_id", 1)]
+
+    def query(self, query: dict) -> dict:
+        if not self.started:
+            return query
+
+        if self.key == "_id":
+            after = {"_id": {"$gt": self.id}}
+        elif self.value is None:
+            # null/missing values sort first: next come every non-null value
+            after = {"$or": [{self.key: {"$ne": None}}, {self.key: None, "_id": {"$gt": self.id}}]}
+        else:
+            after = {"$or": [{self.key: {"$gt": self.value}}, {self.key: self.value, "_id": {"$gt": self.id}}]}
+
+        if not query:
+            return after
+
+        return {"$and": [query, after]}
@@ -6,13 +6,14 @@ from urllib.parse import quote_plus
 from fastapi import Depends, Path, Request
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
 
-from app.core import tokens
+from app.core import clients, contexts
+from app.core.contexts import TokenContext
 
 
 @cache
 def get_mongodb_connection_str() -> str:
-    username: str | None = quote_plus(os.environ.get("DB_USER", None))
-    password: str | None = quote_plus(os.environ.get("DB_PASS", None))
+    username: str | None = quote_plus(os.environ.get("DB_USER", ""))
+    password: str | None = quote_plus(os.environ.get("DB_PASS", ""))
     host: str = os.environ.get("DB_HOST", "localhost")
     port: str = os.environ.get("DB_PORT", "27017")
 
@@ -23,18 +24,21 @@ def get_mongodb_connection_str() -> str:
 
 
 def get_client(conn_str: str = Depends(get_mongodb_connection_str)) -> AsyncIOMotorClient:
-    # set a 3-second connection timeout
-    return AsyncIOMotorClient(conn_str, serverSelectionTimeoutMS=3000)
+    # shared, pooled client (see app.core.clients); never build one per request
+    return clients.registry.get(conn_str)
 
 
-def get_db(request: Request, client: AsyncIOMotorClient = Depends(get_client)) -> AsyncIOMotorDatabase:
-    db_name = tokens.extract(request.headers)
-    return client[db_name]
+def get_context(request: Request, client: AsyncIOMotorClient = Depends(get_client)) -> TokenContext:
+    return contexts.get(request.headers, client)
 
 
-def get_collection(resource: str, db: AsyncIOMotorDatabase = Depends(get_db)) -> AsyncIOMotorCollection:
-    return db[resource]
+def get_db(context: TokenContext = Depends(get_context)) -> AsyncIOMotorDatabase:
+    return context.db
 
 
-def get_collection_version(resource: str, version: int = Path(ge=0), db: AsyncIOMotorDatabase = Depends(get_db)) -> AsyncIOMotorCollection:
-    return get_collection(f"@v{version}-{resource}", db)
+def get_collection(resource: str, context: TokenContext = Depends(get_context)) -> AsyncIOMotorCollection:
+    return context.collection(resource)
+
+
+def get_collection_version(resource: str, version: int = Path(ge=0), context: TokenContext = Depends(get_context)) -> AsyncIOMotorCollection:
+    return get_collection(f"@v{version}-{resource}", context)
@@ -19,6 +19,11 @@ class NotFound(exceptions.HTTPException):
         super().__init__(status.HTTP_404_NOT_FOUND, detail, headers)
 
 
+class TooManyRequests(exceptions.HTTPException):
+    def __init__(self, detail: any = "Too Many Requests", headers: Headers = None) -> None:
+        super().__init__(status.HTTP_429_TOO_MANY_REQUESTS, detail, headers)
+
+
 class Unauthorized(exceptions.HTTPException):
     def __init__(self, detail: any = "Unauthorized", headers: Headers = None) -> None:
         super().__init__(status.HTTP_401_UNAUTHORIZED, detail, headers)
@@ -0,0 +1,37 @@
+def is_same_path(field: str, key: str) -> bool:
+    return field == key or field.startswith(f"{key}.") or key.startswith(f"{field}.")
+
+
+def widen(projection: dict, keys: list[str]) -> tuple[dict, list[str]]:
+    """
+    Returns the projection extended so that `keys` come back from mongod,
+    along with the fields to strip afterwards (the ones the caller didn't ask for).
+    """
+    projection = dict(projection)
+    hidden = []
+    including = any(val for key, val in projection.items() if key != "_id")
+
+    for key in keys:
+        excluded = [field for field, val in projection.items() if not val and is_same_path(field, key)]
+
+        for field in excluded:
+            projection.pop(field)
+            hidden.append(field)
+
+        if including and not any(val and is_same_path(field, key) for field, val in projection.items()):
+            projection[key] = 1
+            hidden.append(key)
+
+    return projection, hidden
+
+
+def pop_field(document: dict, key: str) -> None:
+    *paths, last = key.split(".")
+
+    for path in paths:
+        document = document.get(path)
+
+        if not isinstance(document, dict):
+            return
+
+    document.pop(last, None)
@@ -0,0 +1,61 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+
+from bson import Binary, Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.metrics.services import timed
+
+try:
+    import orjson
+except ImportError: # stdlib json fallback
+    orjson = None
+
+
+def default(obj: any) -> any:
+    """Encodes the BSON (and pydantic) types that the JSON encoders don't know about."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+
+    if isinstance(obj, (Binary, bytes)):
+        return base64.b64encode(obj).decode()
+
+    if isinstance(obj, BaseModel):
+        # shallow, by alias: nested models and documents come back through here
+        return {field.alias or name: getattr(obj, name) for name, field in type(obj).model_fields.items()}
+
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    return json.dumps(content, default=default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Serializes motor documents (and pydantic models) straight to bytes, with orjson when installed.
+    Return it from the route itself: FastAPI runs any other return value through jsonable_encoder first.
+    """
+
+    def render(self, content: any) -> bytes:
+        with timed("encode"):
+            return dumps(content)
@@ -1,7 +1,13 @@
 import humps
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+from app.core import exceptions
+from app.core.cursors import Cursor
+from app.core.validators import validate_field_name
+
 
 class CamelModel(BaseModel):
     model_config = {
@@ -10,19 +16,88 @@ class CamelModel(BaseModel):
     }
 
 
+CountMode = Literal['exact', 'estimated', 'none']
+
+
 class PageRequest(CamelModel):
     offset: int = Field(default=0, alias='__offset')
     limit: int = Field(default=30,  alias='__limit')
+    cursor: str | None = Field(default=None, alias='__cursor')
+    after: str | None = Field(default=None, alias='__after')
+    key: str = Field(default='_id', alias='__key')
+    count: CountMode = Field(default='exact', alias='__count')
+    sort: str | None = Field(default=None, alias='__sort')
+
+    @property
+    def keyset(self) -> bool:
+        return self.cursor is not None or self.after is not None
+
+    def get_cursor(self) -> Cursor:
+        if self.sort:
+            raise exceptions.BadRequest("__sort can't be combined with __cursor: walk by __key instead")
+
+        return Cursor.decode(self.cursor or self.after, self.key)
+
+    def get_sort(self) -> list[tuple[str, int]]:
+        if not self.sort:
+            return []
+
+        sort = []
+
+        for field in self.sort.split(","):
+            field = field.strip()
+            order = -1 if field.startswith("-") else 1
+            sort.append((validate_field_name(field.lstrip("+-")), order))
+
+        return sort
+
+
+class ProjectionRequest(CamelModel):
+    include: str | None = Field(default=None, alias='__fields')
+    exclude: str | None = Field(default=None, alias='__exclude')
+
+    def get_projection(self) -> dict[str, int]:
+        if self.include and self.exclude:
+            raise exceptions.BadRequest("__fields and __exclude can't be combined")
+
+        if self.include:
+            projection = {validate_field_name(field.strip()): 1 for field in self.include.split(",")}
+            return {"_id": 0} | projection
+
+        if self.exclude:
+            projection = {validate_field_name(field.strip()): 0 for field in self.exclude.split(",")}
+            return {"_id": 0} | projection
+
+        return {"_id": 0}
+
+
+class ExportRequest(CamelModel):
+    batch_size: int = Field(default=1000, ge=1, alias='__batch_size')
+
+
+class IngestRequest(CamelModel):
+    stream: bool = Field(default=False, alias='__stream')
+    batch_size: int = Field(default=1000, ge=1, alias='__batch_size')
+    concurrency: int = Field(default=4, ge=1, le=64, alias='__concurrency')
+
+
+class IngestResponse(CamelModel):
+    inserted: int = 0
+    failed: int = 0
+    batches: int = 0
 
 
 class PaginatedMetadataResponse(CamelModel):
     length: int = 0
     count: int = 0
-    total_count: int = 0
+    total_count: int | None = 0
+    count_mode: CountMode = 'exact'
     previous_offset: int | None = 0
     current_offset: int = 0
     next_offset: int | None = 0
     limit: int = 0
+    next_cursor: str | None = None
+    warnings: list[str] | None = None
 
 
 class PaginatedResponse(CamelModel):
@@ -30,7 +105,22 @@ class PaginatedResponse(CamelModel):
     metadata: PaginatedMetadataResponse
 
     @classmethod
-    def render(cls, page: PageRequest, data, total_count) -> None:
+    def render(cls, page: PageRequest, data, total_count, next_cursor: Cursor | None = None, warnings: list[str] | None = None) -> None:
+        if page.keyset:
+            metadata = PaginatedMetadataResponse(
+                length=len(data),
+                count=len(data),
+                total_count=total_count,
+                count_mode=page.count,
+                previous_offset=None,
+                next_offset=None,
+                limit=page.limit,
+                next_cursor=next_cursor.encode() if next_cursor else None,
+                warnings=warnings or None
+            )
+
+            return PaginatedResponse(data=data, metadata=metadata)
+
         previous_offset = page.offset - page.limit
         if previous_offset < 0:
             previous_offset = None
@@ -38,12 +128,18 @@ class PaginatedResponse(CamelModel):
         metadata = PaginatedMetadataResponse(
             length=len(data),
             total_count=total_count,
+            count_mode=page.count,
             previous_offset=previous_offset,
             current_offset=page.offset,
-            limit=page.limit
+            limit=page.limit,
+            warnings=warnings or None
         )
-        
-        if page.offset <= total_count:
+
+        if page.count != 'exact':
+            # totalCount is missing or approximate: a full page is the only hint of a next one
+            metadata.count = page.offset + metadata.length
+            metadata.next_offset = metadata.count if metadata.length == page.limit else None
+        elif page.offset <= total_count:
             metadata.count=page.offset + metadata.length
             metadata.next_offset=metadata.count if metadata.count < total_count else None
         else:
@@ -0,0 +1,128 @@
+import codecs
+import json
+
+from typing import AsyncIterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core import exceptions
+from app.core.responses import dumps
+
+
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+
+
+def accepts_ndjson(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return NDJSON_MEDIA_TYPE in accept or "application/jsonl" in accept
+
+
+def sends_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "")
+    return content_type.startswith((NDJSON_MEDIA_TYPE, "application/jsonl"))
+
+
+async def ndjson(documents: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for document in documents:
+        yield dumps(document) + b"\n"
+
+
+async def json_array(documents: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    separator = b"["
+
+    async for document in documents:
+        yield separator + dumps(document)
+        separator = b","
+
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def response(request: Request, documents: AsyncIterator[dict]) -> StreamingResponse:
+    # NDJSON unless the client explicitly asks for (and only for) a JSON array
+    if accepts_ndjson(request) or "application/json" not in request.headers.get("accept", ""):
+        return StreamingResponse(ndjson(documents), media_type=NDJSON_MEDIA_TYPE)
+
+    return StreamingResponse(json_array(documents), media_type="application/json")
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[any]:
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            line_number += 1
+
+            if line.strip():
+                yield decode(line, line_number)
+
+    if buffer.strip():
+        yield decode(buffer, line_number + 1)
+
+
+async def parse_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[any]:
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = finished = ended = False
+    position = 0
+    chunks = aiter(chunks)
+
+    while not finished:
+        # a value is only complete once something follows it (think of a number cut between chunks)
+        try:
+            buffer += utf8.decode(await anext(chunks))
+        except StopAsyncIteration:
+            buffer += utf8.decode(b"", final=True)
+            ended = True
+
+        index = 0
+
+        while True:
+            while index < len(buffer) and (buffer[index].isspace() or (started and buffer[index] == ",")):
+                index += 1
+
+            if index == len(buffer):
+                break
+
+            if not started:
+                if buffer[index] != "[":
+                    raise exceptions.BadRequest("Invalid JSON: expected an array")
+
+                started = True
+                index += 1
+                continue
+
+            if buffer[index] == "]":
+                finished = True
+                break
+
+            try:
+                value, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                if ended:
+                    raise exceptions.BadRequest(f"Invalid JSON: element {position}")
+                break
+
+            if end == len(buffer) and not ended:
+                break
+
+            yield value
+            position += 1
+            index = end
+
+        buffer = buffer[index:]
+
+        if ended and not finished:
+            raise exceptions.BadRequest("Invalid JSON: unterminated array")
+
+
+def decode(line: bytes, line_number: int) -> any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        raise exceptions.BadRequest(f"Invalid JSON: line {line_number}")
@@ -9,38 +9,34 @@ from app.core import exceptions
 
 TOKEN_CHARACTERS: str = string.ascii_letters + string.digits
 TOKEN_RE_PATTERN: str = r"^\w*$"
+TOKEN_RE: re.Pattern = re.compile(TOKEN_RE_PATTERN)
 TOKEN_MIN_LENGTH: int = 24 # Forbids the access to system dbs (admin, local, config) and protects against brute-force
 TOKEN_MAX_LENGTH: int = 63 # https://www.mongodb.com/docs/manual/reference/limits/#mongodb-limit-Length-of-Database-Names
 
 
-def extract(headers: Headers):
-    token = None
-    
-    if "authorization" in headers:
-        authorization = headers["authorization"]
-        
+def find(headers: Headers) -> str | None:
+    # where the token is, not whether it is valid: see extract
+    if (authorization := headers.get("authorization")) is not None:
         if authorization.startswith("Bearer "):
-            token = authorization[7:]
+            return authorization[7:]
 
-        elif authorization.startswith("Token "):
-            token = authorization[6:]
-    
-    elif "x-token" in headers:
-        token = headers["x-token"]
+        if authorization.startswith("Token "):
+            return authorization[6:]
 
-    elif "x-app-id" in headers:
-        token = headers["x-app-id"]
+        return None
 
-    elif "x-api-key" in headers:
-        token = headers["x-api-key"]
+    for name in ("x-token", "x-app-id", "x-api-key"):
+        if (token := headers.get(name)) is not None:
+            return token
 
-    elif "host" in headers:
-        host = headers["host"]
-        
-        if "." in host:
-            stop = host.index(".")
-            token = host[:stop]
+    if (host := headers.get("host")) is not None and "." in host:
+        return host[:host.index(".")]
 
+    return None
+
+
+def extract(headers: Headers):
+    token = find(headers)
     validate(token, raise_if_invalid=True)
 
     return token
@@ -60,7 +56,7 @@ def validate(token: str, raise_if_invalid: bool = True) -> bool:
         if not raise_if_invalid: return False
         raise exceptions.Unauthorized(f"Invalid Token: maximum length is {TOKEN_MAX_LENGTH} characters")
 
-    if not re.match(TOKEN_RE_PATTERN, token):
+    if not TOKEN_RE.match(token):
         if not raise_if_invalid: return False
         raise exceptions.Unauthorized("Invalid Token: only alphanumeric characters are allowed")
 
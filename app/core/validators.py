@@ -13,3 +13,10 @@ def validate_resource_name(path_index: int) -> typing.Callable[[Request,], None]
             raise exceptions.Forbidden(f"Invalid resource name: {resource}. Please favor strict alphanumeric characters.")  
     
     return wrapper
+
+
+def validate_field_name(name: str) -> str:
+    if not name or name.startswith(('$', '.', '__')) or name.endswith('.') or '..' in name:
+        raise exceptions.BadRequest(f"Invalid field name: '{name}'")
+
+    return name
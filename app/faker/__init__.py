@@ -1,5 +1,8 @@
+from . import engine, pools
 from .routers import router
 
 __all__ = [
+    "engine",
+    "pools",
     "router"
 ]
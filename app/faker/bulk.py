@@ -0,0 +1,77 @@
+import random
+import sys
+
+from typing import Callable
+
+from humps import decamelize as snakelize
+
+try:
+    import numpy
+except ImportError: # pure python fallback
+    numpy = None
+
+
+BULK_MIN_COUNT: int = 32 # smaller @each counts aren't worth a column
+FLOAT_DIGITS: int = sys.float_info.dig # 15: pyfloat() splits them between the integer and the fractional part
+FLOAT_POWERS: list[int] = [10 ** digits for digits in range(1, FLOAT_DIGITS + 1)]
+
+
+# Same distributions as the FakerService properties (faker's pyint(), pybool() and pyfloat() defaults),
+# drawn from the faker instance's own random.Random: seeded records stay reproducible.
+
+def ints(rng: random.Random, count: int) -> list[int]:
+    if numpy is not None:
+        return numpy.random.default_rng(rng.getrandbits(64)).integers(0, 10_000, count).tolist()
+
+    return rng.choices(range(10_000), k=count)
+
+
+def bools(rng: random.Random, count: int) -> list[bool]:
+    if numpy is not None:
+        return (numpy.random.default_rng(rng.getrandbits(64)).integers(1, 101, count) <= 50).tolist()
+
+    return rng.choices((True, False), k=count)
+
+
+def floats(rng: random.Random, count: int) -> list[float]:
+    # pyfloat(): 1 to 14 fractional digits, the rest of the 15 for the integer part, random sign,
+    # and the fractional number is written as is after the dot (3 for 3 digits reads .3, not .003)
+    if numpy is not None:
+        generator = numpy.random.default_rng(rng.getrandbits(64))
+        right_digits = generator.integers(1, FLOAT_DIGITS, count)
+        left = numpy.floor(generator.random(count) * 10.0 ** (FLOAT_DIGITS - right_digits))
+        right = numpy.floor(generator.random(count) * 10.0 ** right_digits)
+        written = numpy.searchsorted(numpy.array(FLOAT_POWERS, dtype=numpy.float64), right, side='right') + 1
+        sign = numpy.where(generator.integers(0, 2, count) == 1, 1.0, -1.0)
+        return (sign * (left + right / 10.0 ** written)).tolist()
+
+    randrange = rng.randrange
+    signs = rng.choices("+-", k=count)
+    faked = []
+
+    for sign in signs:
+        right_digits = randrange(1, FLOAT_DIGITS)
+        faked.append(float(f"{sign}{randrange(10 ** (FLOAT_DIGITS - right_digits))}.{randrange(10 ** right_digits)}"))
+
+    return faked
+
+
+def numbers(rng: random.Random, count: int) -> list[int | float]:
+    # the number property: an int or a float, heads or tails
+    heads, integers, decimals = bools(rng, count), iter(ints(rng, count)), iter(floats(rng, count))
+    return [next(integers) if head else next(decimals) for head in heads]
+
+
+PROVIDERS: dict[str, Callable[[random.Random, int], list]] = {
+    'int': ints, 'integer': ints, 'pyint': ints,
+    'bool': bools, 'boolean': bools, 'pybool': bools,
+    'float': floats, 'pyfloat': floats,
+    'number': numbers,
+}
+
+
+def get_provider(schema: any) -> Callable[[random.Random, int], list] | None:
+    if not isinstance(schema, str) or not schema.startswith('@'):
+        return None
+
+    return PROVIDERS.get(snakelize(schema)[1:])
@@ -0,0 +1,233 @@
+import functools
+import hashlib
+import itertools
+import json
+import operator
+import os
+
+from functools import cache
+from typing import Any, Callable
+
+from humps import decamelize as snakelize
+
+from app.core import exceptions
+from app.core.caches import LRUCache
+from app.faker import bulk
+
+
+Plan = Callable[[Any], Any] # takes a FakerService, returns the faked value
+
+FORBIDDEN_PROVIDERS: set[str] = {
+    "seed", "seed_instance", "seed_locale", "add_provider", "get_providers", "provider", "parse", "format",
+    "get_formatter", "set_formatter", "get_arguments", "set_arguments", "del_arguments", "items",
+}
+
+OPERATORS: dict[str, Callable] = {
+    '+': operator.add, 'add': operator.add,
+    '-': operator.sub, 'sub': operator.sub, 'subtract': operator.sub,
+    'x': operator.mul, '*': operator.mul, 'mul': operator.mul, 'multiply': operator.mul,
+    '/': operator.truediv, 'div': operator.truediv, 'divide': operator.truediv,
+    '%': operator.mod, 'mod': operator.mod, 'modulus': operator.mod,
+}
+
+
+@cache
+def get_plans_cache() -> LRUCache:
+    return LRUCache(maxsize=int(os.environ.get("FAKER_PLANS_CACHE_SIZE", 256)))
+
+
+def get_schema_hash(schema: any) -> str:
+    # key order is part of the schema (it is the order of the faked keys): don't sort
+    data = json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def get_plan(schema: any, service: any) -> Plan:
+    # providers are checked against the locale of `service`: a plan only holds for that locale
+    plans = get_plans_cache()
+    key = (service.locale, get_schema_hash(schema))
+    plan = plans.get(key)
+
+    if plan is None:
+        plan = compile_schema(schema, service)
+        plans.set(key, plan)
+
+    return plan
+
+
+def get_each(schema: any) -> dict | None:
+    """Returns the top-level, not embeded, @each of a schema: the records it lists can be faked one by one."""
+    if not isinstance(schema, dict) or not isinstance(schema.get('@each'), dict):
+        return None
+
+    each = schema['@each']
+
+    if each.get('embeded', False) or not isinstance(each.get('count', 1), int):
+        return None
+
+    return each
+
+
+def compile_schema(schema: any, service: any) -> Plan:
+    """
+    Checks a faker schema once and turns it into a tree of pre-bound generator callables.
+    `service` is only used to check the providers: plans run against any FakerService.
+    """
+    if isinstance(schema, str) and schema.startswith('@'):
+        return compile_template(schema, service)
+
+    if isinstance(schema, list):
+        return compile_list(schema, service)
+
+    if isinstance(schema, dict) and '@each' in schema:
+        return compile_each(schema['@each'], service)
+
+    if isinstance(schema, dict):
+        return compile_dict(schema, service)
+
+    return lambda _: schema
+
+
+def compile_template(schema: str, service: any) -> Plan:
+    name, *paths = snakelize(schema)[1:].split('.')
+
+    if isinstance(getattr(type(service), name, None), property):
+        generate = getattr(type(service), name).fget
+    elif name.startswith('_') or name in FORBIDDEN_PROVIDERS or not callable(getattr(service.faker, name, None)):
+        raise exceptions.BadRequest(f"Invalid faker: '{schema}'")
+    else:
+        call = operator.methodcaller(name)
+        generate = lambda service: call(service.faker)
+
+    if not paths:
+        return generate
+
+    def generate_path(service) -> any:
+        value = generate(service)
+
+        for path in paths:
+            value = value.get(path)
+
+        return value
+
+    return generate_path
+
+
+def compile_list(schema: list, service: any) -> Plan:
+    elements = [compile_schema(element, service) for element in schema]
+
+    def generate(service) -> list:
+        faked = []
+
+        for element in elements:
+            value = element(service)
+
+            if isinstance(value, list):
+                faked.extend(value)
+            else:
+                faked.append(value)
+
+        return faked
+
+    return generate
+
+
+def compile_dict(schema: dict, service: any) -> Plan:
+    items = [(compile_schema(key, service), compile_schema(val, service)) for key, val in schema.items()]
+    return lambda service: {key(service): val(service) for key, val in items}
+
+
+def compile_each(each: dict, service: any) -> Plan:
+    schema = each.get('schema', {})
+    count = each.get('count', 1)
+
+    if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+        raise exceptions.BadRequest(f"Invalid @each count: {count!r}")
+
+    element = compile_schema(schema, service)
+    records = compile_bulk(schema, service) if count >= bulk.BULK_MIN_COUNT else None
+
+    if records is None:
+        records = lambda service, count: [element(service) for _ in range(count)]
+
+    if not each.get('embeded', False):
+        return lambda service: records(service, count)
+
+    embed = get_embed(schema, each)
+    return lambda service: embed(records(service, count))
+
+
+def compile_bulk(schema: any, service: any) -> Callable[[Any, int], list] | None:
+    """
+    Fakes many records at once when they ask for numeric or boolean values: a numeric template,
+    or a flat dict with numeric templates among its values (drawn as columns, the other values one by one).
+    """
+    provider = bulk.get_provider(schema)
+
+    if provider is not None:
+        return lambda service, count: provider(service.faker.random, count)
+
+    if not isinstance(schema, dict) or '@each' in schema:
+        return None
+
+    if any(not isinstance(key, str) or key.startswith('@') for key in schema):
+        return None
+
+    columns = {key: bulk.get_provider(val) for key, val in schema.items()}
+
+    if not any(columns.values()):
+        return None
+
+    plans = {key: compile_schema(val, service) for key, val in schema.items() if columns[key] is None}
+
+    def generate(service, count: int) -> list[dict]:
+        records = [{} for _ in range(count)]
+
+        for key, provider in columns.items():
+            if provider is not None:
+                for record, value in zip(records, provider(service.faker.random, count)):
+                    record[key] = value
+            else:
+                plan = plans[key]
+
+                for record in records:
+                    record[key] = plan(service)
+
+        return records
+
+    return generate
+
+
+def get_embed(schema: any, each: dict) -> Callable[[list], Any]:
+    if isinstance(schema, list):
+        return lambda faked: list(itertools.chain(*faked))
+
+    if isinstance(schema, dict):
+        return merge
+
+    return functools.partial(aggregate, separator=each.get('separator', ', '), operator_=each.get('operator', '+'))
+
+
+def merge(faked: list[dict]) -> dict:
+    output = {}
+
+    for element in faked:
+        output |= element
+
+    return output
+
+
+def aggregate(faked: list, separator: str = ', ', operator_: str = '+') -> any:
+    if not len(faked):
+        return faked
+
+    if isinstance(faked[0], str):
+        return separator.join(faked)
+
+    if isinstance(faked[0], (int, float)) and operator_ in OPERATORS:
+        if OPERATORS[operator_] is operator.truediv and 0 in faked:
+            return "error: division by zero"
+
+        return functools.reduce(OPERATORS[operator_], faked)
+
+    return faked
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import os
+import random
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from typing import AsyncIterator
+
+from app.faker import compiler
+from app.faker.services import FakerService
+from app.metrics.services import timed
+
+
+@cache
+def get_faker_workers() -> int:
+    return int(os.environ.get("FAKER_WORKERS", os.cpu_count() or 1))
+
+
+@cache
+def get_faker_chunk_size() -> int:
+    return int(os.environ.get("FAKER_CHUNK_SIZE", 10_000))
+
+
+@cache
+def get_faker_parallel_threshold() -> int:
+    return int(os.environ.get("FAKER_PARALLEL_THRESHOLD", 50_000))
+
+
+@cache
+def get_worker_service(locale: str) -> FakerService:
+    # one FakerService per locale and worker process, reseeded for every record
+    return FakerService(locale)
+
+
+def generate_chunk(schema: any, locale: str, seed: int, start: int, count: int) -> list:
+    return get_worker_service(locale).fake_records(schema, seed, start, count)
+
+
+def get_each(schema: any, threshold: int | None = None) -> dict | None:
+    """Returns the top-level @each of a schema worth generating in parallel (count >= threshold), if any."""
+    each = compiler.get_each(schema)
+    threshold = get_faker_parallel_threshold() if threshold is None else threshold
+
+    if each is None or each.get('count', 1) < threshold:
+        return None
+
+    return each
+
+
+class GenerationEngine:
+    """
+    Generates large @each counts in chunks across a process pool, off the event loop.
+    Record i only depends on (seed, i): the same seed gives the same records, whatever the chunk size or workers.
+    """
+
+    def __init__(self, workers: int = 1, chunk_size: int = 10_000) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.executor: ProcessPoolExecutor | None = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # spawn: never fork a process that runs an event loop (and motor's threads)
+            context = multiprocessing.get_context("spawn")
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+        return self.executor
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def generate(self, schema: any, count: int, locale: str, seed: int | None = None, start: int = 0) -> AsyncIterator[list]:
+        """Yields the records start..start + count - 1 in chunks, in order, with at most two chunks per worker in flight."""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        pending = deque()
+        end = start + count
+
+        try:
+            for first in range(start, end, self.chunk_size):
+                size = min(self.chunk_size, end - first)
+                pending.append(loop.run_in_executor(executor, generate_chunk, schema, locale, seed, first, size))
+
+                if len(pending) >= 2 * self.workers:
+                    yield await self.wait(pending)
+
+            while pending:
+                yield await self.wait(pending)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def wait(self, pending: deque) -> list:
+        # the workers' time isn't ours to measure: this is how long the event loop waited for them
+        with timed("faker"):
+            return await pending.popleft()
+
+    async def records(self, schema: any, count: int, locale: str, seed: int | None = None, start: int = 0) -> AsyncIterator[any]:
+        async for chunk in self.generate(schema, count, locale, seed, start):
+            for record in chunk:
+                yield record
+
+
+engine = GenerationEngine(workers=get_faker_workers(), chunk_size=get_faker_chunk_size())
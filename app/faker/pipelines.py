@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+import time
+
+from typing import AsyncIterator
+
+from app.core import exceptions
+from app.faker.schemas import PipelineProgress
+from app.resources.repositories import ResourceRepository
+
+
+async def rebatch(chunks: AsyncIterator[list], size: int) -> AsyncIterator[list]:
+    batch = []
+
+    async for chunk in chunks:
+        for record in chunk:
+            batch.append(record)
+
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+async def batched(documents: AsyncIterator[any], size: int) -> AsyncIterator[list]:
+    batch = []
+
+    async for document in documents:
+        if not isinstance(document, dict):
+            raise exceptions.BadRequest(f"Invalid document: {document!r}")
+
+        batch.append(document)
+
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+class Pipeline:
+    """
+    Generated batches go through a bounded queue to `concurrency` insert_many writers.
+    When the writers fall behind the queue fills up and generation waits: memory stays at about queue_size batches.
+    """
+
+    def __init__(self, repository: ResourceRepository, concurrency: int = 4, queue_size: int = 8) -> None:
+        self.repository = repository
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.progress = PipelineProgress()
+        self.started = time.perf_counter()
+
+    def snapshot(self) -> PipelineProgress:
+        self.progress.elapsed = round(time.perf_counter() - self.started, 3)
+        self.progress.rate = round(self.progress.inserted / self.progress.elapsed, 1) if self.progress.elapsed else 0.0
+        return self.progress.model_copy()
+
+    async def produce(self, batches: AsyncIterator[list], queue: asyncio.Queue) -> None:
+        async with contextlib.aclosing(batches):
+            async for batch in batches:
+                await queue.put(batch)
+                self.progress.generated += len(batch)
+
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def write(self, queue: asyncio.Queue, written: asyncio.Queue) -> None:
+        while (batch := await queue.get()) is not None:
+            inserted = await self.repository.insert_batch(batch)
+
+            self.progress.inserted += inserted
+            self.progress.failed += len(batch) - inserted
+            self.progress.batches += 1
+            written.put_nowait(self.snapshot())
+
+    async def run(self, batches: AsyncIterator[list]) -> AsyncIterator[PipelineProgress]:
+        """Yields the progress after every written batch, then once more when done."""
+        self.started = time.perf_counter()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        written = asyncio.Queue()
+
+        async def supervise() -> None:
+            try:
+                # a failing writer (or generator) cancels the others
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(self.produce(batches, queue))
+
+                    for _ in range(self.concurrency):
+                        group.create_task(self.write(queue, written))
+            finally:
+                written.put_nowait(None)
+
+        supervisor = asyncio.create_task(supervise())
+
+        try:
+            while (progress := await written.get()) is not None:
+                yield progress
+
+            try:
+                await supervisor
+            except ExceptionGroup as group:
+                raise group.exceptions[0]
+
+            self.progress.done = True
+            yield self.snapshot()
+        finally:
+            supervisor.cancel()
+
+    async def summary(self, batches: AsyncIterator[list]) -> PipelineProgress:
+        progress = self.progress
+
+        async for progress in self.run(batches):
+            pass
+
+        return progress
@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+from contextlib import asynccontextmanager
+from functools import cache
+from typing import AsyncIterator
+
+from faker import Faker
+
+from app.core import exceptions
+
+
+DEFAULT_LOCALE: str = "en_US"
+
+
+@cache
+def get_faker_locales() -> tuple[str]:
+    locales = os.environ.get("FAKER_LOCALES", DEFAULT_LOCALE)
+    return tuple(locale.strip() for locale in locales.split(",") if locale.strip())
+
+
+@cache
+def get_faker_pool_size() -> int:
+    return int(os.environ.get("FAKER_POOL_SIZE", 4))
+
+
+class FakerPool:
+    """
+    Per-worker pool of ready Faker instances, keyed by locale.
+    Each instance has its own random generator and is checked out by one request at a time.
+    """
+
+    def __init__(self, size: int = 4) -> None:
+        self.size = size
+        self.queues: dict[str, asyncio.Queue[Faker]] = {}
+
+    def warm(self, locales: tuple[str]) -> None:
+        for locale in locales:
+            self.get_queue(locale)
+
+    def get_queue(self, locale: str) -> asyncio.Queue[Faker]:
+        locale = locale.replace("-", "_")
+        queue = self.queues.get(locale)
+
+        if queue is not None:
+            return queue
+
+        queue = asyncio.Queue(maxsize=self.size)
+
+        for _ in range(self.size):
+            try:
+                faker = Faker(locale=locale)
+            except AttributeError:
+                raise exceptions.BadRequest(f"Invalid faker locale: '{locale}'")
+
+            faker.seed_instance() # own random.Random instead of the one shared by every Faker
+            queue.put_nowait(faker)
+
+        self.queues[locale] = queue
+        return queue
+
+    @asynccontextmanager
+    async def checkout(self, locale: str = DEFAULT_LOCALE) -> AsyncIterator[Faker]:
+        queue = self.get_queue(locale)
+        faker = await queue.get()
+
+        try:
+            yield faker
+        finally:
+            queue.put_nowait(faker)
+
+    def clear(self) -> None:
+        self.queues.clear()
+
+
+pool = FakerPool(size=get_faker_pool_size())
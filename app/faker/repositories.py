@@ -0,0 +1,32 @@
+import json
+
+from fastapi import Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.results import DeleteResult
+
+from app.core.dependencies import get_db
+
+
+FAKER_COLLECTION: str = "@faker" # the schemas of the virtual resources, by resource name
+
+
+class SchemaRepository:
+    def __init__(self, db: AsyncIOMotorDatabase = Depends(get_db)) -> None:
+        self.collection = db[FAKER_COLLECTION]
+
+    async def get(self, resource: str) -> dict | None:
+        stored = await self.collection.find_one({"_id": resource})
+
+        if stored is None:
+            return None
+
+        # kept as JSON: key order matters, and template keys may hold dots
+        return stored | {"schema": json.loads(stored["schema"])}
+
+    async def save(self, resource: str, schema: any, locale: str, seed: int) -> None:
+        stored = {"schema": json.dumps(schema, ensure_ascii=False), "locale": locale, "seed": seed}
+        await self.collection.replace_one({"_id": resource}, stored, upsert=True)
+
+    async def delete(self, resource: str) -> bool:
+        result: DeleteResult = await self.collection.delete_one({"_id": resource})
+        return result.deleted_count > 0
@@ -1,22 +1,148 @@
+import asyncio
+import random
+
 from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
 
+from app.core import exceptions, streams
+from app.core.responses import FastJSONResponse
+from app.core.schemas import PageRequest, PaginatedResponse
 from app.core.validators import validate_resource_name
 from app.resources.repositories import ResourceRepository
-from app.faker.services import FakerService
+from app.faker import compiler, pipelines, pools
+from app.faker.engine import engine, get_each
+from app.faker.repositories import SchemaRepository
+from app.faker.schemas import PipelineRequest, SeedRequest, VirtualResourceResponse
+from app.faker.services import FakerService, get_faker_service
+from app.metrics.services import timed
+
 
+VIRTUAL_PAGE_LIMIT: int = 1000
 
-router = APIRouter(prefix="/@faker", tags=["faker"])
+router = APIRouter(prefix="/@faker", tags=["faker"], default_response_class=FastJSONResponse)
 
 
 @router.post("/", status_code=status.HTTP_200_OK)
-async def plan(request: Request, faker: FakerService = Depends()):
+async def plan(request: Request, options: SeedRequest = Depends(), faker: FakerService = Depends(get_faker_service)):
     json = await request.json()
-    return faker.fake(json)
+    each = get_each(json)
+
+    if each is None:
+        with timed("faker"):
+            faked = faker.fake(json, options.seed)
+
+        return FastJSONResponse(faked)
+
+    # large @each: generated in parallel chunks, streamed as they come
+    schema = each.get('schema', {})
+    compiler.get_plan(schema, faker)
+    records = engine.records(schema, each.get('count', 1), faker.locale, options.seed)
+
+    if streams.accepts_ndjson(request):
+        return StreamingResponse(streams.ndjson(records), media_type=streams.NDJSON_MEDIA_TYPE)
+
+    return StreamingResponse(streams.json_array(records), media_type="application/json")
 
 
 @router.post("/{resource}", status_code=status.HTTP_200_OK, dependencies=[Depends(validate_resource_name(path_index=2))])
-async def apply(request: Request, faker: FakerService = Depends(), repository: ResourceRepository = Depends()):
+async def apply(request: Request, options: PipelineRequest = Depends(), faker: FakerService = Depends(get_faker_service), repository: ResourceRepository = Depends()):
+    json = await request.json()
+    pipelined = options.pipeline or streams.accepts_ndjson(request)
+    each = get_each(json, threshold=0 if pipelined else None)
+
+    if each is None and pipelined:
+        raise exceptions.BadRequest("A pipelined load needs a top-level @each")
+
+    if each is None:
+        with timed("faker"):
+            faked = faker.fake(json, options.seed)
+
+        return FastJSONResponse(await repository.insert_one_or_many(faked))
+
+    # pipelined (or large) @each: parallel chunks, queued to concurrent writers, answered with the progress
+    schema = each.get('schema', {})
+    compiler.get_plan(schema, faker)
+    batches = pipelines.rebatch(engine.generate(schema, each.get('count', 1), faker.locale, options.seed), options.batch_size)
+    pipeline = pipelines.Pipeline(repository, options.concurrency, options.queue_size)
+
+    if streams.accepts_ndjson(request):
+        return StreamingResponse(streams.ndjson(pipeline.run(batches)), media_type=streams.NDJSON_MEDIA_TYPE)
+
+    return FastJSONResponse(await pipeline.summary(batches))
+
+
+def get_virtual(stored: dict) -> tuple[any, int | None]:
+    # a top-level @each lists `count` records, anything else is the template of endless ones
+    each = compiler.get_each(stored['schema'])
+
+    if each is None:
+        return stored['schema'], None
+
+    return each.get('schema', {}), each.get('count', 1)
+
+
+async def get_stored(resource: str, schemas: SchemaRepository = Depends()) -> dict:
+    stored = await schemas.get(resource)
+
+    if not stored:
+        raise exceptions.NotFound(f"No faker schema for: {resource}")
+
+    return stored
+
+
+async def fake_records(stored: dict, seed: int | None, start: int, count: int) -> list:
+    schema, _ = get_virtual(stored)
+
+    async with pools.pool.checkout(stored['locale']) as faker:
+        service = FakerService(faker)
+
+        with timed("faker"):
+            return await asyncio.to_thread(service.fake_records, schema, stored['seed'] if seed is None else seed, start, count)
+
+
+@router.put("/{resource}", status_code=status.HTTP_200_OK, dependencies=[Depends(validate_resource_name(path_index=2))])
+async def save(request: Request, resource: str, options: SeedRequest = Depends(), faker: FakerService = Depends(get_faker_service), schemas: SchemaRepository = Depends()) -> VirtualResourceResponse:
     json = await request.json()
-    faked = faker.fake(json)
-    
-    return await repository.insert_one_or_many(faked)
+    compiler.get_plan(json, faker)
+
+    seed = random.randrange(2 ** 32) if options.seed is None else options.seed
+    await schemas.save(resource, json, faker.locale, seed)
+
+    _, count = get_virtual({'schema': json})
+    return VirtualResourceResponse(resource=resource, locale=faker.locale, seed=seed, count=count)
+
+
+@router.get("/{resource}", dependencies=[Depends(validate_resource_name(path_index=2))])
+async def virtual_many(page: PageRequest = Depends(), options: SeedRequest = Depends(), stored: dict = Depends(get_stored)):
+    # never stored: every page is faked again from (seed, index)
+    if page.keyset or page.sort:
+        raise exceptions.BadRequest("Virtual resources are paged with __offset and __limit only")
+
+    if not 0 <= page.limit <= VIRTUAL_PAGE_LIMIT or page.offset < 0:
+        raise exceptions.BadRequest(f"Virtual resources are paged by at most {VIRTUAL_PAGE_LIMIT} records")
+
+    _, count = get_virtual(stored)
+    size = page.limit if count is None else max(0, min(page.limit, count - page.offset))
+    data = await fake_records(stored, options.seed, page.offset, size)
+
+    if count is None:
+        page = page.model_copy(update={'count': 'none'})
+
+    return FastJSONResponse(PaginatedResponse.render(page, data, count))
+
+
+@router.get("/{resource}/{index}", dependencies=[Depends(validate_resource_name(path_index=2))])
+async def virtual_one(index: int, options: SeedRequest = Depends(), stored: dict = Depends(get_stored)):
+    _, count = get_virtual(stored)
+
+    if index < 0 or (count is not None and index >= count):
+        raise exceptions.NotFound()
+
+    data = await fake_records(stored, options.seed, index, 1)
+    return FastJSONResponse(data[0])
+
+
+@router.delete("/{resource}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(validate_resource_name(path_index=2))])
+async def delete(resource: str, schemas: SchemaRepository = Depends()) -> None:
+    if not await schemas.delete(resource):
+        raise exceptions.NotFound()
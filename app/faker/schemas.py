@@ -0,0 +1,26 @@
+from pydantic import Field
+
+from app.core.schemas import CamelModel, IngestRequest, IngestResponse
+
+
+class SeedRequest(CamelModel):
+    seed: int | None = Field(default=None, ge=0, alias='__seed')
+
+
+class PipelineRequest(SeedRequest, IngestRequest):
+    pipeline: bool = Field(default=False, alias='__pipeline')
+    queue_size: int = Field(default=8, ge=1, le=256, alias='__queue_size')
+
+
+class PipelineProgress(IngestResponse):
+    generated: int = 0
+    elapsed: float = 0.0
+    rate: float = 0.0 # inserted documents per second
+    done: bool = False
+
+
+class VirtualResourceResponse(CamelModel):
+    resource: str
+    locale: str
+    seed: int
+    count: int | None = None # None: as many records as asked for
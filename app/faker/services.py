@@ -1,15 +1,19 @@
-import itertools
-import operator
-
-from humps import decamelize as snakelize
+import hashlib
 
 from faker import Faker
-from typing import Any, Union
+from fastapi import Query
+from typing import Any, AsyncIterator, Union
+
+from app.faker import compiler, pools
 
 
 class FakerService:
-    def __init__(self, locale = "en_US"):
-        self.faker = Faker(locale=locale)
+    def __init__(self, faker: Faker | str = "en_US"):
+        self.faker = faker if isinstance(faker, Faker) else Faker(locale=faker)
+
+    @property
+    def locale(self) -> str:
+        return self.faker.locales[0]
 
     @property
     def username(self) -> str:
@@ -42,88 +46,41 @@ class FakerService:
     def __getattr__(self, __name: str) -> Any:
         return getattr(self.faker, __name)()
 
-    def fake_list(self, schema: list) -> list:
-        elements = []
-
-        for element in schema:
-            faked_element = self.fake(element)
+    # quoted annotations: `int` is a property in here
+    def fake(self, schema: any, seed: 'int | None' = None) -> any:
+        plan = compiler.get_plan(schema, self)
 
-            if isinstance(faked_element, list):
-                for fe in faked_element:
-                    elements.append(fe)
-            else:
-                elements.append(faked_element)
+        if seed is None:
+            return plan(self)
 
-        return elements
+        # seeded: the records of a top-level @each are records 0..count - 1, anything else is record 0
+        each = compiler.get_each(schema)
 
-    def fake_dict(self, schema: dict) -> dict | list:
-        if '@each' not in schema:
-            return { self.fake(key): self.fake(val) for key, val in schema.items() }
+        if each is None:
+            return self.fake_records(schema, seed, 0, 1)[0]
 
-        each = schema.get('@each')
-            
-        schema = each.get('schema', {})
-        count = each.get('count', 1)
-        embeded = each.get('embeded', False)
+        return self.fake_records(each.get('schema', {}), seed, 0, each.get('count', 1))
 
-        faked = []
+    def fake_records(self, schema: any, seed: 'int', start: 'int', count: 'int') -> list:
+        """Record i only depends on (seed, i): any slice of a seeded dataset can be faked on its own."""
+        plan = compiler.get_plan(schema, self)
+        records = []
 
-        for _ in range(count):
-            faked.append(self.fake(schema))
+        try:
+            for index in range(start, start + count):
+                self.faker.seed_instance(get_record_seed(seed, index))
+                records.append(plan(self))
+        finally:
+            self.faker.seed_instance() # pooled instances go back unpredictable
 
-        if not embeded:
-            return faked
+        return records
 
-        if isinstance(schema, list):
-                return list(itertools.chain(*faked))
-        
-        if isinstance(schema, dict):
-            output = {}
 
-            for element in faked:
-                output |= element
-            
-            return output
+def get_record_seed(seed: int, index: int) -> int:
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
 
-        if not len(faked):
-            return faked
 
-        if isinstance(faked[0], str):
-            return each.get('separator', ', ').join(faked)
-    
-        if isinstance(faked[0], (int, float)):
-            match each.get('operator', '+'):
-                case '+' | 'add':
-                    return list(itertools.accumulate(faked, operator.add))[-1]
-                case '-' | 'sub' | 'subtract':
-                    return list(itertools.accumulate(faked, operator.sub))[-1]
-                case 'x' | '*' | 'mul' | 'multiply':
-                    return list(itertools.accumulate(faked, operator.mul))[-1]
-                case '/' | 'div' | 'divide':
-                    return list(itertools.accumulate(faked, operator.truediv))[-1] if 0 not in faked else "error: division by zero"
-                # case '**' | 'pow' | 'power':
-                #     return list(itertools.accumulate(faked, operator.pow))[-1]
-                case '%' | 'mod' | 'modulus':
-                    return list(itertools.accumulate(faked, operator.mod))[-1]
-        
-        return faked
-
-    def fake(self, schema: any) -> any:
-        if isinstance(schema, str) and schema.startswith('@'):
-            schema = snakelize(schema)
-            paths = schema[1:].split('.')
-
-            value = getattr(self, paths[0])
-
-            for path in paths[1:]:
-                value = value.get(path)
-
-            return value
-
-        if isinstance(schema, list):
-            return self.fake_list(schema)
-
-        if isinstance(schema, dict):
-            return self.fake_dict(schema)
-
-        return schema
+async def get_faker_service(locale: str = Query(default=pools.DEFAULT_LOCALE, alias="__locale")) -> AsyncIterator[FakerService]:
+    async with pools.pool.checkout(locale) as faker:
+        yield FakerService(faker)
@@ -1,3 +1,4 @@
+import os
 import inspect
 
 from functools import cache
@@ -5,8 +6,10 @@ from functools import cache
 from fastapi import Depends, Request, Path
 
 from app.core import exceptions, utils
+from app.core.caches import LRUCache
 from app.filters import models as filters
 from app.filters.exceptions import FilterError, FilterOperatorNotExistsError
+from app.metrics.services import timed
 
 
 @cache
@@ -34,6 +37,11 @@ def get_filters_registry() -> dict[str, filters.Filter]:
     return registry
 
 
+@cache
+def get_filters_cache() -> LRUCache:
+    return LRUCache(maxsize=int(os.environ.get("FILTERS_CACHE_SIZE", 1024)))
+
+
 def get_query_params_filters(request: Request) -> dict:
     return {key: val for key, val in request.query_params.items() if not key.startswith("__")}
 
@@ -50,7 +58,7 @@ def get_filter_key_and_operator(key: str, registry: dict[str, filters.Filter], r
     return (key, operator)
 
 
-def get_filters(query_params: dict[str, str] = Depends(get_query_params_filters), registry: dict[str, filters.Filter] = Depends(get_filters_registry)) -> dict:
+def build_filters(query_params: dict[str, str], registry: dict[str, filters.Filter]) -> dict:
     applied_filters = {}
     
     for entry in query_params.items():
@@ -64,7 +72,20 @@ def get_filters(query_params: dict[str, str] = Depends(get_query_params_filters)
         try:
             applied_filters |= filter_cls(key, value)()
         except ValueError as err:
-            raise FilterError(key=entry[0], value=entry[1], err=err)
+            raise FilterError(key=entry[0], value=entry[1], reason=err)
+
+    return applied_filters
+
+
+def get_filters(query_params: dict[str, str] = Depends(get_query_params_filters), registry: dict[str, filters.Filter] = Depends(get_filters_registry), plans: LRUCache = Depends(get_filters_cache)) -> dict:
+    # the same few query shapes come again and again: reuse their mongo filter (and compiled regexes)
+    with timed("filters"):
+        key = tuple(sorted(query_params.items()))
+        applied_filters = plans.get(key)
+
+        if applied_filters is None:
+            applied_filters = build_filters(query_params, registry)
+            plans.set(key, applied_filters)
 
     return applied_filters
 
@@ -76,3 +97,16 @@ def get_filter_id(id: str | int | float = Path(), ids_keys_candidates: tuple[str
         filter_id << filters.Eq(key, id)
 
     return filter_id()
+
+
+def get_filter_primary_key(id: str | int | float, primary_key: str) -> dict:
+    # a single equality on one (indexed) field: "42" still finds 42
+    if utils.is_numeric(id):
+        number = utils.to_number(id, default=None)
+
+        if number is None:
+            number = utils.to_number(id, converter=float)
+
+        return {primary_key: {"$in": [id, number]}}
+
+    return {primary_key: id}
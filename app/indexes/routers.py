@@ -1,3 +1,5 @@
+import pymongo
+
 from fastapi import APIRouter, Depends, Path, status
 from pymongo import errors as pymongo_errors
 
@@ -7,6 +9,8 @@ from app.core import exceptions
 from app.core.dependencies import get_collection, get_db
 from app.core.validators import validate_resource_name
 from app.indexes import schemas
+from app.indexes.services import get_primary_key, invalidate_indexes, invalidate_database_indexes, set_primary_key
+from app.resources import caches
 
 
 router = APIRouter(prefix="/@indexes", tags=["indexes"])
@@ -48,22 +52,58 @@ async def list_collection_indexes(collection: AsyncIOMotorCollection = Depends(g
     return await get_indexes(collection)
 
 
+@router.get("/{resource}/@primary-key", status_code=status.HTTP_200_OK, dependencies=[Depends(validate_resource_name(path_index=2))])
+async def get_collection_primary_key(collection: AsyncIOMotorCollection = Depends(get_collection)):
+    return {"key": await get_primary_key(collection)}
+
+
+@router.put("/{resource}/@primary-key", status_code=status.HTTP_200_OK, dependencies=[Depends(validate_resource_name(path_index=2))])
+async def set_collection_primary_key(primary_key: schemas.PrimaryKeyRequest, collection: AsyncIOMotorCollection = Depends(get_collection)):
+    # by id lookups become a single equality on this field, so it gets its index first
+    try:
+        index = await collection.create_index([(primary_key.key, pymongo.ASCENDING)], unique=primary_key.unique)
+    except pymongo_errors.OperationFailure as error:
+        raise exceptions.BadRequest(f"Could not index '{primary_key.key}': {error}")
+    finally:
+        invalidate_indexes(collection)
+
+    await set_primary_key(collection, primary_key.key)
+    await caches.get_response_cache().invalidate(collection)
+
+    return {"key": primary_key.key, "index": index}
+
+
+@router.delete("/{resource}/@primary-key", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(validate_resource_name(path_index=2))])
+async def unset_collection_primary_key(collection: AsyncIOMotorCollection = Depends(get_collection)):
+    # the index stays: drop it like any other
+    await set_primary_key(collection, None)
+    await caches.get_response_cache().invalidate(collection)
+
+
 @router.patch("/{resource}", status_code=status.HTTP_201_CREATED, dependencies=[Depends(validate_resource_name(path_index=2))])
 async def create_index(index: schemas.IndexRequest, collection: AsyncIOMotorCollection = Depends(get_collection)):
     try:
         return await collection.create_index(index.keys.items(), unique=index.unique)
     except pymongo_errors.OperationFailure:
         raise exceptions.BadRequest()
+    finally:
+        invalidate_indexes(collection)
 
 
 @router.delete("/{resource}/{index}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(validate_resource_name(path_index=2))])
 async def drop_collection_index(collection: AsyncIOMotorCollection = Depends(get_collection), index: str = Path()):
-    return await collection.drop_index(index)
+    try:
+        return await collection.drop_index(index)
+    finally:
+        invalidate_indexes(collection)
 
 
 @router.delete("/{resource}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(validate_resource_name(path_index=2))])
 async def drop_collection_indexes(collection: AsyncIOMotorCollection = Depends(get_collection)):
-    return await collection.drop_indexes()
+    try:
+        return await collection.drop_indexes()
+    finally:
+        invalidate_indexes(collection)
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
@@ -73,3 +113,5 @@ async def drop_all_indexes(db: AsyncIOMotorDatabase = Depends(get_db)):
     for collection_info in collections_info:
         collection_name = collection_info.get('name')
         await db[collection_name].drop_indexes()
+
+    invalidate_database_indexes(db.name)
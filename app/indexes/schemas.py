@@ -2,6 +2,8 @@ import pymongo
 
 from pydantic import BaseModel, field_validator, ValidationInfo
 
+from app.core.validators import validate_field_name
+
 
 class IndexRequest(BaseModel):
     keys: dict[str, str | int] | list[str]
@@ -41,3 +43,21 @@ class IndexRequest(BaseModel):
                 case _:
                     raise ValueError(f"Invalid index configuration: {key} -> {order}")
         return keys
+
+
+class PrimaryKeyRequest(BaseModel):
+    key: str
+    unique: bool = True
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "key": "code",
+                "unique": True
+            }
+        }
+    }
+
+    @field_validator("key")
+    def key_is_a_field_name(cls, key, info: ValidationInfo):
+        return validate_field_name(key)
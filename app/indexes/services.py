@@ -0,0 +1,121 @@
+import logging
+import os
+
+from functools import cache
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.caches import TTLCache
+
+
+INDEXES_CACHE_TTL: float = 60.0 # seconds; indexes changed through @indexes are invalidated right away
+METADATA_COLLECTION: str = "@metadata" # one document per collection of the token database, by name
+
+Sort = list[tuple[str, int]]
+
+logger = logging.getLogger(__name__)
+MISSING = object() # collections without a primary key cache None
+
+
+@cache
+def get_indexes_cache() -> TTLCache:
+    # per (token database, collection): bounded, tokens are free to mint
+    return TTLCache(int(os.environ.get("INDEXES_CACHE_SIZE", 1024)), INDEXES_CACHE_TTL)
+
+
+@cache
+def get_primary_keys_cache() -> TTLCache:
+    return TTLCache(int(os.environ.get("INDEXES_CACHE_SIZE", 1024)), INDEXES_CACHE_TTL)
+
+
+def get_namespace(collection: AsyncIOMotorCollection) -> tuple[str, str]:
+    return (collection.database.name, collection.name)
+
+
+def invalidate_indexes(collection: AsyncIOMotorCollection) -> None:
+    get_indexes_cache().pop(get_namespace(collection))
+
+
+def invalidate_database_indexes(database_name: str) -> None:
+    indexes_cache = get_indexes_cache()
+
+    for namespace in indexes_cache.keys():
+        if namespace[0] == database_name:
+            indexes_cache.pop(namespace)
+
+
+def get_metadata(collection: AsyncIOMotorCollection) -> AsyncIOMotorCollection:
+    return collection.database[METADATA_COLLECTION]
+
+
+async def get_primary_key(collection: AsyncIOMotorCollection) -> str | None:
+    # cached either way: collections without a primary key don't pay a round trip per lookup either
+    namespace = get_namespace(collection)
+    cached = get_primary_keys_cache().get(namespace, MISSING)
+
+    if cached is not MISSING:
+        return cached
+
+    metadata = await get_metadata(collection).find_one({"_id": collection.name})
+    key = metadata.get("primaryKey") if metadata else None
+
+    get_primary_keys_cache().set(namespace, key)
+    return key
+
+
+async def set_primary_key(collection: AsyncIOMotorCollection, key: str | None) -> None:
+    try:
+        if key is None:
+            await get_metadata(collection).update_one({"_id": collection.name}, {"$unset": {"primaryKey": ""}})
+        else:
+            await get_metadata(collection).update_one({"_id": collection.name}, {"$set": {"primaryKey": key}}, upsert=True)
+    finally:
+        get_primary_keys_cache().pop(get_namespace(collection))
+
+
+async def get_indexes_keys(collection: AsyncIOMotorCollection) -> list[Sort]:
+    namespace = get_namespace(collection)
+    cached = get_indexes_cache().get(namespace)
+
+    if cached is not None:
+        return cached
+
+    information = await collection.index_information()
+    keys = [[(field, order) for field, order in index["key"]] for index in information.values()]
+
+    get_indexes_cache().set(namespace, keys)
+    return keys
+
+
+def is_sort_covered(sort: Sort, indexes_keys: list[Sort]) -> bool:
+    # an index walks a sort when the sort is a prefix of its keys, in the same or in the reverse order
+    for keys in indexes_keys:
+        prefix = keys[:len(sort)]
+
+        if len(prefix) < len(sort) or [field for field, _ in prefix] != [field for field, _ in sort]:
+            continue
+
+        orders = [order for _, order in prefix]
+        sort_orders = [order for _, order in sort]
+
+        if orders == sort_orders or orders == [-order for order in sort_orders]:
+            return True
+
+    return False
+
+
+async def check_sort(collection: AsyncIOMotorCollection, sort: Sort) -> list[str]:
+    if not sort:
+        return []
+
+    if is_sort_covered(sort, await get_indexes_keys(collection)):
+        return []
+
+    fields = ",".join(("-" if order < 0 else "") + field for field, order in sort)
+    warning = f"Sort '{fields}' is not covered by an index: MongoDB sorts in memory."
+
+    if not collection.name.startswith("@"):
+        warning += f" Create one with PATCH /@indexes/{collection.name}"
+
+    logger.warning("%s.%s: %s", collection.database.name, collection.name, warning)
+    return [warning]
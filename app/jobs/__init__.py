@@ -0,0 +1,7 @@
+from . import services
+from .routers import router
+
+__all__ = [
+    "services",
+    "router"
+]
@@ -0,0 +1,64 @@
+import uuid
+
+from fastapi import Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+from app.core.dependencies import get_db
+from app.jobs.schemas import ACTIVE_STATUSES, JobKind, JobProgress, now
+from app.storage import engines
+
+
+JOBS_COLLECTION: str = "@jobs" # also the GridFS bucket of the exports: @jobs.files, @jobs.chunks
+
+
+class JobRepository:
+    def __init__(self, db: AsyncIOMotorDatabase = Depends(get_db)) -> None:
+        self.db = db
+        self.collection = db[JOBS_COLLECTION]
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        return engines.get_bucket(self.db, JOBS_COLLECTION)
+
+    async def create(self, kind: JobKind, resource: str) -> dict:
+        created_at = now()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "resource": resource,
+            "status": "queued",
+            "progress": JobProgress().model_dump(),
+            "errors": [],
+            "result": None,
+            "cancel_requested": False,
+            "created_at": created_at,
+            "heartbeat_at": created_at,
+        }
+
+        await self.collection.insert_one(job)
+        return job
+
+    async def get(self, id: str) -> dict | None:
+        return await self.collection.find_one({"_id": id})
+
+    async def list(self, limit: int = 100) -> list[dict]:
+        return await self.collection.find(sort=[("created_at", -1)], limit=limit).to_list(limit)
+
+    async def update(self, id: str, **fields) -> None:
+        await self.collection.update_one({"_id": id}, {"$set": fields})
+
+    async def beat(self, id: str, progress: JobProgress | None = None) -> bool:
+        """Refreshes the heartbeat (and the progress) of a job run by this worker. Returns whether it was asked to stop."""
+        fields = {"heartbeat_at": now()}
+
+        if progress is not None:
+            fields["progress"] = progress.model_dump()
+
+        job = await self.collection.find_one_and_update({"_id": id}, {"$set": fields}, projection={"cancel_requested": 1})
+        return bool(job and job.get("cancel_requested"))
+
+    async def request_cancel(self, id: str) -> dict | None:
+        return await self.collection.find_one_and_update(
+            {"_id": id, "status": {"$in": list(ACTIVE_STATUSES)}},
+            {"$set": {"cancel_requested": True}},
+        )
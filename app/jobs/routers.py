@@ -0,0 +1,110 @@
+import tempfile
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core import exceptions, streams
+from app.core.responses import FastJSONResponse
+from app.core.schemas import ExportRequest, IngestRequest
+from app.core.validators import validate_resource_name
+from app.faker import compiler
+from app.faker.engine import get_each
+from app.faker.schemas import PipelineRequest
+from app.faker.services import FakerService, get_faker_service
+from app.filters.dependencies import get_filters
+from app.jobs import works
+from app.jobs.repositories import JobRepository
+from app.jobs.schemas import JobKind, JobResponse
+from app.jobs.services import Job, get_stale_after, queue
+from app.resources.repositories import ResourceRepository
+
+
+SPOOL_MAX_MEMORY: int = 16 * 1024 * 1024 # larger uploads wait on disk
+
+
+router = APIRouter(prefix="/@jobs", tags=["jobs"], default_response_class=FastJSONResponse)
+
+
+async def submit(jobs: JobRepository, kind: JobKind, resource: str, work: works.Work) -> FastJSONResponse:
+    job = await jobs.create(kind, resource)
+    queue.submit(Job(job["_id"], jobs, work))
+
+    return FastJSONResponse(JobResponse.render(job, get_stale_after()), status_code=status.HTTP_202_ACCEPTED)
+
+
+async def get_job(id: str, jobs: JobRepository = Depends()) -> dict:
+    job = await jobs.get(id)
+
+    if not job:
+        raise exceptions.NotFound()
+
+    return job
+
+
+@router.get("")
+async def list_jobs(jobs: JobRepository = Depends()):
+    return FastJSONResponse([JobResponse.render(job, get_stale_after()) for job in await jobs.list()])
+
+
+@router.get("/{id}")
+async def get_one(job: dict = Depends(get_job)):
+    return FastJSONResponse(JobResponse.render(job, get_stale_after()))
+
+
+@router.get("/{id}/result")
+async def get_result(job: dict = Depends(get_job), jobs: JobRepository = Depends()):
+    if job["kind"] != "export" or job["status"] != "succeeded":
+        raise exceptions.NotFound("Only succeeded export jobs have a result")
+
+    file = await jobs.bucket.open_download_stream(ObjectId(job["result"]["fileId"]))
+
+    async def chunks():
+        while chunk := await file.readchunk():
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type=streams.NDJSON_MEDIA_TYPE)
+
+
+@router.delete("/{id}", status_code=status.HTTP_202_ACCEPTED)
+async def cancel(job: dict = Depends(get_job), jobs: JobRepository = Depends()):
+    # whichever worker runs the job stops it on its next heartbeat
+    if await jobs.request_cancel(job["_id"]):
+        queue.cancel(job["_id"])
+
+    return FastJSONResponse(JobResponse.render(await jobs.get(job["_id"]), get_stale_after()), status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.post("/seed/{resource}", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(validate_resource_name(path_index=3))])
+async def seed(request: Request, resource: str, options: PipelineRequest = Depends(), faker: FakerService = Depends(get_faker_service), repository: ResourceRepository = Depends(), jobs: JobRepository = Depends()):
+    each = get_each(await request.json(), threshold=0)
+
+    if each is None:
+        raise exceptions.BadRequest("A seed job needs a top-level @each")
+
+    schema = each.get('schema', {})
+    compiler.get_plan(schema, faker)
+
+    return await submit(jobs, "seed", resource, works.seed(repository, schema, each.get('count', 1), faker.locale, options))
+
+
+@router.post("/import/{resource}", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(validate_resource_name(path_index=3))])
+async def load(request: Request, resource: str, options: IngestRequest = Depends(), repository: ResourceRepository = Depends(), jobs: JobRepository = Depends()):
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+
+    try:
+        async for chunk in request.stream():
+            file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+
+    file.seek(0)
+    work = works.load(repository, file, streams.sends_ndjson(request), options.batch_size, options.concurrency)
+
+    return await submit(jobs, "import", resource, work)
+
+
+@router.post("/export/{resource}", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(validate_resource_name(path_index=3))])
+async def export(resource: str, filters: dict = Depends(get_filters), options: ExportRequest = Depends(), repository: ResourceRepository = Depends(), jobs: JobRepository = Depends()):
+    return await submit(jobs, "export", resource, works.export(repository, jobs, filters, resource, options.batch_size))
@@ -0,0 +1,47 @@
+import datetime
+
+from typing import Literal, Self
+
+from app.core.schemas import CamelModel
+
+
+JobKind = Literal['seed', 'import', 'export']
+JobStatus = Literal['queued', 'running', 'succeeded', 'failed', 'cancelled', 'interrupted']
+
+ACTIVE_STATUSES: tuple[str, ...] = ('queued', 'running')
+
+
+def now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class JobProgress(CamelModel):
+    processed: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    rate: float = 0.0 # processed documents per second
+
+
+class JobResponse(CamelModel):
+    id: str
+    kind: JobKind
+    resource: str
+    status: JobStatus
+    progress: JobProgress = JobProgress()
+    errors: list[str] = []
+    result: dict | None = None
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    heartbeat_at: datetime.datetime
+
+    @classmethod
+    def render(cls, job: dict, stale_after: float) -> Self:
+        # an active job nobody has heartbeaten lately died with its worker (restart, crash)
+        status = job['status']
+        heartbeat_at = job['heartbeat_at'].replace(tzinfo=job['heartbeat_at'].tzinfo or datetime.timezone.utc)
+
+        if status in ACTIVE_STATUSES and (now() - heartbeat_at).total_seconds() > stale_after:
+            status = 'interrupted'
+
+        return cls(**{key: val for key, val in job.items() if key not in ('_id', 'status')}, id=job['_id'], status=status)
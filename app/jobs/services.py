@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import time
+
+from functools import cache
+from typing import AsyncIterator, Callable
+
+from fastapi import HTTPException
+
+from app.jobs.repositories import JobRepository
+from app.jobs.schemas import JobProgress, now
+
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def get_jobs_concurrency() -> int:
+    return int(os.environ.get("JOBS_CONCURRENCY", 2))
+
+
+@cache
+def get_jobs_heartbeat() -> float:
+    return float(os.environ.get("JOBS_HEARTBEAT_SECONDS", 2))
+
+
+def get_stale_after() -> float:
+    # missed heartbeats before an active job is reported as interrupted
+    return 5 * get_jobs_heartbeat()
+
+
+class Job:
+    """
+    A job accepted by this worker. `work` yields the progress (processed and failed counts) as it goes,
+    and may leave a `result` on the job.
+    """
+
+    def __init__(self, id: str, repository: JobRepository, work: Callable[["Job"], AsyncIterator[JobProgress]]) -> None:
+        self.id = id
+        self.repository = repository
+        self.work = work
+        self.progress = JobProgress()
+        self.result: dict | None = None
+        self.task: asyncio.Task | None = None
+        self.cancelled = False
+        self.started: float | None = None
+
+    def snapshot(self) -> JobProgress:
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+
+        return self.progress.model_copy(update={
+            "elapsed": round(elapsed, 3),
+            "rate": round(self.progress.processed / elapsed, 1) if elapsed else 0.0,
+        })
+
+
+class JobQueue:
+    """
+    Runs the accepted jobs in the background, at most `concurrency` at a time.
+    The job documents are the shared state: every `heartbeat` seconds this worker saves the progress of its jobs,
+    and picks up the cancellations asked through any worker.
+    """
+
+    def __init__(self, concurrency: int = 2, heartbeat: float = 2.0) -> None:
+        self.concurrency = concurrency
+        self.heartbeat = heartbeat
+        self.jobs: dict[str, Job] = {}
+        self.queue: asyncio.Queue | None = None
+        self.tasks: list[asyncio.Task] = []
+        self.stopping = False
+
+    def start(self) -> None:
+        if self.tasks:
+            return
+
+        self.stopping = False
+        self.queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self.consume()) for _ in range(self.concurrency)]
+        self.tasks.append(asyncio.create_task(self.beat()))
+
+    def submit(self, job: Job) -> None:
+        self.start()
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+
+    def cancel(self, id: str) -> bool:
+        job = self.jobs.get(id)
+
+        if job is None:
+            return False
+
+        job.cancelled = True
+
+        if job.task is not None:
+            job.task.cancel()
+
+        return True
+
+    async def consume(self) -> None:
+        while True:
+            job = await self.queue.get()
+            job.task = asyncio.create_task(self.run(job))
+
+            try:
+                # wait() doesn't raise when the job is cancelled, only when this consumer is
+                await asyncio.wait([job.task])
+            finally:
+                job.task.cancel()
+
+    async def run(self, job: Job) -> None:
+        try:
+            if job.cancelled:
+                raise asyncio.CancelledError()
+
+            job.started = time.perf_counter()
+            await job.repository.update(job.id, status="running", started_at=now(), heartbeat_at=now())
+
+            async for progress in job.work(job):
+                job.progress = progress
+
+            fields = {"status": "succeeded", "result": job.result}
+        except asyncio.CancelledError:
+            fields = {"status": "interrupted" if self.stopping else "cancelled"}
+        except Exception as error:
+            logger.exception("Job %s failed", job.id)
+            fields = {"status": "failed", "errors": [error.detail if isinstance(error, HTTPException) else str(error)]}
+
+        try:
+            await job.repository.update(job.id, progress=job.snapshot().model_dump(), finished_at=now(), heartbeat_at=now(), **fields)
+        finally:
+            self.jobs.pop(job.id, None)
+
+    async def beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+
+            for job in list(self.jobs.values()):
+                try:
+                    if await job.repository.beat(job.id, job.snapshot() if job.started else None):
+                        self.cancel(job.id)
+                except Exception:
+                    logger.warning("Could not heartbeat job %s", job.id, exc_info=True)
+
+    async def stop(self) -> None:
+        # running jobs end up interrupted; queued ones are left to go stale
+        self.stopping = True
+
+        for task in self.tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+        running = [job.task for job in self.jobs.values() if job.task is not None]
+        await asyncio.gather(*running, return_exceptions=True)
+
+        self.tasks = []
+        self.queue = None
+
+
+queue = JobQueue(concurrency=get_jobs_concurrency(), heartbeat=get_jobs_heartbeat())
@@ -0,0 +1,74 @@
+import asyncio
+
+from typing import AsyncIterator, BinaryIO, Callable
+
+from app.core import streams
+from app.core.responses import dumps
+from app.faker.engine import engine
+from app.faker.pipelines import Pipeline, batched, rebatch
+from app.faker.schemas import PipelineRequest
+from app.jobs.repositories import JobRepository
+from app.jobs.schemas import JobProgress
+from app.jobs.services import Job
+from app.resources.repositories import ResourceRepository
+
+
+Work = Callable[[Job], AsyncIterator[JobProgress]]
+
+
+async def read(file: BinaryIO, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(file.read, size):
+        yield chunk
+
+
+def seed(repository: ResourceRepository, schema: any, count: int, locale: str, options: PipelineRequest) -> Work:
+    async def work(job: Job) -> AsyncIterator[JobProgress]:
+        batches = rebatch(engine.generate(schema, count, locale, options.seed), options.batch_size)
+
+        async for progress in Pipeline(repository, options.concurrency, options.queue_size).run(batches):
+            yield JobProgress(processed=progress.inserted, failed=progress.failed)
+
+    return work
+
+
+def load(repository: ResourceRepository, file: BinaryIO, ndjson: bool, batch_size: int, concurrency: int) -> Work:
+    # the upload was spooled before answering: the request is long gone when this runs
+    async def work(job: Job) -> AsyncIterator[JobProgress]:
+        try:
+            parse = streams.parse_ndjson if ndjson else streams.parse_json_array
+            batches = batched(parse(read(file)), batch_size)
+
+            async for progress in Pipeline(repository, concurrency, 2 * concurrency).run(batches):
+                yield JobProgress(processed=progress.inserted, failed=progress.failed)
+        finally:
+            file.close()
+
+    return work
+
+
+def export(repository: ResourceRepository, jobs: JobRepository, query: dict, resource: str, batch_size: int) -> Work:
+    async def work(job: Job) -> AsyncIterator[JobProgress]:
+        file = jobs.bucket.open_upload_stream(f"{resource}.ndjson", metadata={"job": job.id, "contentType": streams.NDJSON_MEDIA_TYPE})
+        buffer = bytearray()
+        processed = 0
+
+        try:
+            async for document in repository.stream(query, batch_size):
+                buffer += dumps(document) + b"\n"
+                processed += 1
+
+                if processed % batch_size == 0:
+                    await file.write(bytes(buffer))
+                    buffer.clear()
+                    yield JobProgress(processed=processed)
+
+            await file.write(bytes(buffer))
+            await file.close()
+        except BaseException:
+            await file.abort()
+            raise
+
+        job.result = {"fileId": str(file._id), "length": file.length}
+        yield JobProgress(processed=processed)
+
+    return work
@@ -1,20 +1,37 @@
 import os
 import logging
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 
-from app import faker, filters, tokens, indexes, versions, resources
+from app import faker, filters, jobs, metrics, quotas, tokens, indexes, versions, resources
+from app.core import clients, dependencies
 
 
 log_level = os.environ.get('LOG_LEVEL', 'info')
 logging.basicConfig(level=log_level.upper())
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    clients.registry.get(dependencies.get_mongodb_connection_str())
+    faker.pools.pool.warm(faker.pools.get_faker_locales())
+    yield
+    await jobs.services.queue.stop()
+    faker.engine.engine.shutdown()
+    faker.pools.pool.clear()
+    clients.registry.close()
+
 
+app = FastAPI(lifespan=lifespan)
+
+if quotas.services.get_quotas_enabled():
+    # inside CORS: browsers can read the 429s
+    app.add_middleware(quotas.QuotaMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +41,9 @@ app.add_middleware(
     allow_credentials=True,
 )
 
+if metrics.services.get_metrics_enabled():
+    app.add_middleware(metrics.MetricsMiddleware)
+
 
 @app.exception_handler(filters.exceptions.FilterError)
 async def filter_error_exception_handler(request: Request, error: filters.exceptions.FilterError):
@@ -51,7 +71,10 @@ async def filter_operator_not_exists_exception_handler(request: Request, error:
 
 
 app.include_router(tokens.router)
+app.include_router(metrics.router)
 app.include_router(faker.router)
 app.include_router(indexes.router)
+app.include_router(jobs.router)
+app.include_router(resources.caches.router)
 app.include_router(versions.router)
 app.include_router(resources.router)
@@ -0,0 +1,10 @@
+from . import listeners, services
+from .middlewares import MetricsMiddleware
+from .routers import router
+
+__all__ = [
+    "listeners",
+    "services",
+    "MetricsMiddleware",
+    "router"
+]
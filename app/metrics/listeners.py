@@ -0,0 +1,24 @@
+from pymongo import monitoring
+
+from app.metrics.services import commands, record
+
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Times every MongoDB command with the driver's own durations.
+    Motor runs them in its threads, with a copy of the request's context: the timings still land on its Server-Timing.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.observe(event.command_name, "succeeded", event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.observe(event.command_name, "failed", event.duration_micros)
+
+    def observe(self, command: str, status: str, duration_micros: int) -> None:
+        seconds = duration_micros / 1_000_000
+        commands.observe(seconds, command, status)
+        record("db", seconds)
@@ -0,0 +1,45 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.services import Timings, current, in_flight, requests
+
+
+class MetricsMiddleware:
+    """Times every request by route template, counts the ones in flight, and sends what they spent in a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        timings = Timings()
+        token = current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_timed(message: Message) -> None:
+            nonlocal status
+
+            if message["type"] == "http.response.start":
+                # streamed bodies are still on their way: the header only covers what came before
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.header(time.perf_counter() - start))
+
+            await send(message)
+
+        in_flight.inc(method)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            in_flight.dec(method)
+            current.reset(token)
+
+            # the template (/{resource}/{id}), never the path: one series per route
+            route = getattr(scope.get("route"), "path", "unmatched")
+            requests.observe(time.perf_counter() - start, method, route, str(status))
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import exceptions
+from app.metrics.services import get_metrics_enabled, registry
+
+
+router = APIRouter(prefix="/@metrics", tags=["metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    # this worker's numbers
+    if not get_metrics_enabled():
+        raise exceptions.NotFound("Metrics are disabled: set METRICS_ENABLED=true")
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,170 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from functools import cache
+from typing import Iterator
+
+
+# seconds: from sub-millisecond in-memory lookups to slow exports
+BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@cache
+def get_metrics_enabled() -> bool:
+    return os.environ.get("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    labels = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+
+    if extra:
+        labels.append(extra)
+
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+class Metric:
+    type: str = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.lock = threading.Lock() # the MongoDB listener reports from motor's threads
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self.samples()])
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterator[str]:
+        with self.lock:
+            values = list(self.values.items())
+
+        for labels, value in values:
+            yield f"{self.name}{format_labels(self.labels, labels)} {value:g}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self.series: dict[tuple[str, ...], list[float]] = {} # per bucket counts (+Inf last), then the sum
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self.lock:
+            series = self.series.get(labels)
+
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self.lock:
+            series = [(labels, list(counts)) for labels, counts in self.series.items()]
+
+        for labels, counts in series:
+            cumulative = 0
+
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{format_labels(self.labels, labels, le)} {cumulative}"
+
+            yield f"{self.name}_sum{format_labels(self.labels, labels)} {counts[-1]:.6f}"
+            yield f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        # Prometheus text exposition format
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+registry = Registry()
+
+requests = registry.register(Histogram("lorem_http_request_duration_seconds", "HTTP requests, by route template.", ("method", "route", "status")))
+in_flight = registry.register(Gauge("lorem_http_requests_in_flight", "HTTP requests being served.", ("method",)))
+phases = registry.register(Histogram("lorem_phase_duration_seconds", "Time spent building filters, faking data and encoding JSON.", ("phase",)))
+commands = registry.register(Histogram("lorem_mongodb_command_duration_seconds", "MongoDB commands, as reported by the driver.", ("command", "status")))
+
+
+class Timings:
+    """What one request spent in each phase: the Server-Timing header."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.durations: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self.lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: float) -> str:
+        with self.lock:
+            entries = [f'{name};dur={seconds * 1000:.3f};desc="{self.counts[name]}x"' for name, seconds in self.durations.items()]
+
+        return ", ".join([f"app;dur={total * 1000:.3f}", *entries])
+
+
+current: contextvars.ContextVar[Timings | None] = contextvars.ContextVar("timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    if (timings := current.get()) is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    if not get_metrics_enabled():
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        phases.observe(elapsed, phase)
+        record(phase, elapsed)
@@ -0,0 +1,7 @@
+from . import services
+from .middlewares import QuotaMiddleware
+
+__all__ = [
+    "services",
+    "QuotaMiddleware"
+]
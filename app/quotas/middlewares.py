@@ -0,0 +1,36 @@
+from fastapi.datastructures import Headers
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import exceptions, tokens
+from app.quotas.services import get_quota
+
+
+class QuotaMiddleware:
+    """Holds every token to its requests in flight and requests a second: past them, a 429 with Retry-After."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = tokens.find(Headers(scope=scope))
+
+        # no token or an invalid one: the route answers for it
+        quota = get_quota(token) if token is not None and tokens.validate(token, raise_if_invalid=False) else None
+
+        if quota is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            quota.enter()
+        except exceptions.TooManyRequests as error:
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code, headers=error.headers)
+            return await response(scope, receive, send)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            quota.leave()
@@ -0,0 +1,141 @@
+import asyncio
+import math
+import os
+import time
+
+from functools import cache
+from typing import Callable
+
+from app.core import exceptions
+from app.core.caches import LRUCache
+
+
+CONCURRENCY_RETRY_AFTER: float = 1.0 # nothing tells when a request in flight ends
+
+
+def get_env_float(name: str, default: float = 0.0) -> float:
+    value = os.environ.get(name)
+
+    if value is None or value == "":
+        return default
+
+    return float(value)
+
+
+@cache
+def get_quota_options() -> dict[str, float]:
+    # per token and per worker, 0 turns a quota off; bursts default to one second's worth
+    requests_per_second = get_env_float("QUOTA_REQUESTS_PER_SECOND")
+    writes_per_second = get_env_float("QUOTA_WRITES_PER_SECOND")
+
+    return {
+        "concurrency": int(get_env_float("QUOTA_CONCURRENCY")),
+        "requests_per_second": requests_per_second,
+        "requests_burst": get_env_float("QUOTA_REQUESTS_BURST", requests_per_second),
+        "writes_per_second": writes_per_second,
+        "writes_burst": get_env_float("QUOTA_WRITES_BURST", writes_per_second),
+    }
+
+
+@cache
+def get_quotas_enabled() -> bool:
+    options = get_quota_options()
+    return any(options[name] > 0 for name in ("concurrency", "requests_per_second", "writes_per_second"))
+
+
+def get_retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def throttled(detail: str, seconds: float) -> exceptions.TooManyRequests:
+    return exceptions.TooManyRequests(detail, headers={"Retry-After": get_retry_after(seconds)})
+
+
+class TokenBucket:
+    """
+    Fills with `rate` tokens a second, up to `capacity`.
+    A take larger than the capacity goes through on a full bucket and leaves it in debt.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float = 1.0) -> float:
+        """Takes `amount` and returns 0.0, or takes nothing and returns the seconds until it could."""
+        self.refill()
+        needed = min(amount, self.capacity)
+
+        if self.tokens < needed:
+            return (needed - self.tokens) / self.rate
+
+        self.tokens -= amount
+        return 0.0
+
+    def charge(self, amount: float) -> None:
+        # what was spent anyway: may leave the bucket in debt
+        self.refill()
+        self.tokens -= amount
+
+
+class Quota:
+    """What one token may do on this worker: requests in flight, requests a second and documents written a second."""
+
+    def __init__(self, options: dict[str, float], clock: Callable[[], float] = time.monotonic) -> None:
+        self.concurrency = options["concurrency"]
+        self.active = 0
+        self.requests = TokenBucket(options["requests_per_second"], options["requests_burst"], clock) if options["requests_per_second"] > 0 else None
+        self.writes = TokenBucket(options["writes_per_second"], options["writes_burst"], clock) if options["writes_per_second"] > 0 else None
+
+    def enter(self) -> None:
+        if self.concurrency and self.active >= self.concurrency:
+            raise throttled(f"Too many requests in flight for this token (at most {self.concurrency})", CONCURRENCY_RETRY_AFTER)
+
+        if self.requests is not None and (wait := self.requests.take()):
+            raise throttled("Too many requests for this token", wait)
+
+        self.active += 1
+
+    def leave(self) -> None:
+        self.active -= 1
+
+    def check_writes(self, count: int) -> None:
+        # one-shot writes: refused before anything is written
+        if self.writes is not None and (wait := self.writes.take(count)):
+            raise throttled("Too many documents written for this token", wait)
+
+    def charge_writes(self, count: int) -> None:
+        # writes whose size is only known once done (updates and deletes of many): the next ones pay for them
+        if self.writes is not None and count > 0:
+            self.writes.charge(count)
+
+    async def throttle_writes(self, count: int) -> None:
+        # batches of streamed or pipelined writes: slowed down, never failed halfway
+        while self.writes is not None and (wait := self.writes.take(count)):
+            await asyncio.sleep(wait)
+
+
+@cache
+def get_quotas() -> LRUCache:
+    return LRUCache(int(os.environ.get("QUOTA_TOKENS_CACHE_SIZE", 10000)))
+
+
+def get_quota(token: str) -> Quota | None:
+    if not get_quotas_enabled():
+        return None
+
+    quotas = get_quotas()
+
+    if (quota := quotas.get(token)) is None:
+        quota = Quota(get_quota_options())
+        quotas.set(token, quota)
+
+    return quota
@@ -1,5 +1,7 @@
+from . import caches
 from .routers import router
 
 __all__ = [
+    "caches",
     "router"
 ]
@@ -0,0 +1,157 @@
+import hashlib
+import importlib
+import os
+import time
+
+from functools import cache
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.caches import CacheBackend, MemoryBackend
+from app.indexes.services import get_namespace
+
+
+def get_generation_key(collection: AsyncIOMotorCollection) -> str:
+    return "generation:" + "/".join(get_namespace(collection))
+
+
+def get_target(collection: AsyncIOMotorCollection, request: Request) -> str:
+    # the same filters, page and projection in any order are the same response
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{'/'.join(get_namespace(collection))}:{request.url.path}?{query}"
+
+
+class ResponseCache:
+    """
+    Caches rendered GET responses by target (token database, collection, path and sorted query string) and generation.
+    Every write bumps the generation of its collection: the entries of the previous one are never read again,
+    and the ETags issued for it stop matching.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 5.0, etag_max_age: float = 5.0) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.etag_max_age = etag_max_age
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get_generation(self, collection: AsyncIOMotorCollection) -> int:
+        return await self.backend.get_counter(get_generation_key(collection))
+
+    async def get(self, key: str) -> bytes | None:
+        body = await self.backend.get(key)
+
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        await self.backend.set(key, body, self.ttl)
+
+    async def invalidate(self, collection: AsyncIOMotorCollection) -> int:
+        return await self.backend.incr(get_generation_key(collection))
+
+    def get_etag(self, generation: int, target: str, issued_at: int | None = None) -> str:
+        digest = hashlib.blake2b(target.encode(), digest_size=8).hexdigest()
+        issued_at = int(time.time()) if issued_at is None else issued_at
+
+        return f'W/"{self.backend.id}-{generation}-{digest}-{issued_at}"'
+
+    def match_etag(self, header: str | None, generation: int, target: str) -> str | None:
+        """
+        Returns the If-None-Match tag still good for this generation and target, if any.
+        Tags also carry when they were issued: a worker doesn't see the generations bumped by the others (unless
+        the backend is shared), so it only vouches for its tags for etag_max_age seconds.
+        """
+        for tag in (header or "").split(","):
+            tag = tag.strip()
+
+            try:
+                issued_at = int(tag.removeprefix("W/").strip('"').rsplit("-", 1)[1])
+            except (IndexError, ValueError):
+                continue
+
+            if tag == self.get_etag(generation, target, issued_at) and time.time() - issued_at <= self.etag_max_age:
+                return tag
+
+        return None
+
+    def info(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "ttl": self.ttl,
+            **self.backend.info(),
+        }
+
+
+@cache
+def get_response_cache() -> ResponseCache:
+    maxsize = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))
+    ttl = float(os.environ.get("RESPONSE_CACHE_TTL", 5))
+    etag_max_age = float(os.environ.get("RESPONSE_ETAG_MAX_AGE", 5))
+    backend = os.environ.get("RESPONSE_CACHE_BACKEND")
+
+    if not backend:
+        counters = int(os.environ.get("RESPONSE_CACHE_COLLECTIONS", 10000))
+        return ResponseCache(MemoryBackend(maxsize, ttl, counters), ttl, etag_max_age)
+
+    # "package.module:factory", called with maxsize and ttl
+    module, _, name = backend.partition(":")
+    factory = getattr(importlib.import_module(module), name)
+
+    return ResponseCache(factory(maxsize=maxsize, ttl=ttl), ttl, etag_max_age)
+
+
+async def cached(request: Request, collection: AsyncIOMotorCollection, render: Callable[[], Awaitable[Response]]) -> Response:
+    """Answers a GET with 304 when its ETag still matches, else from the cache, else renders (and caches) it."""
+    responses = get_response_cache()
+
+    # the generation is read before the query: a write meanwhile bumps it, and what's read now is never served for the next one
+    generation = await responses.get_generation(collection)
+    target = get_target(collection, request)
+
+    if tag := responses.match_etag(request.headers.get("if-none-match"), generation, target):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": tag})
+
+    key = f"response:{generation}:{target}"
+
+    if responses.enabled and (entry := await responses.get(key)) is not None:
+        etag, body = entry.split(b"\n", 1)
+        return Response(body, media_type="application/json", headers={"ETag": etag.decode(), "X-Cache": "HIT"})
+
+    response = await render()
+
+    if response.status_code != status.HTTP_200_OK:
+        return response
+
+    etag = responses.get_etag(generation, target)
+    response.headers["ETag"] = etag
+
+    if responses.enabled:
+        await responses.set(key, etag.encode() + b"\n" + response.body)
+        response.headers["X-Cache"] = "MISS"
+
+    return response
+
+
+router = APIRouter(prefix="/@cache", tags=["cache"])
+
+
+@router.get("")
+async def get_info() -> dict[str, int | float]:
+    # this worker's numbers
+    return get_response_cache().info()
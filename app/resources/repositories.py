@@ -1,32 +1,122 @@
-from typing import Self
+import asyncio
+
+from typing import AsyncIterator, Self
 from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorCollection
-from pymongo.results import InsertOneResult, InsertManyResult, DeleteResult
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult, InsertOneResult, InsertManyResult, DeleteResult
 
+from app.core import exceptions, projections
+from app.core.cursors import Cursor
 from app.core.dependencies import get_collection, get_collection_version
+from app.filters.dependencies import get_filter_id, get_filter_primary_key, get_ids_keys_candidates
+from app.indexes.services import check_sort, get_primary_key
+from app.quotas.services import Quota, get_quota
+from app.core.schemas import CountMode, IngestResponse, PageRequest, PaginatedResponse, ProjectionRequest
+from app.resources.caches import get_response_cache
+from app.resources.schemas import BulkRequest, BulkResponse
+
+
+ESTIMATED_COUNT_LIMIT: int = 1000 # estimated counts of filtered queries stop counting here
 
 
 class ResourceRepository:
-    def __init__(self, collection: AsyncIOMotorCollection = Depends(get_collection)) -> None:
+    def __init__(self, collection: AsyncIOMotorCollection = Depends(get_collection), projection: ProjectionRequest = Depends()) -> None:
         self.collection = collection
-        self.projection = { "_id": 0 } # default projection
+        self.projection = projection.get_projection() # { "_id": 0 } by default
 
     @classmethod
-    def versioned(cls, collection: AsyncIOMotorCollection = Depends(get_collection_version)) -> Self:
-        return cls(collection)
+    def versioned(cls, collection: AsyncIOMotorCollection = Depends(get_collection_version), projection: ProjectionRequest = Depends()) -> Self:
+        return cls(collection, projection)
+
+    def get_quota(self) -> Quota | None:
+        # the database is named after the token
+        return get_quota(self.collection.database.name)
+
+    async def filter_by_id(self, id: str | int | float) -> dict:
+        # the primary key set through @indexes, else the first of the candidate fields that matches
+        if primary_key := await get_primary_key(self.collection):
+            return get_filter_primary_key(id, primary_key)
+
+        return get_filter_id(id, get_ids_keys_candidates())
+
+    async def count(self, query: dict, mode: CountMode = 'exact') -> int | None:
+        match mode:
+            case 'none':
+                return None
+            case 'estimated' if not query:
+                return await self.collection.estimated_document_count()
+            case 'estimated':
+                return await self.collection.count_documents(query, limit=ESTIMATED_COUNT_LIMIT)
 
-    async def count(self, query: dict) -> int:
         return await self.collection.count_documents(query)
 
-    async def list(self, query: dict, offset: int, limit: int = 30):
+    async def list(self, query: dict, offset: int, limit: int = 30, sort: list[tuple[str, int]] | None = None):
         cursor = self.collection.find(query, self.projection)
+
+        if sort:
+            cursor = cursor.sort(sort)
+
         return await cursor.skip(offset).to_list(limit)
 
+    async def list_after(self, query: dict, cursor: Cursor, limit: int = 30) -> tuple[list, Cursor | None]:
+        # keyset pagination: needs the key and _id of the last document, which the projection may hide
+        projection, hidden = projections.widen(self.projection, [cursor.key, "_id"])
+
+        cursor_ = self.collection.find(cursor.query(query), projection, sort=cursor.sort(), limit=limit)
+        documents = await cursor_.to_list(limit)
+
+        next_cursor = cursor.next(documents[-1]) if limit and len(documents) == limit else None
+
+        for document in documents:
+            for field in hidden:
+                projections.pop_field(document, field)
+
+        return documents, next_cursor
+
+    async def paginate(self, query: dict, page: PageRequest) -> PaginatedResponse:
+        next_cursor = None
+
+        if page.keyset:
+            cursor = page.get_cursor()
+            sort = cursor.sort()
+            listing = self.list_after(query, cursor, page.limit)
+        else:
+            sort = page.get_sort()
+            listing = self.list(query, page.offset, page.limit, sort)
+
+        documents, total_count, warnings = await asyncio.gather(listing, self.count(query, page.count), check_sort(self.collection, sort))
+
+        if page.keyset:
+            documents, next_cursor = documents
+
+        return PaginatedResponse.render(page, documents, total_count, next_cursor, warnings)
+
+    async def stream(self, query: dict, batch_size: int = 1000) -> AsyncIterator[dict]:
+        # motor fetches one batch at a time: memory stays flat whatever the collection size
+        cursor = self.collection.find(query, self.projection, batch_size=batch_size)
+
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
     async def get(self, query: dict) -> dict | None:
         return await self.collection.find_one(query, self.projection)
 
+    async def invalidate(self) -> None:
+        # after every write, even a failed one (it may have written part of it)
+        await get_response_cache().invalidate(self.collection)
+
     async def insert_many(self, documents: list):
-        result: InsertManyResult = await self.collection.insert_many(documents)
+        if quota := self.get_quota():
+            quota.check_writes(len(documents))
+
+        try:
+            result: InsertManyResult = await self.collection.insert_many(documents)
+        finally:
+            await self.invalidate()
 
         if not result.acknowledged:
             return None
@@ -37,7 +127,13 @@ class ResourceRepository:
         return documents
 
     async def insert_one(self, document: dict) -> dict | None:
-        result: InsertOneResult = await self.collection.insert_one(document)
+        if quota := self.get_quota():
+            quota.check_writes(1)
+
+        try:
+            result: InsertOneResult = await self.collection.insert_one(document)
+        finally:
+            await self.invalidate()
 
         if not result.acknowledged:
             return None
@@ -50,9 +146,112 @@ class ResourceRepository:
             self.insert_many(data) if isinstance(data, list) else self.insert_one(data)
         )
 
-    async def delete_one(self, query: dict):
-        return await self.collection.delete_one(query, self.projection)
+    async def insert_batch(self, batch: list) -> int:
+        """Unordered insert_many that returns how many documents made it: duplicates don't stop the batch."""
+        if quota := self.get_quota():
+            await quota.throttle_writes(len(batch))
+
+        try:
+            result: InsertManyResult = await self.collection.insert_many(batch, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as error:
+            return error.details.get("nInserted", 0)
+        finally:
+            await self.invalidate()
+
+    async def insert_stream(self, documents: AsyncIterator[dict], batch_size: int = 1000, concurrency: int = 4) -> IngestResponse:
+        # unordered insert_many batches, at most `concurrency` of them in flight
+        summary = IngestResponse()
+        slots = asyncio.Semaphore(concurrency)
+        writes = []
+
+        async def write(batch: list[dict]) -> None:
+            try:
+                inserted = await self.insert_batch(batch)
+                summary.inserted += inserted
+                summary.failed += len(batch) - inserted
+            finally:
+                summary.batches += 1
+                slots.release()
+
+        async def flush(batch: list[dict]) -> None:
+            await slots.acquire()
+            writes.append(asyncio.create_task(write(batch)))
+
+        try:
+            batch = []
+
+            async for document in documents:
+                if not isinstance(document, dict):
+                    raise exceptions.BadRequest(f"Invalid document: {document!r}")
+
+                batch.append(document)
+
+                if len(batch) >= batch_size:
+                    await flush(batch)
+                    batch = []
+
+            if batch:
+                await flush(batch)
+        finally:
+            results = await asyncio.gather(*writes, return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        return summary
+
+    async def bulk_write(self, bulk: BulkRequest) -> BulkResponse:
+        # at least one document an operation up front, what was actually written once done
+        if quota := self.get_quota():
+            quota.check_writes(len(bulk.operations))
+
+        try:
+            result: BulkWriteResult = await self.collection.bulk_write(bulk.requests(), ordered=bulk.ordered)
+            details = result.bulk_api_result
+        except BulkWriteError as error:
+            details = error.details
+        finally:
+            await self.invalidate()
+
+        if quota:
+            written = details.get("nInserted", 0) + details.get("nModified", 0) + details.get("nRemoved", 0) + len(details.get("upserted", []))
+            quota.charge_writes(written - len(bulk.operations))
+
+        return BulkResponse(
+            inserted=details.get("nInserted", 0),
+            matched=details.get("nMatched", 0),
+            modified=details.get("nModified", 0),
+            deleted=details.get("nRemoved", 0),
+            upserted=[upsert["index"] for upsert in details.get("upserted", [])],
+            errors=[
+                {"index": error["index"], "code": error["code"], "message": error["errmsg"]}
+                for error in details.get("writeErrors", [])
+            ]
+        )
+
+    async def delete_one(self, query: dict) -> bool:
+        if quota := self.get_quota():
+            quota.check_writes(1)
+
+        try:
+            result: DeleteResult = await self.collection.delete_one(query)
+        finally:
+            await self.invalidate()
+
+        return result.deleted_count > 0
 
     async def delete_many(self, query: dict) -> bool:
-        result: DeleteResult = await self.collection.delete_many(query)
+        if quota := self.get_quota():
+            quota.check_writes(1)
+
+        try:
+            result: DeleteResult = await self.collection.delete_many(query)
+        finally:
+            await self.invalidate()
+
+        if quota:
+            quota.charge_writes(result.deleted_count - 1)
+
         return result.acknowledged
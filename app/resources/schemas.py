@@ -0,0 +1,172 @@
+from typing import Annotated, Any
+
+from pydantic import AfterValidator, Field, model_validator
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+from app.core.schemas import CamelModel
+from app.filters import models as filters
+from app.filters.dependencies import build_filters, get_filter_key_and_operator, get_filters_registry
+
+
+TYPED_OPERATORS: set[str] = {"$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin"}
+
+
+def check_query(filter: dict) -> dict:
+    for key in filter:
+        if key.startswith("$"):
+            raise ValueError(f"Invalid filter key: '{key}'")
+
+    return filter
+
+
+Query = Annotated[dict[str, str | int | float | bool | None | list], AfterValidator(check_query)]
+
+
+def get_typed_filter(key: str, value: any, registry: dict[str, filters.Filter]) -> dict:
+    # json values are already typed: one operator, no numeric/list guessing
+    field, operator = get_filter_key_and_operator(key, registry)
+    operator = registry[operator].operator
+
+    if operator not in TYPED_OPERATORS:
+        # exists, null, regexes: they read their value as the query string would
+        return build_filters({key: value if isinstance(value, bool) else str(value)}, registry)
+
+    if isinstance(value, list):
+        operator = {"$eq": "$in", "$ne": "$nin"}.get(operator, operator)
+    elif operator in ("$in", "$nin"):
+        value = [value]
+
+    return {field: {operator: value}}
+
+
+def get_query(filter: Query) -> dict:
+    # same syntax as the query string: {"age__gt": 3, "breed": "collie"}
+    # strings are guessed like query string values, plain equalities stay plain (and seed upserts)
+    registry = get_filters_registry()
+    query = {}
+
+    for key, value in filter.items():
+        if isinstance(value, str):
+            query |= build_filters({key: value}, registry)
+        elif "__" not in key and not isinstance(value, list):
+            query[key] = value
+        else:
+            query |= get_typed_filter(key, value, registry)
+
+    return query
+
+
+class BulkUpdate(CamelModel):
+    filter: Query = {}
+    set: dict[str, Any] = {}
+    unset: list[str] = []
+    inc: dict[str, int | float] = {}
+    upsert: bool = False
+    many: bool = False
+
+    @model_validator(mode="after")
+    def has_changes(self):
+        if not (self.set or self.unset or self.inc):
+            raise ValueError("update requires at least one of: set, unset, inc")
+
+        for key in [*self.set, *self.unset, *self.inc]:
+            if key.startswith("$"):
+                raise ValueError(f"Invalid field name: '{key}'")
+
+        return self
+
+    def request(self) -> UpdateOne | UpdateMany:
+        update = {}
+
+        if self.set:
+            update["$set"] = self.set
+        if self.unset:
+            update["$unset"] = {key: "" for key in self.unset}
+        if self.inc:
+            update["$inc"] = self.inc
+
+        operation = UpdateMany if self.many else UpdateOne
+        return operation(get_query(self.filter), update, upsert=self.upsert)
+
+
+class BulkReplace(CamelModel):
+    filter: Query = {}
+    document: dict[str, Any]
+    upsert: bool = False
+
+    @model_validator(mode="after")
+    def has_no_operators(self):
+        for key in self.document:
+            if key.startswith("$"):
+                raise ValueError(f"Invalid field name: '{key}'")
+
+        return self
+
+    def request(self) -> ReplaceOne:
+        return ReplaceOne(get_query(self.filter), self.document, upsert=self.upsert)
+
+
+class BulkDelete(CamelModel):
+    filter: Query = {}
+    many: bool = False
+
+    def request(self) -> DeleteOne | DeleteMany:
+        operation = DeleteMany if self.many else DeleteOne
+        return operation(get_query(self.filter))
+
+
+class BulkOperation(CamelModel):
+    insert: dict[str, Any] | None = None
+    update: BulkUpdate | None = None
+    replace: BulkReplace | None = None
+    delete: BulkDelete | None = None
+
+    @model_validator(mode="after")
+    def has_one_operation(self):
+        # an explicit null is no operation
+        if sum(getattr(self, name) is not None for name in ("insert", "update", "replace", "delete")) != 1:
+            raise ValueError("each operation must have exactly one of: insert, update, replace, delete")
+
+        return self
+
+    def request(self) -> InsertOne | UpdateOne | UpdateMany | ReplaceOne | DeleteOne | DeleteMany:
+        if self.insert is not None:
+            return InsertOne(self.insert)
+
+        return (self.update or self.replace or self.delete).request()
+
+
+class BulkRequest(CamelModel):
+    operations: list[BulkOperation] = Field(min_length=1)
+    ordered: bool = True
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "ordered": True,
+                "operations": [
+                    {"insert": {"code": 1, "breed": "Border Collie"}},
+                    {"update": {"filter": {"code": 2}, "set": {"breed": "Dachshund"}, "upsert": True}},
+                    {"delete": {"filter": {"breed__icontains": "husky"}, "many": True}}
+                ]
+            }
+        }
+    }
+
+    def requests(self) -> list:
+        return [operation.request() for operation in self.operations]
+
+
+class BulkWriteError(CamelModel):
+    index: int
+    code: int
+    message: str
+
+
+class BulkResponse(CamelModel):
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    deleted: int = 0
+    upserted: list[int] = []
+    errors: list[BulkWriteError] = []
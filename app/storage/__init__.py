@@ -0,0 +1,6 @@
+from . import engines, memory
+
+__all__ = [
+    "engines",
+    "memory"
+]
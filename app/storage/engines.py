@@ -0,0 +1,32 @@
+import os
+
+from functools import cache
+
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+from app.storage.memory import MemoryBucket, MemoryDatabase
+
+
+STORAGE_ENGINES: tuple[str, ...] = ("mongodb", "memory")
+MEMORY_TOKEN_PREFIX: str = "mem_" # tokens kept in memory whatever the engine
+
+
+@cache
+def get_storage_engine() -> str:
+    engine = os.environ.get("STORAGE_ENGINE", "mongodb").lower()
+
+    if engine not in STORAGE_ENGINES:
+        raise ValueError(f"Invalid STORAGE_ENGINE: '{engine}'. Use one of: {', '.join(STORAGE_ENGINES)}")
+
+    return engine
+
+
+def is_in_memory(token: str) -> bool:
+    return get_storage_engine() == "memory" or token.startswith(MEMORY_TOKEN_PREFIX)
+
+
+def get_bucket(db: AsyncIOMotorDatabase | MemoryDatabase, bucket_name: str) -> AsyncIOMotorGridFSBucket | MemoryBucket:
+    if isinstance(db, MemoryDatabase):
+        return MemoryBucket(db, bucket_name)
+
+    return AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
@@ -0,0 +1,596 @@
+import itertools
+import re
+
+from typing import Iterable, Iterator
+
+from bson import ObjectId
+from gridfs.errors import NoFile
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, WriteError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from app.storage import queries, updates
+
+
+def get_index_key(value: any) -> tuple | None:
+    """Hashable key of a value, equal for the values MongoDB finds equal (1 and 1.0, not 1 and True). None if it has none."""
+    rank = queries.get_rank(value)
+
+    if rank == 1:
+        return (1,)
+    if rank in (4, 5, 10):
+        return None
+
+    return (rank, value)
+
+
+class Index:
+    """
+    A secondary index: hashes the documents by the value of its first field, for equality lookups,
+    and by the values of all its fields when unique. Arrays and subdocuments aren't hashed: they're
+    always candidates, and the query itself decides.
+    """
+
+    def __init__(self, name: str, keys: queries.Sort, unique: bool = False) -> None:
+        self.name = name
+        self.keys = keys
+        self.unique = unique
+        self.entries: dict[tuple, set[int]] = {}
+        self.unhashed: set[int] = set()
+        self.uniques: dict[tuple, int] = {}
+
+    @property
+    def field(self) -> str:
+        return self.keys[0][0]
+
+    def get_unique_key(self, document: dict) -> tuple | None:
+        keys = tuple(get_index_key(queries.get_value(document, field)) for field, _ in self.keys)
+        return None if None in keys else keys
+
+    def check(self, document: dict, position: int | None = None) -> None:
+        if not self.unique:
+            return
+
+        key = self.get_unique_key(document)
+
+        if key is not None and self.uniques.get(key, position) != position:
+            values = {field: queries.get_value(document, field) for field, _ in self.keys}
+            message = f"E11000 duplicate key error index: {self.name} dup key: {values}"
+            raise DuplicateKeyError(message, 11000, {"code": 11000, "errmsg": message, "keyValue": values})
+
+    def add(self, position: int, document: dict) -> None:
+        key = get_index_key(queries.get_value(document, self.field))
+
+        if key is None:
+            self.unhashed.add(position)
+        else:
+            self.entries.setdefault(key, set()).add(position)
+
+        if self.unique and (unique_key := self.get_unique_key(document)) is not None:
+            self.uniques[unique_key] = position
+
+    def remove(self, position: int, document: dict) -> None:
+        key = get_index_key(queries.get_value(document, self.field))
+
+        if key is None:
+            self.unhashed.discard(position)
+        elif (positions := self.entries.get(key)) is not None:
+            positions.discard(position)
+
+            if not positions:
+                del self.entries[key]
+
+        if self.unique and (unique_key := self.get_unique_key(document)) is not None:
+            self.uniques.pop(unique_key, None)
+
+    def lookup(self, values: list[any]) -> set[int] | None:
+        positions = set(self.unhashed)
+
+        for value in values:
+            if isinstance(value, re.Pattern) or (key := get_index_key(value)) is None:
+                return None
+
+            positions.update(self.entries.get(key, ()))
+
+        return positions
+
+    def information(self) -> dict:
+        return {"v": 2, "key": list(self.keys), "unique": self.unique}
+
+
+def get_equalities(condition: any) -> list[any] | None:
+    # the values a field condition can only be equal to: what an index can look up
+    if isinstance(condition, dict) and updates.is_operators(condition):
+        if list(condition) == ["$eq"]:
+            return [condition["$eq"]]
+        if list(condition) == ["$in"]:
+            return list(condition["$in"])
+
+        return None
+
+    if isinstance(condition, (re.Pattern, dict, list)) or condition is None:
+        return None
+
+    return [condition]
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", filter: dict | None = None, projection: dict | list | None = None, sort: queries.Sort | None = None, skip: int = 0, limit: int = 0, **kwargs) -> None:
+        self.collection = collection
+        self.filter = filter or {}
+        self.projection = projection
+        self.sorting = queries.normalize_sort(sort)
+        self.skipping = skip
+        self.limiting = limit
+        self.results: Iterator[dict] | None = None
+
+    def sort(self, key_or_list: str | queries.Sort, direction: int | None = None) -> "MemoryCursor":
+        self.sorting = queries.normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self.skipping = skip
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self.limiting = limit
+        return self
+
+    def evaluate(self) -> Iterator[dict]:
+        project = queries.get_projector(self.projection)
+        documents: Iterable[dict] = (document for _, document in self.collection.scan(self.filter))
+
+        if self.sorting:
+            documents = queries.sort(list(documents), self.sorting)
+
+        stop = self.skipping + self.limiting if self.limiting else None
+        return map(project, itertools.islice(documents, self.skipping, stop))
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        if self.results is None:
+            self.results = self.evaluate()
+
+        return list(itertools.islice(self.results, length or None))
+
+    def __aiter__(self) -> "MemoryCursor":
+        return self
+
+    async def __anext__(self) -> dict:
+        if self.results is None:
+            self.results = self.evaluate()
+
+        try:
+            return next(self.results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self) -> None:
+        self.results = iter(())
+
+
+class MemoryCollection:
+    """
+    Motor-compatible collection kept in this process: what ResourceRepository (and the other repositories) use of
+    AsyncIOMotorCollection, the query operators app.filters emits, and the indexes created through @indexes.
+    Nothing awaits in the middle of a write: every operation is atomic for the event loop.
+    """
+
+    def __init__(self, database: "MemoryDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        self.documents: dict[int, dict] = {} # by insertion position: the natural order
+        self.positions = itertools.count()
+        self.indexes: dict[str, Index] = {"_id_": Index("_id_", [("_id", 1)], unique=True)}
+
+    def sync(self, write: bool = False) -> None:
+        """
+        Unknown collections are handed out transient: only a write (or an index) registers them, reads never do.
+        Handles taken before someone else registered the collection share its state; dropped ones read empty.
+        """
+        registered = self.database.sync(write).collections.get(self.name)
+
+        if registered is None:
+            if self.documents or len(self.indexes) > 1:
+                self.reset()
+
+            if write:
+                self.database.collections[self.name] = self
+        elif registered is not self and registered.documents is not self.documents:
+            self.documents, self.positions, self.indexes = registered.documents, registered.positions, registered.indexes
+
+    @property
+    def exists(self) -> bool:
+        self.sync()
+        return bool(self.documents) or len(self.indexes) > 1
+
+    def plan(self, query: dict) -> set[int] | None:
+        """Positions of the documents that may match, from the indexes. None when the query must scan them all."""
+        for key, condition in query.items():
+            if key == "$and":
+                for branch in condition:
+                    if (positions := self.plan(branch)) is not None:
+                        return positions
+            elif key == "$or":
+                branches = [self.plan(branch) for branch in condition]
+
+                if branches and None not in branches:
+                    return set().union(*branches)
+            elif not key.startswith("$") and (values := get_equalities(condition)) is not None:
+                for index in self.indexes.values():
+                    if index.field == key and (positions := index.lookup(values)) is not None:
+                        return positions
+
+        return None
+
+    def scan(self, query: dict) -> Iterator[tuple[int, dict]]:
+        # over a snapshot: cursors are read across awaits, and writes may come in between
+        self.sync()
+        positions = self.plan(query)
+        documents = list(self.documents.items()) if positions is None else [(position, self.documents[position]) for position in sorted(positions)]
+
+        return ((position, document) for position, document in documents if queries.matches(document, query))
+
+    def select(self, query: dict, many: bool = True, sort: queries.Sort | None = None) -> list[int]:
+        if sort:
+            found = queries.sort([document for _, document in self.scan(query)], queries.normalize_sort(sort))
+            ids = {id(document): position for position, document in self.documents.items()}
+            positions = [ids[id(document)] for document in found]
+        else:
+            positions = [position for position, _ in itertools.islice(self.scan(query), None if many else 1)]
+
+        return positions if many else positions[:1]
+
+    def add(self, document: dict) -> None:
+        self.sync(write=True)
+
+        for index in self.indexes.values():
+            index.check(document)
+
+        position = next(self.positions)
+
+        for index in self.indexes.values():
+            index.add(position, document)
+
+        self.documents[position] = document
+
+    def remove(self, position: int) -> dict:
+        document = self.documents.pop(position)
+
+        for index in self.indexes.values():
+            index.remove(position, document)
+
+        return document
+
+    def replace(self, position: int, document: dict) -> None:
+        previous = self.documents[position]
+
+        for index in self.indexes.values():
+            index.check(document, position)
+
+        for index in self.indexes.values():
+            index.remove(position, previous)
+            index.add(position, document)
+
+        self.documents[position] = document
+
+    def insert(self, document: dict) -> any:
+        if not isinstance(document, dict):
+            raise TypeError("document must be an instance of dict")
+
+        # like pymongo, the _id is set on the caller's document
+        document.setdefault("_id", ObjectId())
+        self.add(queries.clone(document))
+
+        return document["_id"]
+
+    def update(self, query: dict, update: dict, upsert: bool = False, many: bool = False) -> dict:
+        if not update:
+            raise ValueError("update cannot be empty")
+
+        positions = self.select(query, many)
+        modified = 0
+
+        for position in positions:
+            document = self.documents[position]
+            updated = updates.apply(document, update)
+
+            if updated != document:
+                self.replace(position, updated)
+                modified += 1
+
+        if positions or not upsert:
+            return {"n": len(positions), "nModified": modified, "updatedExisting": bool(positions)}
+
+        if updates.is_operators(update):
+            document = updates.apply(updates.get_upsert(query), update, inserting=True)
+        else:
+            # a replacement keeps only the _id of the filter, unless it brings its own
+            seeded = updates.get_upsert(query)
+            document = queries.clone(update)
+
+            if "_id" in seeded and "_id" not in document:
+                document = {"_id": seeded["_id"], **document}
+
+        inserted_id = self.insert(document)
+
+        return {"n": 1, "nModified": 0, "upserted": inserted_id, "updatedExisting": False}
+
+    def delete(self, query: dict, many: bool = False) -> int:
+        positions = self.select(query, many)
+
+        for position in positions:
+            self.remove(position)
+
+        return len(positions)
+
+    def find(self, filter: dict | None = None, projection: dict | list | None = None, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self, filter, projection, **kwargs)
+
+    async def find_one(self, filter: dict | None = None, projection: dict | list | None = None, **kwargs) -> dict | None:
+        documents = await self.find(filter, projection, **kwargs).limit(1).to_list(1)
+        return documents[0] if documents else None
+
+    async def count_documents(self, filter: dict, skip: int = 0, limit: int = 0, **kwargs) -> int:
+        stop = skip + limit if limit else None
+        return sum(1 for _ in itertools.islice(self.scan(filter), skip, stop))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        self.sync()
+        return len(self.documents)
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        return InsertOneResult(self.insert(document), True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        documents = list(documents)
+
+        if not documents:
+            raise TypeError("documents must be a non-empty list")
+
+        await self.bulk_write([InsertOne(document) for document in documents], ordered)
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def bulk_write(self, requests: list, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        details = {"writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+
+        for index, request in enumerate(requests):
+            try:
+                match request:
+                    case InsertOne():
+                        self.insert(request._doc)
+                        details["nInserted"] += 1
+                    case UpdateOne() | UpdateMany() | ReplaceOne():
+                        if isinstance(request, ReplaceOne) and updates.is_operators(request._doc):
+                            raise ValueError("replacement can not include $ operators")
+
+                        result = self.update(request._filter, request._doc, request._upsert, isinstance(request, UpdateMany))
+
+                        if "upserted" in result:
+                            details["nUpserted"] += 1
+                            details["upserted"].append({"index": index, "_id": result["upserted"]})
+                        else:
+                            details["nMatched"] += result["n"]
+                            details["nModified"] += result["nModified"]
+                    case DeleteOne() | DeleteMany():
+                        details["nRemoved"] += self.delete(request._filter, isinstance(request, DeleteMany))
+                    case _:
+                        raise TypeError(f"{request!r} is not a valid request")
+            except (DuplicateKeyError, WriteError) as error:
+                details["writeErrors"].append({"index": index, "code": error.code, "errmsg": (error.details or {}).get("errmsg", str(error)), "op": getattr(request, "_doc", None)})
+
+                if ordered:
+                    break
+
+        if details["writeErrors"]:
+            raise BulkWriteError(details)
+
+        return BulkWriteResult(details, True)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return UpdateResult(self.update(filter, update, upsert), True)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return UpdateResult(self.update(filter, update, upsert, many=True), True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        if updates.is_operators(replacement):
+            raise ValueError("replacement can not include $ operators")
+
+        return UpdateResult(self.update(filter, replacement, upsert), True)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection: dict | list | None = None, sort: queries.Sort | None = None, upsert: bool = False, return_document: bool = ReturnDocument.BEFORE, **kwargs) -> dict | None:
+        positions = self.select(filter, many=False, sort=sort)
+
+        if not positions:
+            if not upsert:
+                return None
+
+            inserted_id = self.update(filter, update, upsert=True)["upserted"]
+            return await self.find_one({"_id": inserted_id}, projection) if return_document == ReturnDocument.AFTER else None
+
+        before = self.documents[positions[0]]
+        updated = updates.apply(before, update)
+        self.replace(positions[0], updated)
+
+        return queries.get_projector(projection)(updated if return_document == ReturnDocument.AFTER else before)
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self.delete(filter)}, True)
+
+    async def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self.delete(filter, many=True)}, True)
+
+    async def index_information(self) -> dict[str, dict]:
+        self.sync()
+        return {name: index.information() for name, index in self.indexes.items()}
+
+    async def create_index(self, keys: str | Iterable[tuple[str, int | str]], unique: bool = False, name: str | None = None, **kwargs) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else [(field, order) for field, order in keys]
+        name = name or "_".join(f"{field}_{order}" for field, order in keys)
+        self.sync(write=True)
+
+        if (existing := self.indexes.get(name)) is not None:
+            if existing.keys != keys or existing.unique != unique:
+                raise OperationFailure(f"An existing index has the same name as the requested index: {name}", 86)
+
+            return name
+
+        index = Index(name, keys, unique)
+
+        for position, document in self.documents.items():
+            index.check(document)
+            index.add(position, document)
+
+        self.indexes[name] = index
+        return name
+
+    async def drop_index(self, index_or_name: str | queries.Sort) -> None:
+        name = index_or_name if isinstance(index_or_name, str) else "_".join(f"{field}_{order}" for field, order in index_or_name)
+
+        if name == "_id_":
+            raise OperationFailure("cannot drop _id index", 72)
+
+        self.sync()
+
+        if self.indexes.pop(name, None) is None:
+            raise OperationFailure(f"index not found with name [{name}]", 27)
+
+    async def drop_indexes(self) -> None:
+        # in place: other handles share the dict
+        self.sync()
+
+        for name in [name for name in self.indexes if name != "_id_"]:
+            del self.indexes[name]
+
+    async def drop(self) -> None:
+        await self.database.drop_collection(self.name)
+
+
+class MemoryUpload:
+    def __init__(self, files: dict, filename: str, metadata: dict | None) -> None:
+        self.files = files
+        self.filename = filename
+        self.metadata = metadata
+        self._id = ObjectId()
+        self.buffer = bytearray()
+        self.closed = False
+
+    @property
+    def length(self) -> int:
+        return len(self.buffer)
+
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+
+    async def close(self) -> None:
+        self.files[self._id] = {"filename": self.filename, "metadata": self.metadata, "data": bytes(self.buffer)}
+        self.closed = True
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+
+
+class MemoryDownload:
+    CHUNK_SIZE: int = 255 * 1024 # GridFS default
+
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.offset = 0
+
+    async def readchunk(self) -> bytes:
+        chunk = self.data[self.offset:self.offset + self.CHUNK_SIZE]
+        self.offset += len(chunk)
+        return bytes(chunk)
+
+    async def read(self) -> bytes:
+        rest = bytes(self.data[self.offset:])
+        self.offset = len(self.data)
+        return rest
+
+
+class MemoryBucket:
+    # what the jobs use of AsyncIOMotorGridFSBucket
+    def __init__(self, database: "MemoryDatabase", bucket_name: str = "fs") -> None:
+        self.files = database.sync(write=True).files.setdefault(bucket_name, {})
+
+    def open_upload_stream(self, filename: str, metadata: dict | None = None, **kwargs) -> MemoryUpload:
+        return MemoryUpload(self.files, filename, metadata)
+
+    async def open_download_stream(self, file_id: ObjectId) -> MemoryDownload:
+        if file_id not in self.files:
+            raise NoFile(f"no file in gridfs with _id {file_id!r}")
+
+        return MemoryDownload(self.files[file_id]["data"])
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str) -> None:
+        self.client = client
+        self.name = name
+        self.collections: dict[str, MemoryCollection] = {}
+        self.files: dict[str, dict[ObjectId, dict]] = {}
+
+    def sync(self, write: bool = False) -> "MemoryDatabase":
+        # like MemoryCollection.sync: registered on the first write
+        registered = self.client.databases.get(self.name)
+
+        if registered is None:
+            if self.collections or self.files:
+                self.collections, self.files = {}, {}
+
+            if write:
+                self.client.databases[self.name] = self
+        elif registered is not self and registered.collections is not self.collections:
+            self.collections, self.files = registered.collections, registered.files
+
+        return self
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if (collection := self.sync().collections.get(name)) is None:
+            collection = MemoryCollection(self, name)
+
+        return collection
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    async def list_collections(self, **kwargs) -> list[dict]:
+        return [{"name": name, "type": "collection"} for name, collection in list(self.sync().collections.items()) if collection.exists]
+
+    async def list_collection_names(self, **kwargs) -> list[str]:
+        return [collection["name"] for collection in await self.list_collections()]
+
+    async def drop_collection(self, name: str) -> None:
+        self.sync().collections.pop(name, None)
+
+
+class MemoryClient:
+    """The token databases served from this process (see app.storage.engines): each worker has its own."""
+
+    def __init__(self) -> None:
+        self.databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        # unknown databases are transient: see MemoryDatabase.sync
+        if (database := self.databases.get(name)) is None:
+            database = MemoryDatabase(self, name)
+
+        return database
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        return self[name]
+
+    async def list_database_names(self) -> list[str]:
+        return [name for name, database in self.databases.items() if any(collection.exists for collection in database.collections.values())]
+
+    async def drop_database(self, name: str) -> None:
+        self.databases.pop(name, None)
+
+    def close(self) -> None:
+        self.databases.clear()
+
+
+client = MemoryClient()
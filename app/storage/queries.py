@@ -0,0 +1,310 @@
+import datetime
+import re
+
+from typing import Callable
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+
+class Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = Missing()
+
+Sort = list[tuple[str, int]]
+
+
+def clone(value: any) -> any:
+    # documents are json-like: much cheaper than copy.deepcopy
+    if isinstance(value, dict):
+        return {key: clone(val) for key, val in value.items()}
+
+    if isinstance(value, list):
+        return [clone(val) for val in value]
+
+    return value
+
+
+def resolve(value: any, parts: list[str]) -> list[any]:
+    """The values found at a dotted path, walking into arrays of subdocuments like MongoDB does."""
+    if not parts:
+        return [value]
+
+    if isinstance(value, dict):
+        return resolve(value[parts[0]], parts[1:]) if parts[0] in value else [MISSING]
+
+    if isinstance(value, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return resolve(value[index], parts[1:]) if index < len(value) else [MISSING]
+
+        found = [val for element in value if isinstance(element, dict) for val in resolve(element, parts) if val is not MISSING]
+        return found or [MISSING]
+
+    return [MISSING]
+
+
+def get_values(document: dict, key: str) -> list[any]:
+    # an array matches when itself or any of its elements does
+    values = []
+
+    for value in resolve(document, key.split(".")):
+        values.append(value)
+
+        if isinstance(value, list):
+            values.extend(value)
+
+    return values
+
+
+def get_value(document: dict, key: str) -> any:
+    value = resolve(document, key.split("."))
+    return value[0] if len(value) == 1 else value
+
+
+# MongoDB compares values of different types by this order: a number is never greater than a string
+def get_rank(value: any) -> int:
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime.datetime):
+        return 9
+
+    return 10
+
+
+def equals(value: any, other: any) -> bool:
+    if other is None:
+        return value is None or value is MISSING
+
+    return get_rank(value) == get_rank(other) and value == other
+
+
+def compare(value: any, other: any) -> int | None:
+    # None when they can't be compared (different types)
+    rank = get_rank(value)
+
+    if rank != get_rank(other) or rank in (4, 5, 10):
+        return None
+
+    if rank == 1:
+        return 0
+
+    return (value > other) - (value < other)
+
+
+def get_pattern(pattern: str | re.Pattern, options: str = "") -> re.Pattern:
+    if isinstance(pattern, re.Pattern):
+        return pattern
+
+    flags = 0
+
+    for option in options:
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(option, 0)
+
+    return re.compile(pattern, flags)
+
+
+def matches_pattern(values: list[any], pattern: re.Pattern) -> bool:
+    return any(isinstance(value, str) and pattern.search(value) for value in values)
+
+
+def matches_in(values: list[any], options: list) -> bool:
+    for option in options:
+        if isinstance(option, re.Pattern):
+            if matches_pattern(values, option):
+                return True
+        elif any(equals(value, option) for value in values):
+            return True
+
+    return False
+
+
+def matches_operators(values: list[any], condition: dict) -> bool:
+    for operator, operand in condition.items():
+        match operator:
+            case "$eq":
+                matched = matches_in(values, [operand])
+            case "$ne":
+                matched = not matches_in(values, [operand])
+            case "$gt":
+                matched = any((compare(value, operand) or 0) > 0 for value in values)
+            case "$gte":
+                matched = any(compare(value, operand) in (0, 1) for value in values)
+            case "$lt":
+                matched = any((compare(value, operand) or 0) < 0 for value in values)
+            case "$lte":
+                matched = any(compare(value, operand) in (0, -1) for value in values)
+            case "$in":
+                matched = matches_in(values, operand)
+            case "$nin":
+                matched = not matches_in(values, operand)
+            case "$exists":
+                matched = any(value is not MISSING for value in values) == bool(operand)
+            case "$regex":
+                matched = matches_pattern(values, get_pattern(operand, condition.get("$options", "")))
+            case "$options":
+                matched = True
+            case "$not":
+                matched = not matches_condition(values, operand)
+            case "$size":
+                matched = any(isinstance(value, list) and len(value) == operand for value in values)
+            case "$all":
+                matched = all(matches_in(values, [option]) for option in operand)
+            case "$elemMatch":
+                matched = any(isinstance(value, list) and any(matches_element(element, operand) for element in value) for value in values)
+            case _:
+                raise OperationFailure(f"unknown operator: {operator}", 2)
+
+        if not matched:
+            return False
+
+    return True
+
+
+def matches_element(element: any, condition: dict) -> bool:
+    if any(key.startswith("$") for key in condition):
+        return matches_operators([element], condition)
+
+    return isinstance(element, dict) and matches(element, condition)
+
+
+def matches_condition(values: list[any], condition: any) -> bool:
+    if isinstance(condition, re.Pattern):
+        return matches_pattern(values, condition)
+
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        return matches_operators(values, condition)
+
+    return matches_in(values, [condition])
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        match key:
+            case "$and":
+                matched = all(matches(document, branch) for branch in condition)
+            case "$or":
+                matched = any(matches(document, branch) for branch in condition)
+            case "$nor":
+                matched = not any(matches(document, branch) for branch in condition)
+            case _ if key.startswith("$"):
+                raise OperationFailure(f"unknown top level operator: {key}", 2)
+            case _:
+                matched = matches_condition(get_values(document, key), condition)
+
+        if not matched:
+            return False
+
+    return True
+
+
+def get_sort_key(value: any, order: int) -> tuple:
+    if isinstance(value, list):
+        # ascending sorts arrays by their smallest element, descending by their greatest
+        elements = [get_sort_key(element, order) for element in value] or [(1, 0)]
+        return min(elements) if order > 0 else max(elements)
+
+    rank = get_rank(value)
+
+    if rank == 1:
+        return (1, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+
+    return (rank, value)
+
+
+def sort(documents: list[dict], keys: Sort) -> list[dict]:
+    # stable sorts from the last key to the first: mixed directions without inverting values
+    for key, order in reversed(keys):
+        documents.sort(key=lambda document: get_sort_key(get_value(document, key), order), reverse=order < 0)
+
+    return documents
+
+
+def normalize_sort(key_or_list: str | Sort | None, direction: int | None = None) -> Sort:
+    if key_or_list is None:
+        return []
+
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+
+    return [(key, int(order)) for key, order in key_or_list]
+
+
+def include(source: any, target: dict, parts: list[str]) -> None:
+    if not isinstance(source, dict) or parts[0] not in source:
+        return
+
+    value = source[parts[0]]
+
+    if len(parts) == 1:
+        target[parts[0]] = clone(value)
+    elif isinstance(value, dict):
+        include(value, target.setdefault(parts[0], {}), parts[1:])
+    elif isinstance(value, list):
+        elements = target.setdefault(parts[0], [{} for element in value if isinstance(element, dict)])
+
+        for element, projected in zip([element for element in value if isinstance(element, dict)], elements):
+            include(element, projected, parts[1:])
+
+
+def exclude(target: any, parts: list[str]) -> None:
+    if isinstance(target, list):
+        for element in target:
+            exclude(element, parts)
+    elif isinstance(target, dict) and parts[0] in target:
+        if len(parts) == 1:
+            target.pop(parts[0])
+        else:
+            exclude(target[parts[0]], parts[1:])
+
+
+def get_projector(projection: dict | list | None) -> Callable[[dict], dict]:
+    if isinstance(projection, list):
+        projection = {field: 1 for field in projection}
+
+    if not projection:
+        return clone
+
+    including = any(val for key, val in projection.items() if key != "_id")
+    fields = [key.split(".") for key, val in projection.items() if key != "_id" and bool(val) == including]
+    with_id = projection.get("_id", 1)
+
+    def project(document: dict) -> dict:
+        if including:
+            projected = {"_id": document["_id"]} if with_id and "_id" in document else {}
+
+            for parts in fields:
+                include(document, projected, parts)
+
+            return projected
+
+        projected = clone(document)
+
+        for parts in fields:
+            exclude(projected, parts)
+
+        if not with_id:
+            projected.pop("_id", None)
+
+        return projected
+
+    return project
@@ -0,0 +1,103 @@
+import re
+
+from pymongo.errors import WriteError
+
+from app.storage.queries import clone
+
+
+def is_operators(update: dict) -> bool:
+    return bool(update) and all(key.startswith("$") for key in update)
+
+
+def get_parent(document: dict, key: str, create: bool) -> tuple[dict | list | None, str]:
+    *paths, last = key.split(".")
+
+    for path in paths:
+        if isinstance(document, list) and path.isdigit() and int(path) < len(document):
+            document = document[int(path)]
+        elif isinstance(document, dict) and (path in document or create):
+            document = document.setdefault(path, {}) if create else document[path]
+        else:
+            return None, last
+
+    return document, last
+
+
+def set_field(document: dict, key: str, value: any) -> None:
+    parent, last = get_parent(document, key, create=True)
+
+    if isinstance(parent, list) and last.isdigit() and int(last) < len(parent):
+        parent[int(last)] = value
+    elif isinstance(parent, dict):
+        parent[last] = value
+    else:
+        raise WriteError(f"Cannot create field '{last}' in '{key}'", 28)
+
+
+def unset_field(document: dict, key: str) -> None:
+    parent, last = get_parent(document, key, create=False)
+
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+
+
+def inc_field(document: dict, key: str, amount: int | float) -> None:
+    parent, last = get_parent(document, key, create=False)
+    value = parent.get(last, 0) if isinstance(parent, dict) else 0
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise WriteError(f"Cannot apply $inc to a value of non-numeric type: '{key}'", 14)
+
+    set_field(document, key, value + amount)
+
+
+def apply(document: dict, update: dict, inserting: bool = False) -> dict:
+    """Returns the updated copy of the document: a replacement keeps its _id, operators change it in place."""
+    if not is_operators(update):
+        if any(key.startswith("$") for key in update):
+            raise WriteError("Replacement documents can't mix fields and update operators", 9)
+
+        return {"_id": document["_id"]} | clone(update) if "_id" in document else clone(update)
+
+    updated = clone(document)
+
+    for operator, fields in update.items():
+        for key, value in fields.items():
+            if key == "_id" or key.startswith("_id."):
+                if operator != "$setOnInsert" and not inserting:
+                    raise WriteError("Performing an update on the path '_id' would modify the immutable field '_id'", 66)
+
+            match operator:
+                case "$set":
+                    set_field(updated, key, clone(value))
+                case "$setOnInsert" if inserting:
+                    set_field(updated, key, clone(value))
+                case "$setOnInsert":
+                    pass
+                case "$unset":
+                    unset_field(updated, key)
+                case "$inc":
+                    inc_field(updated, key, value)
+                case _:
+                    raise WriteError(f"Unknown modifier: {operator}", 9)
+
+    return updated
+
+
+def get_upsert(query: dict) -> dict:
+    # the equalities of the filter seed the inserted document, like MongoDB does
+    document = {}
+
+    for key, condition in query.items():
+        if key == "$and":
+            for branch in condition:
+                document.update(get_upsert(branch))
+        elif key.startswith("$") or isinstance(condition, re.Pattern):
+            continue
+        elif isinstance(condition, dict) and is_operators(condition):
+            if list(condition) == ["$eq"]:
+                set_field(document, key, clone(condition["$eq"]))
+        else:
+            set_field(document, key, clone(condition))
+
+    return document
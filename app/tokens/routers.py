@@ -2,21 +2,32 @@ from fastapi import APIRouter, Depends
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core import dependencies, tokens
+from app.storage import engines, memory
 from app.tokens.schemas import TokenRequest, TokenResponse
 
 
 router = APIRouter(prefix="/@tokens", tags=["tokens"])
 
 
+def generate_token(request: TokenRequest) -> str:
+    if request.memory:
+        prefix = engines.MEMORY_TOKEN_PREFIX
+        return prefix + tokens.generate(request.length - len(prefix))
+
+    return tokens.generate(request.length)
+
+
 @router.post("")
 async def generate(request: TokenRequest, client: AsyncIOMotorClient = Depends(dependencies.get_client)) -> TokenResponse:
-    cursor = await client.list_databases()
-    cursor_coroutine = cursor.to_list(length=None)
-    
-    new_token = tokens.generate(request.length)
-    dbs = await cursor_coroutine
-    
+    if request.memory or engines.get_storage_engine() == "memory":
+        dbs = await memory.client.list_database_names()
+    else:
+        cursor = await client.list_databases()
+        dbs = [database["name"] for database in await cursor.to_list(length=None)]
+
+    new_token = generate_token(request)
+
     while new_token in dbs:
-        new_token = tokens.generate(request.length)
-    
+        new_token = generate_token(request)
+
     return TokenResponse(token=new_token)
@@ -6,6 +6,7 @@ from app.core.tokens import TOKEN_MIN_LENGTH, TOKEN_MAX_LENGTH
 
 class TokenRequest(CamelModel):
     length: int = Field(default=32, ge=TOKEN_MIN_LENGTH, le=TOKEN_MAX_LENGTH)
+    memory: bool = False # a token kept in memory (see app.storage), whatever the storage engine
 
 
 class TokenResponse(CamelModel):
@@ -1,43 +1,75 @@
 from fastapi import APIRouter
 
-from fastapi import Depends, Request, status
+from fastapi import Depends, Path, Request, status
 
-from app.core import exceptions
+from app.core import exceptions, streams
+from app.core.responses import FastJSONResponse
 from app.core.validators import validate_resource_name
+from app.resources.caches import cached
 from app.resources.repositories import ResourceRepository
-from app.core.schemas import PageRequest, PaginatedResponse
-from app.filters.dependencies import get_filters, get_filter_id
+from app.resources.schemas import BulkRequest, BulkResponse
+from app.core.schemas import ExportRequest, IngestRequest, PageRequest
+from app.filters.dependencies import get_filters
 
 
 router = APIRouter(
     prefix="/@v",
     tags=["versions"],
+    default_response_class=FastJSONResponse,
     dependencies=[Depends(validate_resource_name(path_index=2))]
 )
 
 
 @router.get("{version:int}/{resource}")
-async def get_many(filters: dict = Depends(get_filters), page = Depends(PageRequest), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
-    documents = await repository.list(filters, page.offset, page.limit)
-    total_count = await repository.count(filters)
+async def get_many(request: Request, filters: dict = Depends(get_filters), page = Depends(PageRequest), options: ExportRequest = Depends(), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
+    if streams.accepts_ndjson(request):
+        return await export(request, filters, options, repository)
 
-    return PaginatedResponse.render(page, documents, total_count)
+    async def render():
+        return FastJSONResponse(await repository.paginate(filters, page))
+
+    return await cached(request, repository.collection, render)
+
+
+@router.get("{version:int}/{resource}/@export")
+async def export(request: Request, filters: dict = Depends(get_filters), options: ExportRequest = Depends(), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
+    return streams.response(request, repository.stream(filters, options.batch_size))
 
 
 @router.get("{version:int}/{resource}/{id}")
-async def get_one(id: dict = Depends(get_filter_id), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
-    document = await repository.get(id)
+async def get_one(request: Request, id: str = Path(), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
+    async def render():
+        document = await repository.get(await repository.filter_by_id(id))
 
-    if not document:
-        raise exceptions.NotFound()
+        if not document:
+            raise exceptions.NotFound()
+
+        return FastJSONResponse(document)
 
-    return document
+    return await cached(request, repository.collection, render)
 
 
 @router.post("{version:int}/{resource}", status_code=status.HTTP_201_CREATED)
-async def insert_one_or_many(request: Request, repository: ResourceRepository = Depends(ResourceRepository.versioned)):
+async def insert_one_or_many(request: Request, options: IngestRequest = Depends(), repository: ResourceRepository = Depends(ResourceRepository.versioned)):
+    if streams.sends_ndjson(request):
+        documents = streams.parse_ndjson(request.stream())
+        summary = await repository.insert_stream(documents, options.batch_size, options.concurrency)
+        return FastJSONResponse(summary, status_code=status.HTTP_201_CREATED)
+
+    if options.stream:
+        documents = streams.parse_json_array(request.stream())
+        summary = await repository.insert_stream(documents, options.batch_size, options.concurrency)
+        return FastJSONResponse(summary, status_code=status.HTTP_201_CREATED)
+
     json = await request.json()
-    return await repository.insert_one_or_many(json)
+    inserted = await repository.insert_one_or_many(json)
+
+    return FastJSONResponse(inserted, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("{version:int}/{resource}/@bulk", status_code=status.HTTP_200_OK)
+async def bulk_write(bulk: BulkRequest, repository: ResourceRepository = Depends(ResourceRepository.versioned)) -> BulkResponse:
+    return await repository.bulk_write(bulk)
 
 
 @router.delete("{version:int}/{resource}", status_code=status.HTTP_204_NO_CONTENT)
@@ -47,8 +79,8 @@ async def delete_many(filters = Depends(get_filters), repository: ResourceReposi
 
 
 @router.delete("{version:int}/{resource}/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_one(id: dict = Depends(get_filter_id), repository: ResourceRepository = Depends(ResourceRepository.versioned)) -> None:
-    document = await repository.delete_one(id)
+async def delete_one(id: str = Path(), repository: ResourceRepository = Depends(ResourceRepository.versioned)) -> None:
+    document = await repository.delete_one(await repository.filter_by_id(id))
 
     if not document:
         raise exceptions.NotFound()
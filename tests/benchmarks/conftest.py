@@ -0,0 +1,18 @@
+import pytest
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.core.dependencies import get_mongodb_connection_str
+
+
+@pytest.fixture(scope="session")
+def mongodb():
+    client = MongoClient(get_mongodb_connection_str(), serverSelectionTimeoutMS=500)
+
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB is not reachable")
+    finally:
+        client.close()
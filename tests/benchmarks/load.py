@@ -0,0 +1,252 @@
+"""
+Scripted load scenarios against the app, in-process (ASGI, no network) or a local uvicorn.
+
+    python -m tests.benchmarks.load --output before.json
+    python -m tests.benchmarks.load --output after.json --compare before.json
+    python -m tests.benchmarks.load --url http://127.0.0.1:8000 --storage mongodb
+
+Every run is seeded: the same data, the same requests in the same order.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+
+from typing import Awaitable, Callable
+
+import httpx
+
+
+RESOURCE: str = "benchdogs"
+BREEDS: tuple[str, ...] = ("collie", "pug", "husky", "beagle", "boxer", "poodle", "corgi", "akita")
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+class Scenario:
+    def __init__(self, name: str, request: Request, requests: int = 500, concurrency: int = 8) -> None:
+        self.name = name
+        self.request = request
+        self.requests = requests
+        self.concurrency = concurrency
+
+
+def get_dogs(count: int, start: int = 0) -> list[dict]:
+    rng = random.Random(start)
+
+    return [
+        {
+            "code": code,
+            "name": "".join(rng.choices(string.ascii_lowercase, k=8)),
+            "breed": rng.choice(BREEDS),
+            "age": rng.randrange(16),
+            "weight": round(rng.uniform(2, 60), 2),
+            "owner": {"name": "".join(rng.choices(string.ascii_lowercase, k=6)), "vip": rng.random() < 0.1},
+        }
+        for code in range(start, start + count)
+    ]
+
+
+def get_scenarios(documents: int, scale: float = 1.0) -> list[Scenario]:
+    def requests(count: int) -> int:
+        return max(1, int(count * scale))
+
+    async def by_id(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/{RESOURCE}/{rng.randrange(documents)}")
+
+    async def deep_page(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        offset = rng.randrange(documents // 2, max(documents - 100, documents // 2 + 1))
+        return await client.get(f"/{RESOURCE}", params={"__offset": offset, "__limit": 100})
+
+    async def filtered(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        params = {
+            "breed__in": ",".join(rng.sample(BREEDS, 3)),
+            "age__gte": rng.randrange(8),
+            "name__icontains": rng.choice(string.ascii_lowercase),
+            "owner.vip": "false",
+            "__sort": "-weight",
+            "__limit": 50,
+        }
+        return await client.get(f"/{RESOURCE}", params=params)
+
+    async def indexes(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/@indexes/{RESOURCE}")
+
+    async def bulk_insert(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.post(f"/{RESOURCE}-inserts", json=get_dogs(1000, rng.randrange(10 ** 9)))
+
+    async def faker_seed(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        schema = {"@each": {"count": 5000, "schema": {"name": "@firstName", "age": "@int", "score": "@pyfloat", "city": "@city"}}}
+        return await client.post(f"/@faker/{RESOURCE}-fakes", params={"__seed": rng.randrange(1000), "__pipeline": "true"}, json=schema)
+
+    return [
+        Scenario("by_id", by_id, requests(2000), 16),
+        Scenario("deep_pagination", deep_page, requests(500), 8),
+        Scenario("filter_heavy", filtered, requests(500), 8),
+        Scenario("indexes", indexes, requests(1000), 8),
+        Scenario("bulk_insert", bulk_insert, requests(50), 4),
+        Scenario("faker_seed", faker_seed, requests(10), 2),
+    ]
+
+
+def get_percentile(latencies: list[float], percentile: float) -> float:
+    # nearest rank, on sorted latencies
+    if not latencies:
+        return 0.0
+
+    return latencies[max(0, math.ceil(percentile / 100 * len(latencies)) - 1)]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, seed: int) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    latencies = []
+    errors = 0
+    remaining = iter(range(scenario.requests))
+
+    async def user() -> None:
+        nonlocal errors
+
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario.request(client, rng)
+            latencies.append(time.perf_counter() - started)
+
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(scenario.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    return {
+        "requests": len(latencies),
+        "concurrency": scenario.concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(get_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(get_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(get_percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+async def seed_data(client: httpx.AsyncClient, documents: int) -> None:
+    for resource in (RESOURCE, f"{RESOURCE}-inserts", f"{RESOURCE}-fakes"):
+        await client.delete(f"/{resource}")
+
+    for start in range(0, documents, 1000):
+        response = await client.post(f"/{RESOURCE}", json=get_dogs(min(1000, documents - start), start))
+        response.raise_for_status()
+
+    await client.patch(f"/@indexes/{RESOURCE}", json={"keys": ["breed", "age"], "unique": False})
+    await client.put(f"/@indexes/{RESOURCE}/@primary-key", json={"key": "code"})
+
+
+def get_token(storage: str, seed: int) -> str:
+    token = "".join(random.Random(seed).choices(string.ascii_letters + string.digits, k=28))
+    return f"mem_{token}" if storage == "memory" else f"bench{token}"
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(url: str | None = None, storage: str = "memory", documents: int = 10_000, scale: float = 1.0, seed: int = 42, names: list[str] | None = None) -> dict:
+    headers = {"Authorization": f"Bearer {get_token(storage, seed)}"}
+    scenarios = [scenario for scenario in get_scenarios(documents, scale) if not names or scenario.name in names]
+    results = {}
+
+    async def run_all(client: httpx.AsyncClient) -> None:
+        await seed_data(client, documents)
+
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(client, scenario, seed)
+
+    if url:
+        async with httpx.AsyncClient(base_url=url, headers=headers, timeout=120) as client:
+            await run_all(client)
+    else:
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+                await run_all(client)
+
+    return {
+        "commit": get_commit(),
+        "target": url or "asgi",
+        "storage": storage,
+        "documents": documents,
+        "seed": seed,
+        "python": platform.python_version(),
+        "response_cache_ttl": os.environ.get("RESPONSE_CACHE_TTL", "5"),
+        "scenarios": results,
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    lines = []
+
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+
+        if before is None:
+            continue
+
+        throughput = (result["throughput"] / before["throughput"] - 1) * 100 if before["throughput"] else 0.0
+        p95 = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        lines.append(f"{name:16} throughput {throughput:+6.1f}%   p95 {p95:+6.1f}%")
+
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="a running server (default: the app in-process, no network)")
+    parser.add_argument("--storage", choices=("memory", "mongodb"), default="memory", help="mongodb needs a local mongod")
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the requests of every scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", dest="names", help="only these scenarios (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="in-process only: disable the response cache")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="a previous JSON report to compare with")
+    options = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING) # one line per request otherwise
+
+    if options.no_cache:
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+    report = asyncio.run(run(options.url, options.storage, options.documents, options.scale, options.seed, options.names))
+    dumped = json.dumps(report, indent=2)
+
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(dumped + "\n")
+    else:
+        print(dumped)
+
+    if options.compare:
+        with open(options.compare) as file:
+            print("\n".join(compare(report, json.load(file))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
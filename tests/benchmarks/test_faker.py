@@ -0,0 +1,73 @@
+import pytest
+
+from humps import decamelize as snakelize
+
+from app.faker import compiler
+from app.faker.services import FakerService
+from tests.benchmarks.utils import measure
+
+
+SCHEMA = {
+    '@each': {
+        'count': 100,
+        'schema': {
+            'name': '@firstName',
+            'age': '@int',
+            'active': '@bool',
+            'kind': 'dog',
+            'scores': {'@each': {'count': 5, 'schema': '@randomDigit'}},
+        },
+    },
+}
+
+
+def interpret(service: FakerService, schema: any) -> any:
+    # the schema interpreter FakerService.fake used before plans were compiled (without the @each embedding)
+    if isinstance(schema, str) and schema.startswith('@'):
+        name, *paths = snakelize(schema)[1:].split('.')
+        value = getattr(service, name)
+
+        for path in paths:
+            value = value.get(path)
+
+        return value
+
+    if isinstance(schema, list):
+        return [interpret(service, element) for element in schema]
+
+    if isinstance(schema, dict) and '@each' in schema:
+        each = schema['@each']
+        return [interpret(service, each.get('schema', {})) for _ in range(each.get('count', 1))]
+
+    if isinstance(schema, dict):
+        return {interpret(service, key): interpret(service, val) for key, val in schema.items()}
+
+    return schema
+
+
+@pytest.mark.benchmark
+def test_faker_compiled_plan_records_per_second():
+    faker = FakerService()
+    count = SCHEMA['@each']['count']
+
+    interpreted = measure(lambda: interpret(faker, SCHEMA)) * count
+    compiled = measure(lambda: faker.fake(SCHEMA)) * count
+
+    print(f"\nfaker: {interpreted:.0f} records/s (interpreted schema) -> {compiled:.0f} records/s (compiled plan)")
+    assert compiled > interpreted
+
+
+NUMERIC_SCHEMA = {'count': 10_000, 'schema': {'age': '@int', 'score': '@float', 'balance': '@number', 'active': '@bool'}}
+
+
+@pytest.mark.benchmark
+def test_faker_bulk_numeric_records_per_second():
+    faker = FakerService()
+    count = NUMERIC_SCHEMA['count']
+    record = compiler.compile_schema(NUMERIC_SCHEMA['schema'], faker)
+
+    one_by_one = measure(lambda: [record(faker) for _ in range(count)]) * count
+    in_bulk = measure(lambda: faker.fake({'@each': NUMERIC_SCHEMA})) * count
+
+    print(f"\nfaker: {one_by_one:.0f} numeric records/s (one by one) -> {in_bulk:.0f} numeric records/s (in bulk)")
+    assert in_bulk > one_by_one
@@ -0,0 +1,26 @@
+import pytest
+
+from app.core.caches import LRUCache
+from app.filters.dependencies import build_filters, get_filters, get_filters_registry
+from tests.benchmarks.utils import measure
+
+
+QUERY_PARAMS = {
+    'breed__icontains': 'shepherd',
+    'age__gte': '3',
+    'colors__in': 'brown,gold,255',
+    'owner__isnull': '0',
+    'code': '123',
+}
+
+
+@pytest.mark.benchmark
+def test_filters_plan_cache():
+    registry = get_filters_registry()
+    plans = LRUCache()
+
+    uncached = measure(lambda: build_filters(QUERY_PARAMS, registry))
+    cached = measure(lambda: get_filters(QUERY_PARAMS, registry, plans))
+
+    print(f"\nget_filters: {uncached:.0f} ops/s (uncached) -> {cached:.0f} ops/s (cached), {plans.info()}")
+    assert cached > uncached
@@ -0,0 +1,79 @@
+import pytest
+
+from fastapi.datastructures import Headers
+
+from app.core import contexts, tokens, utils
+from app.filters import converters
+from app.filters.dependencies import build_filters, get_filter_id, get_filter_primary_key, get_filters_registry, get_ids_keys_candidates
+from tests.benchmarks.utils import check_baseline, get_regression
+
+
+# what every request runs: checked against tests/benchmarks/baselines.json (BENCHMARK_UPDATE=1 to refresh it)
+
+QUERY_PARAMS = {
+    'breed__icontains': 'shepherd',
+    'age__gte': '3',
+    'colors__in': 'brown,gold,255',
+    'owner__isnull': '0',
+    'code': '123',
+}
+
+VALUES = ['123', '-4.5', '1e3', 'rex', '', '12abc', 7, 3.5, 'brown,gold,255']
+
+HEADERS = Headers({'authorization': 'Bearer ' + 'a1B2c3D4' * 4, 'host': 'localhost:8000'})
+
+
+@pytest.mark.benchmark
+def test_build_filters():
+    registry = get_filters_registry()
+    check_baseline('build_filters', lambda: build_filters(QUERY_PARAMS, registry))
+
+
+@pytest.mark.benchmark
+def test_is_numeric():
+    check_baseline('is_numeric', lambda: [utils.is_numeric(value) for value in VALUES])
+
+
+@pytest.mark.benchmark
+def test_value_as_list():
+    check_baseline('value_as_list', lambda: converters.value_as_list('brown,gold,255,-4.5,rex'))
+
+
+@pytest.mark.benchmark
+def test_value_as_list_with_numerics():
+    check_baseline('value_as_list_with_numerics', lambda: converters.value_as_list_with_numerics('brown,gold,255,-4.5,rex'))
+
+
+@pytest.mark.benchmark
+def test_get_filter_id():
+    candidates = get_ids_keys_candidates()
+    check_baseline('get_filter_id', lambda: get_filter_id('123', candidates))
+
+
+@pytest.mark.benchmark
+def test_get_filter_primary_key():
+    check_baseline('get_filter_primary_key', lambda: get_filter_primary_key('123', 'code'))
+
+
+@pytest.mark.benchmark
+def test_token_extract():
+    check_baseline('token_extract', lambda: tokens.extract(HEADERS))
+
+
+@pytest.mark.benchmark
+def test_token_validate():
+    token = tokens.extract(HEADERS)
+    check_baseline('token_validate', lambda: tokens.validate(token))
+
+
+@pytest.mark.benchmark
+def test_token_context():
+    client = {tokens.extract(HEADERS): {'dogs': 'collection'}}
+    check_baseline('token_context', lambda: contexts.get(HEADERS, client).collection('dogs'))
+
+
+def test_get_regression():
+    assert get_regression(0.8, 1.0, 0.3) is None
+    assert get_regression(1.5, 1.0, 0.3) is None
+    assert get_regression(0.6, 1.0, 0.3) == '0.6000 vs baseline 1.0000 (-40%, threshold -30%)'
+
@@ -0,0 +1,33 @@
+import asyncio
+import json
+
+import pytest
+
+from tests.benchmarks import load
+
+
+@pytest.mark.benchmark
+def test_load_scenarios_in_memory():
+    # a short run of every scenario, in-process: python -m tests.benchmarks.load for the real thing
+    report = asyncio.run(load.run(documents=2000, scale=0.05))
+
+    print("\n" + json.dumps(report["scenarios"], indent=2))
+
+    for name, result in report["scenarios"].items():
+        assert result["errors"] == 0, name
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+
+def test_percentiles():
+    latencies = [float(value) for value in range(1, 101)]
+
+    assert load.get_percentile(latencies, 50) == 50
+    assert load.get_percentile(latencies, 99) == 99
+    assert load.get_percentile([3.0], 95) == 3.0
+
+
+def test_compare():
+    baseline = {"scenarios": {"by_id": {"throughput": 100.0, "p95_ms": 10.0}}}
+    report = {"scenarios": {"by_id": {"throughput": 110.0, "p95_ms": 9.0}, "indexes": {"throughput": 1.0, "p95_ms": 1.0}}}
+
+    assert load.compare(report, baseline) == ["by_id            throughput  +10.0%   p95  -10.0%"]
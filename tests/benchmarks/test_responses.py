@@ -0,0 +1,45 @@
+import datetime
+import json
+
+import pytest
+
+from bson import Decimal128, ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+from app.core.schemas import PageRequest, PaginatedResponse
+from tests.benchmarks.utils import measure
+
+
+BSON_ENCODERS = {ObjectId: str, Decimal128: str}
+
+
+def get_page(length: int = 1000) -> PaginatedResponse:
+    documents = [
+        {
+            '_id': ObjectId(),
+            'code': index,
+            'name': f'Dog {index}',
+            'born': datetime.datetime(2020, 1, 1) + datetime.timedelta(days=index),
+            'price': Decimal128(f'{index}.99'),
+            'owner': {'name': 'Ada Lovelace', 'tags': ['a', 'b', 'c']},
+        }
+        for index in range(length)
+    ]
+
+    return PaginatedResponse.render(PageRequest(limit=length), documents, length)
+
+
+@pytest.mark.benchmark
+def test_encode_1000_documents_page():
+    page = get_page()
+    # pydantic can't serialize BSON types inside the model: hand jsonable_encoder the raw documents instead
+    content = {'data': page.data, 'metadata': page.metadata}
+
+    stdlib = measure(lambda: JSONResponse(jsonable_encoder(content, by_alias=True, custom_encoder=BSON_ENCODERS)))
+    fast = measure(lambda: FastJSONResponse(page))
+
+    print(f"\n1000-document page: {stdlib:.1f} pages/s (jsonable_encoder + json) -> {fast:.1f} pages/s (FastJSONResponse)")
+    assert json.loads(FastJSONResponse(page).body)['metadata']['length'] == 1000
+    assert fast > stdlib
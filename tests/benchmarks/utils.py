@@ -0,0 +1,102 @@
+import json
+import os
+import statistics
+import time
+
+from pathlib import Path
+
+
+BASELINES_PATH: Path = Path(__file__).with_name("baselines.json")
+
+
+def measure(func, duration: float = 1.0) -> float:
+    """Calls func repeatedly for about `duration` seconds and returns the calls per second."""
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+
+    while elapsed < duration:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - started
+
+    return calls / elapsed
+
+
+def measure_best(func, repeat: int = 5, duration: float = 0.2) -> float:
+    # the best of a few short runs: noise only ever slows a run down
+    return max(measure(func, duration) for _ in range(repeat))
+
+
+def reference() -> int:
+    # plain interpreter work (loops, str, dict): how fast this machine runs python right now
+    counts = {}
+
+    for index in range(200):
+        key = str(index % 7)
+        counts[key] = counts.get(key, 0) + len(key)
+
+    return sum(counts.values())
+
+
+def measure_relative(func, rounds: int = 7, duration: float = 0.1) -> tuple[float, float]:
+    """
+    Returns the calls per second of func, and its speed as a multiple of `reference` on this machine.
+    Both are timed round after round so that a machine slowing down mid-run moves them together.
+    """
+    ratios = []
+    best = 0.0
+
+    for _ in range(rounds):
+        ops = measure(func, duration)
+        ratios.append(ops / measure(reference, duration))
+        best = max(best, ops)
+
+    return best, statistics.median(ratios)
+
+
+def get_threshold() -> float:
+    return float(os.environ.get("BENCHMARK_THRESHOLD", 0.3))
+
+
+def load_baselines() -> dict[str, float]:
+    if not BASELINES_PATH.exists():
+        return {}
+
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def save_baseline(name: str, relative: float) -> None:
+    baselines = load_baselines() | {name: round(relative, 4)}
+    BASELINES_PATH.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+def get_regression(relative: float, baseline: float, threshold: float) -> str | None:
+    """A message when `relative` is more than `threshold` (a fraction) below `baseline`."""
+    change = relative / baseline - 1
+
+    if change >= -threshold:
+        return None
+
+    return f"{relative:.4f} vs baseline {baseline:.4f} ({change:+.0%}, threshold -{threshold:.0%})"
+
+
+def check_baseline(name: str, func) -> float:
+    """
+    Benchmarks func against its stored baseline, kept as a multiple of the reference speed
+    so that it holds on faster or slower machines. BENCHMARK_UPDATE=1 stores the run as the new baseline.
+    """
+    ops, relative = measure_relative(func)
+    baseline = load_baselines().get(name)
+
+    if os.environ.get("BENCHMARK_UPDATE") == "1" or baseline is None:
+        save_baseline(name, relative)
+        print(f"\n{name}: {ops:.0f} ops/s ({relative:.4f}x reference), stored as baseline")
+        return relative
+
+    print(f"\n{name}: {ops:.0f} ops/s ({relative:.4f}x reference, baseline {baseline:.4f}x)")
+
+    if (regression := get_regression(relative, baseline, get_threshold())) is not None:
+        raise AssertionError(f"{name} regressed: {regression}")
+
+    return relative
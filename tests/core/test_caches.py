@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from app.core.caches import LRUCache, MemoryBackend, TTLCache
+
+
+def test_lru_cache_get_set():
+    cache = LRUCache(maxsize=2)
+    cache.set('foo', 1)
+
+    assert cache.get('foo') == 1
+    assert cache.get('bar') is None
+    assert cache.info()['hits'] == 1
+    assert cache.info()['misses'] == 1
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('foo', 1)
+    cache.set('bar', 2)
+    cache.get('foo')
+    cache.set('baz', 3)
+
+    assert cache.get('bar') is None
+    assert cache.get('foo') == 1
+    assert len(cache) == 2
+
+
+def test_lru_cache_pop_and_keys():
+    cache = LRUCache(maxsize=2)
+    cache.set('foo', 1)
+    cache.set('bar', 2)
+    cache.pop('foo')
+    cache.pop('missing')
+
+    assert cache.keys() == ['bar']
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(maxsize=0)
+    cache.set('foo', 1)
+
+    assert cache.get('foo') is None
+
+
+def test_ttl_cache_expires():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('foo', 1)
+    cache.set('bar', 2, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get('foo') == 1
+    assert cache.get('bar') is None
+    assert len(cache) == 1
+
+
+def test_memory_backend_counters():
+    backend = MemoryBackend()
+
+    async def run() -> tuple[int, int]:
+        before = await backend.get_counter('foo')
+        await backend.incr('foo')
+        return before, await backend.incr('foo')
+
+    assert asyncio.run(run()) == (0, 2)
+
+
+def test_memory_backend_counters_never_go_back():
+    backend = MemoryBackend(counters=2)
+
+    async def run() -> list[int]:
+        for key in ('foo', 'foo', 'foo', 'bar', 'baz'): # foo is evicted at 3
+            await backend.incr(key)
+
+        return [await backend.get_counter('foo'), await backend.incr('foo'), await backend.get_counter('new')]
+
+    assert asyncio.run(run()) == [3, 4, 3]
+    assert len(backend.counters) == 2
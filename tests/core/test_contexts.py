@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from fastapi.datastructures import Headers
+
+from app.core import contexts, exceptions, tokens
+from app.storage import engines
+
+
+TOKEN = 'a1B2c3D4' * 4
+
+
+def test_find_token():
+    assert tokens.find(Headers({'authorization': f'Bearer {TOKEN}'})) == TOKEN
+    assert tokens.find(Headers({'authorization': f'Token {TOKEN}'})) == TOKEN
+    assert tokens.find(Headers({'authorization': 'Basic xyz', 'x-token': TOKEN})) is None
+    assert tokens.find(Headers({'x-api-key': TOKEN})) == TOKEN
+    assert tokens.find(Headers({'host': f'{TOKEN}.lorem.com'})) == TOKEN
+    assert tokens.find(Headers({'host': 'localhost:8000'})) is None
+
+
+def test_contexts_are_cached_per_token_and_client():
+    client, other = {TOKEN: 'db'}, {TOKEN: 'other db'}
+    headers = Headers({'x-token': TOKEN})
+    context = contexts.get(headers, client)
+
+    assert context.db == 'db'
+    assert contexts.get(headers, client) is context
+    assert contexts.get(headers, other).db == 'other db'
+
+
+def test_invalid_tokens_are_not_cached():
+    with pytest.raises(exceptions.Unauthorized):
+        contexts.get(Headers({'x-token': 'short'}), {})
+
+    assert contexts.get_contexts_cache().get('short') is None
+
+
+def test_in_memory_contexts_follow_dropped_collections():
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+    context = contexts.get(Headers({'x-token': token}), {})
+    dogs = context.collection('dogs')
+
+    async def run():
+        await dogs.insert_one({'code': 1})
+        await context.db.drop_collection('dogs')
+
+        assert await dogs.count_documents({}) == 0
+        assert await context.collection('dogs').count_documents({}) == 0
+
+    asyncio.run(run())
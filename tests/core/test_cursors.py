@@ -0,0 +1,59 @@
+import pytest
+
+from bson import ObjectId
+
+from app.core import exceptions
+from app.core.cursors import Cursor
+
+
+def test_cursor_encode_decode():
+    id = ObjectId()
+    cursor = Cursor.decode(Cursor('age', 3, id).encode())
+
+    assert (cursor.key, cursor.value, cursor.id) == ('age', 3, id)
+
+
+def test_cursor_decode_empty_starts_walk():
+    cursor = Cursor.decode('', 'age')
+
+    assert cursor.key == 'age'
+    assert not cursor.started
+    assert cursor.query({'foo': 'bar'}) == {'foo': 'bar'}
+
+
+def test_cursor_decode_invalid():
+    with pytest.raises(exceptions.BadRequest):
+        Cursor.decode('not-a-cursor')
+
+
+def test_cursor_decode_wrong_shape():
+    # base64 of [1,2,3], {"a":1} and ["a",1]
+    for token in ('WzEsMiwzXQ==', 'eyJhIjoxfQ==', 'WyJhIiwxXQ=='):
+        with pytest.raises(exceptions.BadRequest):
+            Cursor.decode(token)
+
+
+def test_cursor_invalid_key():
+    with pytest.raises(exceptions.BadRequest):
+        Cursor('$where')
+
+
+def test_cursor_query_by_id():
+    id = ObjectId()
+    cursor = Cursor('_id', id, id)
+
+    assert cursor.sort() == [('_id', 1)]
+    assert cursor.query({}) == {'_id': {'$gt': id}}
+
+
+def test_cursor_query_by_key():
+    id = ObjectId()
+    cursor = Cursor('owner.age', None, None).next({'_id': id, 'owner': {'age': 7}})
+
+    assert cursor.sort() == [('owner.age', 1), ('_id', 1)]
+    assert cursor.query({'foo': 'bar'}) == {
+        '$and': [
+            {'foo': 'bar'},
+            {'$or': [{'owner.age': {'$gt': 7}}, {'owner.age': 7, '_id': {'$gt': id}}]}
+        ]
+    }
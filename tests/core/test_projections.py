@@ -0,0 +1,59 @@
+import pytest
+
+from app.core import exceptions
+from app.core.projections import pop_field, widen
+from app.core.schemas import ProjectionRequest
+
+
+def test_projection_request_default():
+    assert ProjectionRequest().get_projection() == {'_id': 0}
+
+
+def test_projection_request_fields():
+    projection = ProjectionRequest(include='name, owner.name').get_projection()
+    assert projection == {'_id': 0, 'name': 1, 'owner.name': 1}
+
+
+def test_projection_request_exclude():
+    projection = ProjectionRequest(exclude='owner').get_projection()
+    assert projection == {'_id': 0, 'owner': 0}
+
+
+def test_projection_request_fields_and_exclude():
+    with pytest.raises(exceptions.BadRequest):
+        ProjectionRequest(include='name', exclude='owner').get_projection()
+
+
+def test_projection_request_invalid_field():
+    with pytest.raises(exceptions.BadRequest):
+        ProjectionRequest(include='$where').get_projection()
+
+
+def test_widen_inclusion():
+    projection, hidden = widen({'_id': 0, 'name': 1}, ['age', '_id'])
+
+    assert projection == {'name': 1, 'age': 1, '_id': 1}
+    assert set(hidden) == {'_id', 'age'}
+
+
+def test_widen_inclusion_already_included():
+    projection, hidden = widen({'_id': 0, 'owner': 1}, ['owner.age'])
+
+    assert projection == {'_id': 0, 'owner': 1}
+    assert hidden == []
+
+
+def test_widen_exclusion():
+    projection, hidden = widen({'_id': 0, 'owner': 0, 'name': 0}, ['owner.age', '_id'])
+
+    assert projection == {'name': 0}
+    assert hidden == ['owner', '_id']
+
+
+def test_pop_field():
+    document = {'owner': {'name': 'Ada', 'age': 36}, 'name': 'Rex'}
+
+    pop_field(document, 'owner.age')
+    pop_field(document, 'missing.field')
+
+    assert document == {'owner': {'name': 'Ada'}, 'name': 'Rex'}
@@ -0,0 +1,54 @@
+import datetime
+import json
+
+import pytest
+
+from bson import Decimal128, ObjectId
+
+from app.core import responses
+from app.core.schemas import PageRequest, PaginatedResponse
+
+
+DOCUMENT = {
+    '_id': ObjectId('65f1c0ffee0000000000beef'),
+    'born': datetime.datetime(2020, 1, 1, 12, 30),
+    'price': Decimal128('19.99'),
+    'name': 'Zé',
+}
+
+EXPECTED = {
+    '_id': '65f1c0ffee0000000000beef',
+    'born': '2020-01-01T12:30:00',
+    'price': '19.99',
+    'name': 'Zé',
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(responses, 'orjson', None)
+    elif responses.orjson is None:
+        pytest.skip('orjson is not installed')
+
+    return responses.dumps
+
+
+def test_dumps_bson_types(encoder):
+    assert json.loads(encoder(DOCUMENT)) == EXPECTED
+
+
+def test_dumps_paginated_response(encoder):
+    page = PaginatedResponse.render(PageRequest(), [DOCUMENT], 1)
+    content = json.loads(encoder(page))
+
+    assert content['data'] == [EXPECTED]
+    assert content['metadata']['totalCount'] == 1
+    assert content['metadata']['nextOffset'] is None
+
+
+def test_fast_json_response():
+    response = responses.FastJSONResponse(DOCUMENT, status_code=201)
+
+    assert response.status_code == 201
+    assert json.loads(response.body) == EXPECTED
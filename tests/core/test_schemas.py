@@ -0,0 +1,59 @@
+import pytest
+
+from app.core import exceptions
+from app.core.schemas import PageRequest, PaginatedResponse
+
+
+def test_render_exact_count():
+    page = PageRequest(offset=0, limit=2)
+    response = PaginatedResponse.render(page, [{}, {}], 3)
+
+    assert response.metadata.count == 2
+    assert response.metadata.next_offset == 2
+    assert response.metadata.count_mode == 'exact'
+
+
+def test_render_without_count():
+    page = PageRequest(offset=2, limit=2, count='none')
+    response = PaginatedResponse.render(page, [{}, {}], None)
+
+    assert response.metadata.total_count is None
+    assert response.metadata.count == 4
+    assert response.metadata.next_offset == 4
+    assert response.metadata.count_mode == 'none'
+
+
+def test_render_estimated_count_last_page():
+    page = PageRequest(offset=1000, limit=2, count='estimated')
+    response = PaginatedResponse.render(page, [{}], 1000)
+
+    assert response.metadata.count == 1001
+    assert response.metadata.next_offset is None
+
+
+def test_render_keyset():
+    page = PageRequest(cursor='', limit=2)
+    response = PaginatedResponse.render(page, [{}, {}], 10)
+
+    assert response.metadata.next_cursor is None
+    assert response.metadata.next_offset is None
+
+
+def test_page_request_sort():
+    page = PageRequest(sort='breed, -age,+name')
+    assert page.get_sort() == [('breed', 1), ('age', -1), ('name', 1)]
+
+
+def test_page_request_sort_invalid_field():
+    with pytest.raises(exceptions.BadRequest):
+        PageRequest(sort='-$natural').get_sort()
+
+
+def test_page_request_sort_with_cursor():
+    with pytest.raises(exceptions.BadRequest):
+        PageRequest(sort='age', cursor='').get_cursor()
+
+
+def test_render_warnings():
+    response = PaginatedResponse.render(PageRequest(), [], 0, warnings=['not covered'])
+    assert response.metadata.warnings == ['not covered']
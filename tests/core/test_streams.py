@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+
+from datetime import datetime
+
+from app.core import exceptions, streams
+
+
+async def documents():
+    yield {'name': 'Rex', 'born': datetime(2020, 1, 1)}
+    yield {'name': 'Ace'}
+
+
+async def collect(chunks) -> bytes:
+    return b''.join([chunk async for chunk in chunks])
+
+
+def test_ndjson():
+    output = asyncio.run(collect(streams.ndjson(documents())))
+    assert output == b'{"name":"Rex","born":"2020-01-01T00:00:00"}\n{"name":"Ace"}\n'
+
+
+def test_json_array():
+    output = asyncio.run(collect(streams.json_array(documents())))
+    assert output == b'[{"name":"Rex","born":"2020-01-01T00:00:00"},{"name":"Ace"}]'
+
+
+def test_json_array_empty():
+    async def empty():
+        return
+        yield
+
+    assert asyncio.run(collect(streams.json_array(empty()))) == b'[]'
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_parse_ndjson():
+    data = '{"name": "Rex"}\n\n{"name": "Zé"}\n{"age": 3}'.encode()
+    parsed = asyncio.run(collect_values(streams.parse_ndjson(chunked(data, 5))))
+
+    assert parsed == [{'name': 'Rex'}, {'name': 'Zé'}, {'age': 3}]
+
+
+def test_parse_json_array():
+    data = ' [{"name": "Zé", "tags": [1, 2]}, 123, {"age": 3}] '.encode()
+
+    for size in (1, 3, len(data)):
+        parsed = asyncio.run(collect_values(streams.parse_json_array(chunked(data, size))))
+        assert parsed == [{'name': 'Zé', 'tags': [1, 2]}, 123, {'age': 3}]
+
+
+def test_parse_json_array_invalid():
+    with pytest.raises(exceptions.BadRequest):
+        asyncio.run(collect_values(streams.parse_json_array(chunked(b'[{"name": }]', 4))))
+
+    with pytest.raises(exceptions.BadRequest):
+        asyncio.run(collect_values(streams.parse_json_array(chunked(b'[{"name": 1}', 4))))
+
+
+async def collect_values(values) -> list:
+    return [value async for value in values]
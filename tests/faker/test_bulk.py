@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.faker import bulk, compiler
+from app.faker.services import FakerService
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(bulk, 'numpy', None)
+
+    return request.param
+
+
+def test_ints_and_bools(backend):
+    ints = bulk.ints(random.Random(1), 1000)
+    bools = bulk.bools(random.Random(1), 1000)
+
+    assert all(isinstance(value, int) and 0 <= value <= 9999 for value in ints)
+    assert all(isinstance(value, bool) for value in bools)
+    assert 400 < sum(bools) < 600
+
+
+def test_floats(backend):
+    floats = bulk.floats(random.Random(1), 1000)
+
+    assert all(isinstance(value, float) and abs(value) < 10 ** 14 for value in floats)
+    assert 400 < sum(value < 0 for value in floats) < 600
+
+
+def test_numbers(backend):
+    numbers = bulk.numbers(random.Random(1), 1000)
+    assert {type(value) for value in numbers} == {int, float}
+
+
+def test_draws_are_reproducible(backend):
+    assert bulk.floats(random.Random(7), 100) == bulk.floats(random.Random(7), 100)
+
+
+def test_get_provider():
+    assert bulk.get_provider('@int') is bulk.ints
+    assert bulk.get_provider('@pyfloat') is bulk.floats
+    assert bulk.get_provider('@firstName') is None
+    assert bulk.get_provider('int') is None
+
+
+def test_compile_each_in_bulk():
+    service = FakerService()
+    schema = {'@each': {'count': 100, 'schema': {'name': '@firstName', 'age': '@int', 'ok': '@bool'}}}
+
+    records = compiler.compile_schema(schema, service)(service)
+
+    assert len(records) == 100
+    assert all(list(record) == ['name', 'age', 'ok'] for record in records)
+    assert all(isinstance(record['name'], str) and 0 <= record['age'] <= 9999 for record in records)
+
+
+def test_bulk_aggregation():
+    service = FakerService()
+    each = {'count': 100, 'schema': '@int', 'embeded': True, 'operator': '+'}
+
+    total = compiler.compile_schema({'@each': each}, service)(service)
+
+    assert isinstance(total, int) and 0 <= total <= 100 * 9999
+
+
+def test_bulk_in_seeded_records():
+    service = FakerService()
+    schema = {'scores': {'@each': {'count': 50, 'schema': '@float'}}}
+
+    assert service.fake_records(schema, 1, 3, 1) == service.fake_records(schema, 1, 3, 1)
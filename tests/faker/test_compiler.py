@@ -0,0 +1,72 @@
+import pytest
+
+from app.core import exceptions
+from app.faker import compiler
+from app.faker.services import FakerService
+
+
+@pytest.fixture(scope='module')
+def faker():
+    return FakerService()
+
+
+def test_compile_constants(faker):
+    plan = compiler.compile_schema({'name': 'Rex', 'age': 3, 'tags': ['a', ['b', 'c']]}, faker)
+    assert plan(faker) == {'name': 'Rex', 'age': 3, 'tags': ['a', 'b', 'c']}
+
+
+def test_compile_templates(faker):
+    plan = compiler.compile_schema({'@firstName': '@simpleProfile.sex', 'age': '@int'}, faker)
+    faked = plan(faker)
+
+    (name, sex), (_, age) = faked.items()
+    assert isinstance(name, str)
+    assert sex in ('M', 'F')
+    assert isinstance(age, int)
+
+
+def test_compile_each(faker):
+    plan = compiler.compile_schema({'@each': {'count': 3, 'schema': {'name': '@firstName'}}}, faker)
+    faked = plan(faker)
+
+    assert len(faked) == 3
+    assert all(isinstance(element['name'], str) for element in faked)
+
+
+def test_compile_each_embeded(faker):
+    plan = compiler.compile_schema({'@each': {'count': 3, 'schema': 'a', 'embeded': True, 'separator': '-'}}, faker)
+    assert plan(faker) == 'a-a-a'
+
+    plan = compiler.compile_schema({'@each': {'count': 4, 'schema': 2, 'embeded': True, 'operator': '*'}}, faker)
+    assert plan(faker) == 16
+
+    plan = compiler.compile_schema({'@each': {'count': 2, 'schema': [1, 2], 'embeded': True}}, faker)
+    assert plan(faker) == [1, 2, 1, 2]
+
+
+def test_compile_invalid_provider(faker):
+    with pytest.raises(exceptions.BadRequest):
+        compiler.compile_schema({'name': '@notAProvider'}, faker)
+
+    with pytest.raises(exceptions.BadRequest):
+        compiler.compile_schema('@seedInstance', faker)
+
+
+def test_compile_invalid_count(faker):
+    with pytest.raises(exceptions.BadRequest):
+        compiler.compile_schema({'@each': {'count': '3', 'schema': 'a'}}, faker)
+
+
+def test_get_plan_cached(faker):
+    schema = {'name': '@firstName', 'cached': True}
+
+    assert compiler.get_plan(schema, faker) is compiler.get_plan(dict(schema), faker)
+    assert compiler.get_plan(schema, faker) is not compiler.get_plan({'cached': True, 'name': '@firstName'}, faker)
+
+
+def test_get_plan_per_locale():
+    schema = {'prefecture': '@prefecture'}
+    compiler.get_plan(schema, FakerService('ja_JP'))
+
+    with pytest.raises(exceptions.BadRequest):
+        compiler.get_plan(schema, FakerService('en_US'))
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.faker.engine import GenerationEngine, generate_chunk, get_each, get_faker_parallel_threshold
+
+
+SCHEMA = {'name': '@firstName', 'age': '@int'}
+
+
+@pytest.fixture(scope='module')
+def engine():
+    engine = GenerationEngine(workers=2, chunk_size=3)
+    yield engine
+    engine.shutdown()
+
+
+async def collect(chunks) -> list:
+    return [chunk async for chunk in chunks]
+
+
+def test_generate_in_ordered_chunks(engine):
+    chunks = asyncio.run(collect(engine.generate(SCHEMA, 8, 'en_US', seed=42)))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+    assert chunks[0] == generate_chunk(SCHEMA, 'en_US', 42, 0, 3)
+    assert chunks[2] == generate_chunk(SCHEMA, 'en_US', 42, 6, 2)
+
+
+def test_generate_is_reproducible(engine):
+    first = asyncio.run(collect(engine.records(SCHEMA, 7, 'en_US', seed=7)))
+    second = asyncio.run(collect(engine.records(SCHEMA, 7, 'en_US', seed=7)))
+
+    assert len(first) == 7
+    assert first == second
+
+
+def test_generate_from_any_record(engine):
+    records = asyncio.run(collect(engine.records(SCHEMA, 10, 'en_US', seed=7)))
+    tail = asyncio.run(collect(engine.records(SCHEMA, 6, 'en_US', seed=7, start=4)))
+
+    assert tail == records[4:]
+
+
+def test_get_each(monkeypatch):
+    monkeypatch.setenv('FAKER_PARALLEL_THRESHOLD', '10')
+    get_faker_parallel_threshold.cache_clear()
+
+    try:
+        assert get_each({'@each': {'count': 10, 'schema': SCHEMA}}) == {'count': 10, 'schema': SCHEMA}
+        assert get_each({'@each': {'count': 9, 'schema': SCHEMA}}) is None
+        assert get_each({'@each': {'count': 10, 'schema': SCHEMA, 'embeded': True}}) is None
+        assert get_each(SCHEMA) is None
+    finally:
+        get_faker_parallel_threshold.cache_clear()
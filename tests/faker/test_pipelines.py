@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.faker.pipelines import Pipeline, rebatch
+
+
+class SlowRepository:
+    def __init__(self, fail_on: int | None = None) -> None:
+        self.documents = []
+        self.fail_on = fail_on
+
+    async def insert_batch(self, batch: list[dict]) -> int:
+        await asyncio.sleep(0.001)
+
+        if self.fail_on is not None and len(self.documents) >= self.fail_on:
+            raise RuntimeError("write failed")
+
+        self.documents.extend(batch)
+        return len(batch) - sum(1 for document in batch if document.get('duplicate'))
+
+
+async def chunks(count: int, size: int, produced: list):
+    for start in range(0, count, size):
+        chunk = [{'n': n} for n in range(start, min(start + size, count))]
+        produced.append(len(chunk))
+        yield chunk
+
+
+async def collect(updates) -> list:
+    return [update async for update in updates]
+
+
+def test_rebatch():
+    batches = asyncio.run(collect(rebatch(chunks(10, 4, []), 3)))
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+
+def test_pipeline_progress():
+    repository = SlowRepository()
+    pipeline = Pipeline(repository, concurrency=2, queue_size=2)
+
+    updates = asyncio.run(collect(pipeline.run(rebatch(chunks(25, 5, []), 5))))
+
+    assert len(repository.documents) == 25
+    assert [update.batches for update in updates[:-1]] == [1, 2, 3, 4, 5]
+    assert updates[-1].done and updates[-1].inserted == 25 and updates[-1].generated == 25
+
+
+def test_pipeline_backpressure():
+    produced = []
+    lag = []
+
+    async def run() -> None:
+        pipeline = Pipeline(SlowRepository(), concurrency=2, queue_size=2)
+
+        async for update in pipeline.run(chunks(100, 1, produced)):
+            lag.append(sum(produced) - update.inserted)
+
+    asyncio.run(run())
+
+    # queued batches + the ones being written + the one waiting to be queued
+    assert max(lag) <= 2 + 2 + 1
+
+
+def test_pipeline_write_error():
+    pipeline = Pipeline(SlowRepository(fail_on=3), concurrency=2, queue_size=2)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.summary(chunks(10, 1, [])))
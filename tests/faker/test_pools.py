@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.core import exceptions
+from app.faker.pools import FakerPool
+
+
+def test_pool_checkout_is_exclusive():
+    pool = FakerPool(size=2)
+
+    async def checkout_three():
+        async with pool.checkout('pt_PT') as first, pool.checkout('pt-PT') as second:
+            assert first is not second
+            assert first.random is not second.random
+
+            waiting = asyncio.create_task(get_third())
+            await asyncio.sleep(0)
+            assert not waiting.done()
+
+        return await waiting
+
+    async def get_third():
+        async with pool.checkout('pt_PT') as third:
+            return third
+
+    assert asyncio.run(checkout_three()) is not None
+    assert pool.queues['pt_PT'].qsize() == 2
+
+
+def test_pool_invalid_locale():
+    with pytest.raises(exceptions.BadRequest):
+        FakerPool(size=1).warm(('xx_XX',))
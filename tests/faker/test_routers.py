@@ -0,0 +1,27 @@
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.core import tokens
+from app.main import app
+from app.storage import engines
+
+
+@pytest.fixture
+def client():
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+    return TestClient(app, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_virtual_resource_on_memory(client):
+    schema = {'@each': {'count': 3, 'schema': {'name': '@firstName'}}}
+
+    assert client.put('/@faker/people', params={'__seed': 1}, json=schema).status_code == 200
+    assert client.get('/@faker/people').json()['metadata']['totalCount'] == 3
+    assert client.get('/@faker/people/2').status_code == 200
+
+
+def test_pipelined_each_counts_one_by_default(client):
+    response = client.post('/@faker/dogs', params={'__pipeline': 'true'}, json={'@each': {'schema': {'age': '@int'}}})
+
+    assert response.json()['inserted'] == 1
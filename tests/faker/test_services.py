@@ -0,0 +1,39 @@
+from app.faker.services import FakerService
+
+
+SCHEMA = {'name': '@firstName', 'age': '@int', 'tags': ['@word', '@word']}
+
+
+def test_seeded_fake_is_reproducible():
+    each = {'@each': {'count': 5, 'schema': SCHEMA}}
+
+    first = FakerService().fake(each, seed=1)
+    second = FakerService().fake(each, seed=1)
+
+    assert len(first) == 5
+    assert first == second
+    assert first != FakerService().fake(each, seed=2)
+
+
+def test_seeded_records_only_depend_on_seed_and_index():
+    service = FakerService()
+    records = service.fake_records(SCHEMA, 3, 0, 10)
+
+    assert service.fake_records(SCHEMA, 3, 7, 1) == records[7:8]
+    assert service.fake_records(SCHEMA, 3, 4, 6) == records[4:]
+
+
+def test_seeded_fake_of_a_single_record():
+    service = FakerService()
+    assert service.fake(SCHEMA, seed=5) == service.fake_records(SCHEMA, 5, 0, 1)[0]
+
+
+def test_seeded_fake_reseeds_the_instance():
+    service = FakerService()
+    service.fake_records(SCHEMA, 1, 0, 1)
+    after_first = service.faker.pyint(max_value=10 ** 9)
+
+    service.fake_records(SCHEMA, 1, 0, 1)
+    after_second = service.faker.pyint(max_value=10 ** 9)
+
+    assert after_first != after_second
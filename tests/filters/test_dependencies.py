@@ -0,0 +1,27 @@
+import re
+
+from app.core.caches import LRUCache
+from app.filters.dependencies import get_filter_id, get_filter_primary_key, get_filters, get_filters_registry, get_ids_keys_candidates
+
+
+def test_get_filters_caches_plan():
+    plans = LRUCache()
+    registry = get_filters_registry()
+
+    first = get_filters({'name__icontains': 'rex', 'age__gt': '3'}, registry, plans)
+    second = get_filters({'age__gt': '3', 'name__icontains': 'rex'}, registry, plans)
+
+    assert first is second
+    assert isinstance(first['name']['$regex'], re.Pattern)
+    assert plans.info()['hits'] == 1
+    assert plans.info()['misses'] == 1
+
+
+def test_get_filter_primary_key():
+    assert get_filter_primary_key('rex', 'code') == {'code': 'rex'}
+    assert get_filter_primary_key('42', 'code') == {'code': {'$in': ['42', 42]}}
+    assert get_filter_primary_key('4.2', 'code') == {'code': {'$in': ['4.2', 4.2]}}
+
+
+def test_get_filter_id_tries_every_candidate():
+    assert len(get_filter_id('rex', get_ids_keys_candidates())['$or']) == len(get_ids_keys_candidates())
@@ -0,0 +1,86 @@
+import asyncio
+
+from app.indexes import services
+
+
+class Metadata:
+    def __init__(self):
+        self.documents = {}
+        self.calls = 0
+
+    async def find_one(self, query):
+        self.calls += 1
+        return self.documents.get(query['_id'])
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.setdefault(query['_id'], {'_id': query['_id']})
+        document.update(update.get('$set', {}))
+
+        for field in update.get('$unset', {}):
+            document.pop(field, None)
+
+
+class Database:
+    name = 'token'
+
+    def __init__(self):
+        self.metadata = Metadata()
+
+    def __getitem__(self, name):
+        assert name == services.METADATA_COLLECTION
+        return self.metadata
+
+
+class Collection:
+    name = 'dogs'
+    calls = 0
+
+    def __init__(self):
+        self.database = Database()
+
+    async def index_information(self):
+        self.calls += 1
+        return {
+            '_id_': {'key': [('_id', 1)]},
+            'breed_1_age_-1': {'key': [('breed', 1), ('age', -1)]},
+        }
+
+
+def test_is_sort_covered():
+    indexes = [[('_id', 1)], [('breed', 1), ('age', -1)]]
+
+    assert services.is_sort_covered([('_id', -1)], indexes)
+    assert services.is_sort_covered([('breed', 1)], indexes)
+    assert services.is_sort_covered([('breed', -1), ('age', 1)], indexes)
+    assert not services.is_sort_covered([('breed', 1), ('age', 1)], indexes)
+    assert not services.is_sort_covered([('age', -1)], indexes)
+
+
+def test_check_sort_caches_indexes():
+    collection = Collection()
+    services.invalidate_indexes(collection)
+
+    assert asyncio.run(services.check_sort(collection, [('breed', 1), ('age', -1)])) == []
+    assert len(asyncio.run(services.check_sort(collection, [('name', 1)]))) == 1
+    assert collection.calls == 1
+
+    services.invalidate_indexes(collection)
+    asyncio.run(services.check_sort(collection, [('name', 1)]))
+    assert collection.calls == 2
+
+
+def test_primary_key_is_cached():
+    collection = Collection()
+    metadata = collection.database.metadata
+    services.get_primary_keys_cache().clear()
+
+    assert asyncio.run(services.get_primary_key(collection)) is None
+    assert asyncio.run(services.get_primary_key(collection)) is None
+    assert metadata.calls == 1
+
+    asyncio.run(services.set_primary_key(collection, 'code'))
+    assert asyncio.run(services.get_primary_key(collection)) == 'code'
+    assert metadata.calls == 2
+
+    asyncio.run(services.set_primary_key(collection, None))
+    assert asyncio.run(services.get_primary_key(collection)) is None
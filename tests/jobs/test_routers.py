@@ -0,0 +1,14 @@
+from fastapi.testclient import TestClient
+
+from app.core import tokens
+from app.main import app
+from app.storage import engines
+
+
+def test_seed_each_counts_one_by_default():
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+
+    with TestClient(app, headers={'Authorization': f'Bearer {token}'}) as client:
+        response = client.post('/@jobs/seed/dogs', json={'@each': {'schema': {'age': '@int'}}})
+
+    assert response.status_code == 202
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+
+from app.jobs.schemas import JobProgress, JobResponse, now
+from app.jobs.services import Job, JobQueue
+
+
+class MemoryJobRepository:
+    def __init__(self) -> None:
+        self.jobs: dict[str, dict] = {}
+
+    async def update(self, id: str, **fields) -> None:
+        self.jobs.setdefault(id, {}).update(fields)
+
+    async def beat(self, id: str, progress: JobProgress | None = None) -> bool:
+        await self.update(id, heartbeat_at=now())
+
+        if progress is not None:
+            await self.update(id, progress=progress.model_dump())
+
+        return self.jobs[id].get("cancel_requested", False)
+
+
+def counting(total: int, delay: float = 0.0, fail_at: int | None = None):
+    async def work(job: Job):
+        for processed in range(1, total + 1):
+            await asyncio.sleep(delay)
+
+            if processed == fail_at:
+                raise RuntimeError("boom")
+
+            yield JobProgress(processed=processed)
+
+        job.result = {"total": total}
+
+    return work
+
+
+async def wait(repository: MemoryJobRepository, id: str, *statuses: str) -> dict:
+    while repository.jobs.get(id, {}).get("status") not in statuses:
+        await asyncio.sleep(0.005)
+
+    return repository.jobs[id]
+
+
+def test_job_succeeds():
+    async def run() -> dict:
+        queue, repository = JobQueue(concurrency=1, heartbeat=0.01), MemoryJobRepository()
+        queue.submit(Job("a", repository, counting(3)))
+        job = await wait(repository, "a", "succeeded")
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["result"] == {"total": 3}
+    assert job["progress"]["processed"] == 3
+
+
+def test_job_fails():
+    async def run() -> dict:
+        queue, repository = JobQueue(concurrency=1, heartbeat=0.01), MemoryJobRepository()
+        queue.submit(Job("a", repository, counting(3, fail_at=2)))
+        job = await wait(repository, "a", "failed")
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["errors"] == ["boom"]
+    assert job["progress"]["processed"] == 1
+
+
+def test_concurrency_and_cancel_requests():
+    async def run() -> tuple[dict, dict]:
+        queue, repository = JobQueue(concurrency=1, heartbeat=0.01), MemoryJobRepository()
+        queue.submit(Job("a", repository, counting(1000, delay=0.01)))
+        queue.submit(Job("b", repository, counting(1)))
+
+        await wait(repository, "a", "running")
+        assert "status" not in repository.jobs.get("b", {}) # waits for a free slot
+
+        while not repository.jobs["a"].get("progress", {}).get("processed"):
+            await asyncio.sleep(0.005)
+
+        repository.jobs["a"]["cancel_requested"] = True # through another worker
+        a = await wait(repository, "a", "cancelled")
+        b = await wait(repository, "b", "succeeded")
+        await queue.stop()
+        return a, b
+
+    a, b = asyncio.run(run())
+
+    assert 0 < a["progress"]["processed"] < 1000
+    assert b["result"] == {"total": 1}
+
+
+def test_stop_interrupts_running_jobs():
+    async def run() -> dict:
+        queue, repository = JobQueue(concurrency=1, heartbeat=0.01), MemoryJobRepository()
+        queue.submit(Job("a", repository, counting(1000, delay=0.01)))
+        await wait(repository, "a", "running")
+        await queue.stop()
+        return repository.jobs["a"]
+
+    assert asyncio.run(run())["status"] == "interrupted"
+
+
+def test_render_stale_jobs_as_interrupted():
+    job = {
+        "_id": "a",
+        "kind": "seed",
+        "resource": "dogs",
+        "status": "running",
+        "created_at": now(),
+        "heartbeat_at": now() - datetime.timedelta(seconds=60),
+    }
+
+    assert JobResponse.render(job, stale_after=10).status == "interrupted"
+    assert JobResponse.render(job | {"heartbeat_at": now()}, stale_after=10).status == "running"
+    assert JobResponse.render(job | {"status": "succeeded"}, stale_after=10).status == "succeeded"
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import listeners, services
+from app.metrics.middlewares import MetricsMiddleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = services.Histogram('test_seconds', 'Test.', ('route',), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/{id}')
+
+    assert histogram.render().splitlines() == [
+        '# HELP test_seconds Test.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{route="/{id}",le="0.1"} 2',
+        'test_seconds_bucket{route="/{id}",le="1.0"} 3',
+        'test_seconds_bucket{route="/{id}",le="+Inf"} 4',
+        'test_seconds_sum{route="/{id}"} 3.650000',
+        'test_seconds_count{route="/{id}"} 4',
+    ]
+
+
+def test_labels_are_escaped():
+    assert services.format_labels(('name',), ('a"b\\c\n',)) == '{name="a\\"b\\\\c\\n"}'
+
+
+def test_timed_records_on_the_current_request(monkeypatch):
+    monkeypatch.setattr(services, 'get_metrics_enabled', lambda: True)
+    timings = services.Timings()
+    token = services.current.set(timings)
+
+    try:
+        with services.timed('filters'):
+            pass
+
+        listeners.CommandTimer().succeeded(SimpleNamespace(command_name='find', duration_micros=1500))
+    finally:
+        services.current.reset(token)
+
+    header = timings.header(0.01)
+
+    assert header.startswith('app;dur=10.000, filters;dur=')
+    assert 'db;dur=1.500;desc="1x"' in header
+
+
+def test_middleware_times_routes():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get('/things/{id}')
+    async def get_thing(id: str):
+        services.record('db', 0.002)
+        return {'id': id}
+
+    response = TestClient(app).get('/things/1')
+
+    assert response.headers['server-timing'].startswith('app;dur=')
+    assert 'db;dur=2.000' in response.headers['server-timing']
+    assert 'lorem_http_request_duration_seconds_count{method="GET",route="/things/{id}",status="200"}' in services.registry.render()
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import exceptions, tokens
+from app.main import app as main_app
+from app.quotas import services
+from app.quotas.middlewares import QuotaMiddleware
+from app.storage import engines
+
+
+OPTIONS = {'concurrency': 0, 'requests_per_second': 0, 'requests_burst': 0, 'writes_per_second': 0, 'writes_burst': 0}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def quotas(monkeypatch):
+    # enables the quotas given to the fixture, on a fresh registry
+    def enable(**options):
+        monkeypatch.setattr(services, 'get_quotas_enabled', lambda: True)
+        monkeypatch.setattr(services, 'get_quota_options', lambda: OPTIONS | options)
+        services.get_quotas().clear()
+
+    yield enable
+    services.get_quotas().clear()
+
+
+def test_token_bucket_refills_up_to_its_capacity():
+    clock = Clock()
+    bucket = services.TokenBucket(rate=2, capacity=4, clock=clock)
+
+    assert [bucket.take() for _ in range(5)] == [0.0, 0.0, 0.0, 0.0, 0.5]
+
+    clock.now = 10.0
+    assert bucket.take(4) == 0.0
+    assert bucket.take() == 0.5
+
+
+def test_token_bucket_lets_large_takes_through_into_debt():
+    clock = Clock()
+    bucket = services.TokenBucket(rate=100, capacity=100, clock=clock)
+
+    assert bucket.take(1000) == 0.0
+    assert bucket.take(10) == pytest.approx(9.1)
+
+
+def test_quota_limits_requests_in_flight():
+    quota = services.Quota(OPTIONS | {'concurrency': 2})
+    quota.enter()
+    quota.enter()
+
+    with pytest.raises(exceptions.TooManyRequests) as error:
+        quota.enter()
+
+    assert error.value.headers == {'Retry-After': '1'}
+
+    quota.leave()
+    quota.enter()
+
+
+def test_quota_throttles_streamed_writes(monkeypatch):
+    clock = Clock()
+    quota = services.Quota(OPTIONS | {'writes_per_second': 1000, 'writes_burst': 1000}, clock)
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+        clock.now += seconds
+
+    async def main():
+        await quota.throttle_writes(1000)
+        await quota.throttle_writes(500)
+
+    monkeypatch.setattr(services.asyncio, 'sleep', sleep)
+    asyncio.run(main())
+
+    assert waits == [0.5]
+
+
+def test_middleware_answers_429_with_retry_after(quotas):
+    quotas(requests_per_second=1, requests_burst=2)
+    app = FastAPI()
+    app.add_middleware(QuotaMiddleware)
+
+    @app.get('/things')
+    async def get_things():
+        return []
+
+    client = TestClient(app, headers={'Authorization': f'Bearer {tokens.generate(24)}'})
+    statuses = [client.get('/things').status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert client.get('/things').headers['retry-after'] == '1'
+    assert TestClient(app).get('/things').status_code == 200 # no token, no quota
+
+
+def test_writes_past_the_quota_are_refused(quotas):
+    quotas(writes_per_second=3, writes_burst=3)
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+    client = TestClient(main_app, headers={'Authorization': f'Bearer {token}'})
+
+    assert client.post('/dogs', json=[{'code': code} for code in range(3)]).status_code == 201
+
+    response = client.post('/dogs', json={'code': 3})
+
+    assert response.status_code == 429
+    assert 'retry-after' in response.headers
+    assert client.get('/dogs').json()['metadata']['totalCount'] == 3
+
+
+def test_bulk_writes_are_charged_by_documents(quotas):
+    quotas(writes_per_second=5, writes_burst=5)
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+    client = TestClient(main_app, headers={'Authorization': f'Bearer {token}'})
+    client.post('/dogs', json=[{'code': code, 'age': 1} for code in range(3)])
+
+    bulk = {'operations': [{'update': {'filter': {'age': 1}, 'inc': {'age': 1}, 'many': True}}]}
+
+    assert client.post('/dogs/@bulk', json=bulk).json()['modified'] == 3
+    assert client.post('/dogs', json={'code': 3}).status_code == 429
@@ -0,0 +1,101 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.core.caches import MemoryBackend
+from app.core.responses import FastJSONResponse
+from app.resources import caches
+
+
+class Database:
+    name = 'token'
+
+
+class Collection:
+    database = Database()
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def get_request(path: str, query: str = '') -> Request:
+    return Request({'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': []})
+
+
+def test_cached_responses(monkeypatch):
+    responses = caches.ResponseCache(MemoryBackend(), ttl=60)
+    monkeypatch.setattr(caches, 'get_response_cache', lambda: responses)
+
+    dogs, cats = Collection('dogs'), Collection('cats')
+    renders = []
+
+    async def render():
+        renders.append(1)
+        return FastJSONResponse({'renders': len(renders)})
+
+    async def run() -> list[str]:
+        first = await caches.cached(get_request('/dogs', 'b=2&a=1'), dogs, render)
+        again = await caches.cached(get_request('/dogs', 'a=1&b=2'), dogs, render) # same query, other order
+
+        await responses.invalidate(cats)
+        still = await caches.cached(get_request('/dogs', 'a=1&b=2'), dogs, render)
+
+        await responses.invalidate(dogs)
+        after = await caches.cached(get_request('/dogs', 'a=1&b=2'), dogs, render)
+
+        return [response.headers['x-cache'] for response in (first, again, still, after)]
+
+    assert asyncio.run(run()) == ['MISS', 'HIT', 'HIT', 'MISS']
+    assert len(renders) == 2
+    assert responses.info()['hit_rate'] == 0.5
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setattr(caches, 'get_response_cache', lambda: caches.ResponseCache(MemoryBackend(), ttl=0))
+
+    async def render():
+        return FastJSONResponse({})
+
+    response = asyncio.run(caches.cached(get_request('/dogs'), Collection('dogs'), render))
+    assert 'x-cache' not in response.headers
+
+
+def get_conditional(path: str, etag: str) -> Request:
+    headers = [(b'if-none-match', etag.encode())]
+    return Request({'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': headers})
+
+
+def test_etags(monkeypatch):
+    responses = caches.ResponseCache(MemoryBackend(), ttl=0, etag_max_age=60)
+    monkeypatch.setattr(caches, 'get_response_cache', lambda: responses)
+    dogs = Collection('dogs')
+    renders = []
+
+    async def render():
+        renders.append(1)
+        return FastJSONResponse({})
+
+    async def run() -> list[int]:
+        etag = (await caches.cached(get_request('/dogs'), dogs, render)).headers['etag']
+
+        unchanged = await caches.cached(get_conditional('/dogs', f'"other", {etag}'), dogs, render)
+        other_page = await caches.cached(get_conditional('/cats', etag), dogs, render)
+
+        await responses.invalidate(dogs)
+        changed = await caches.cached(get_conditional('/dogs', etag), dogs, render)
+
+        assert unchanged.headers['etag'] == etag
+        return [unchanged.status_code, other_page.status_code, changed.status_code]
+
+    assert asyncio.run(run()) == [304, 200, 200]
+    assert len(renders) == 3
+
+
+def test_etags_expire():
+    responses = caches.ResponseCache(MemoryBackend(), ttl=0, etag_max_age=10)
+    etag = responses.get_etag(0, 'dogs')
+
+    assert responses.match_etag(etag, 0, 'dogs') == etag
+    assert responses.match_etag(responses.get_etag(0, 'dogs', issued_at=1), 0, 'dogs') is None
+    assert responses.match_etag(caches.ResponseCache(MemoryBackend()).get_etag(0, 'dogs'), 0, 'dogs') is None # other worker
+    assert responses.match_etag('*', 0, 'dogs') is None
@@ -0,0 +1,67 @@
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.core import tokens
+from app.main import app
+from app.storage import engines
+
+
+DOGS = [{'code': code, 'breed': breed, 'age': code % 3} for code, breed in enumerate(['collie', 'pug', 'husky', 'pug'])]
+
+
+@pytest.fixture
+def client():
+    # a fresh in-memory token database per test: no mongod needed
+    token = engines.MEMORY_TOKEN_PREFIX + tokens.generate(24)
+    return TestClient(app, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_insert_and_filter(client):
+    assert client.post('/dogs', json=DOGS).status_code == 201
+
+    page = client.get('/dogs', params={'breed': 'pug', '__sort': '-code', '__fields': 'code'}).json()
+
+    assert page['data'] == [{'code': 3}, {'code': 1}]
+    assert page['metadata']['totalCount'] == 2
+    assert client.get('/dogs', params={'breed__icontains': 'HUS'}).json()['data'][0]['code'] == 2
+    assert client.get('/dogs', params={'age__gte': '1'}).json()['metadata']['totalCount'] == 2
+
+
+def test_get_and_delete_by_id(client):
+    client.post('/dogs', json=DOGS)
+
+    assert client.get('/dogs/2').json()['breed'] == 'husky'
+    assert client.delete('/dogs/2').status_code == 204
+    assert client.get('/dogs/2').status_code == 404
+
+
+def test_primary_key(client):
+    client.post('/dogs', json=DOGS)
+
+    assert client.put('/@indexes/dogs/@primary-key', json={'key': 'code'}).json() == {'key': 'code', 'index': 'code_1'}
+    assert client.get('/dogs/3').json()['breed'] == 'pug'
+    assert client.put('/@indexes/dogs/@primary-key', json={'key': 'breed'}).status_code == 400 # duplicated pugs
+
+
+def test_bulk_write(client):
+    client.post('/dogs', json=DOGS)
+    client.patch('/@indexes/dogs', json={'keys': ['code'], 'unique': True})
+
+    bulk = {'ordered': False, 'operations': [
+        {'insert': {'code': 0}},
+        {'update': {'filter': {'code': 1}, 'inc': {'age': 1}}},
+        {'delete': {'filter': {'breed': 'pug'}, 'many': True}},
+    ]}
+
+    summary = client.post('/dogs/@bulk', json=bulk).json()
+
+    assert (summary['inserted'], summary['modified'], summary['deleted']) == (0, 1, 2)
+    assert [error['index'] for error in summary['errors']] == [0]
+
+
+def test_export(client):
+    client.post('/dogs', json=DOGS)
+    response = client.get('/dogs', headers={'Accept': 'application/x-ndjson'})
+
+    assert len(response.text.splitlines()) == len(DOGS)
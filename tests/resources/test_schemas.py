@@ -0,0 +1,60 @@
+import pytest
+
+from pydantic import ValidationError
+from pymongo import DeleteMany, InsertOne, UpdateOne
+
+from app.resources.schemas import BulkRequest, get_query
+
+
+def test_bulk_request():
+    bulk = BulkRequest.model_validate({
+        'operations': [
+            {'insert': {'code': 1}},
+            {'update': {'filter': {'code': 2}, 'set': {'breed': 'Dachshund'}, 'upsert': True}},
+            {'delete': {'filter': {'breed': 'husky'}, 'many': True}},
+        ]
+    })
+
+    assert bulk.requests() == [
+        InsertOne({'code': 1}),
+        UpdateOne({'code': 2}, {'$set': {'breed': 'Dachshund'}}, upsert=True),
+        DeleteMany({'breed': {'$eq': 'husky'}}),
+    ]
+
+
+def test_bulk_request_one_operation_each():
+    with pytest.raises(ValidationError):
+        BulkRequest.model_validate({'operations': [{'insert': {'code': 1}, 'delete': {}}]})
+
+    with pytest.raises(ValidationError):
+        BulkRequest.model_validate({'operations': [{'insert': None}]})
+
+
+def test_bulk_replace_rejects_operators():
+    with pytest.raises(ValidationError):
+        BulkRequest.model_validate({'operations': [{'replace': {'filter': {'code': 1}, 'document': {'$set': {'age': 1}}}}]})
+
+
+def test_bulk_update_requires_changes():
+    with pytest.raises(ValidationError):
+        BulkRequest.model_validate({'operations': [{'update': {'filter': {'code': 1}}}]})
+
+
+def test_get_query_guesses_strings_only():
+    assert get_query({'code': 1, 'age__gt': 3, 'name': 'rex'}) == {
+        'code': 1,
+        'age': {'$gt': 3},
+        'name': {'$eq': 'rex'},
+    }
+    assert get_query({'x': [1, 2], 'y__ne': [3], 'z__in': 4, 'w__exists': False}) == {
+        'x': {'$in': [1, 2]},
+        'y': {'$nin': [3]},
+        'z': {'$in': [4]},
+        'w': {'$exists': False},
+    }
+
+
+def test_bulk_filters_reject_operators():
+    for operation in ({'delete': {'filter': {'$where': 'true'}}}, {'update': {'filter': {'$or': []}, 'set': {'a': 1}}}, {'replace': {'filter': {'$expr': 1}, 'document': {}}}):
+        with pytest.raises(ValidationError):
+            BulkRequest.model_validate({'operations': [operation]})
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from app.storage.memory import MemoryClient
+
+
+def get_collection():
+    return MemoryClient()['token']['dogs']
+
+
+def test_insert_and_find():
+    async def run():
+        dogs = get_collection()
+        documents = [{'code': code, 'breed': breed} for code, breed in enumerate(['collie', 'pug', 'husky', 'pug'])]
+
+        await dogs.insert_many(documents)
+
+        assert all('_id' in document for document in documents)
+        assert await dogs.count_documents({'breed': 'pug'}) == 2
+        assert await dogs.count_documents({}, limit=3) == 3
+        assert await dogs.find({'breed': 'pug'}, {'_id': 0}).sort('code', -1).to_list(None) == [{'code': 3, 'breed': 'pug'}, {'code': 1, 'breed': 'pug'}]
+        assert await dogs.find({}, {'_id': 0, 'code': 1}).skip(1).to_list(2) == [{'code': 1}, {'code': 2}]
+        assert (await dogs.find_one({'code': 2}))['breed'] == 'husky'
+
+    asyncio.run(run())
+
+
+def test_unique_indexes():
+    async def run():
+        dogs = get_collection()
+        await dogs.insert_many([{'code': 1}, {'code': 2}])
+        await dogs.create_index([('code', 1)], unique=True)
+
+        with pytest.raises(DuplicateKeyError):
+            await dogs.insert_one({'code': 1})
+
+        with pytest.raises(DuplicateKeyError):
+            await dogs.update_one({'code': 2}, {'$set': {'code': 1}})
+
+        with pytest.raises(BulkWriteError) as error:
+            await dogs.insert_many([{'code': 3}, {'code': 1}, {'code': 4}], ordered=False)
+
+        assert error.value.details['nInserted'] == 2
+        assert [error['index'] for error in error.value.details['writeErrors']] == [1]
+        assert sorted(await dogs.index_information()) == ['_id_', 'code_1']
+
+        await dogs.insert_one({'breed': 'pug'}) # a missing key is null, and there's room for one null
+
+        with pytest.raises(OperationFailure):
+            await dogs.create_index('breed', unique=True, name='code_1')
+
+    asyncio.run(run())
+
+
+def test_indexes_narrow_lookups():
+    async def run():
+        dogs = get_collection()
+        await dogs.insert_many([{'code': code, 'tags': ['a', str(code)]} for code in range(100)])
+        await dogs.create_index([('code', 1)])
+
+        assert dogs.plan({'code': {'$in': ['5', 5]}}) is not None and len(dogs.plan({'code': 5})) == 1
+        assert dogs.plan({'$or': [{'code': 5}, {'code': 6}]}) is not None
+        assert dogs.plan({'$or': [{'code': 5}, {'tags': 'a'}]}) is None
+        assert await dogs.find({'code': {'$in': ['5', 5]}}, {'_id': 0}).to_list(None) == [{'code': 5, 'tags': ['a', '5']}]
+
+        await dogs.delete_many({'code': {'$lt': 50}})
+        assert await dogs.find_one({'code': 5}) is None
+        assert await dogs.estimated_document_count() == 50
+
+    asyncio.run(run())
+
+
+def test_updates_and_bulk_writes():
+    async def run():
+        dogs = get_collection()
+        await dogs.insert_one({'code': 1, 'age': 3})
+
+        before = await dogs.find_one_and_update({'code': 1}, {'$inc': {'age': 1}, '$set': {'owner.name': 'Ana'}})
+        assert before['age'] == 3
+
+        result = await dogs.bulk_write([
+            InsertOne({'code': 2}),
+            UpdateOne({'code': 1}, {'$unset': {'owner': ''}}),
+            UpdateOne({'code': 3}, {'$set': {'age': 1}}, upsert=True),
+            DeleteOne({'code': 2}),
+        ])
+
+        assert result.bulk_api_result['nInserted'] == 1
+        assert result.bulk_api_result['nModified'] == 1
+        assert result.bulk_api_result['upserted'][0]['index'] == 2
+        assert await dogs.find({}, {'_id': 0}).to_list(None) == [{'code': 1, 'age': 4}, {'code': 3, 'age': 1}]
+
+    asyncio.run(run())
+
+
+def test_cursors_survive_writes():
+    async def run():
+        dogs = get_collection()
+        await dogs.insert_many([{'code': code} for code in range(10)])
+
+        seen = []
+
+        async for document in dogs.find({}, batch_size=2):
+            seen.append(document['code'])
+            await dogs.delete_many({})
+
+        assert len(seen) == 10
+
+    asyncio.run(run())
+
+
+def test_replacement_upsert_keeps_the_filter_id():
+    async def run():
+        schemas = get_collection()
+        await schemas.replace_one({'_id': 'people', 'locale': 'en_US'}, {'schema': {}}, upsert=True)
+
+        assert await schemas.find_one({'_id': 'people'}) == {'_id': 'people', 'schema': {}}
+
+    asyncio.run(run())
+
+
+def test_reads_keep_nothing():
+    async def run():
+        client = MemoryClient()
+        early, later = client['token']['dogs'], client['token']['dogs']
+
+        assert await early.find_one({}) is None
+        assert await early.index_information() == {'_id_': {'v': 2, 'key': [('_id', 1)], 'unique': True}}
+        assert client.databases == {}
+
+        # handles taken before the first write share what it registered
+        await early.insert_one({'code': 1})
+        await later.insert_one({'code': 2})
+
+        assert await client['token']['dogs'].count_documents({}) == 2
+        assert await client.list_database_names() == ['token']
+
+    asyncio.run(run())
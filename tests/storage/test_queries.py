@@ -0,0 +1,53 @@
+import re
+
+from app.storage import queries
+
+
+DOG = {'_id': 1, 'code': 7, 'breed': 'Border Collie', 'tags': ['smart', 'fast'], 'owner': {'name': 'Ana'}, 'toys': [{'name': 'ball'}, {'name': 'rope'}]}
+
+
+def test_equalities():
+    assert queries.matches(DOG, {'code': 7})
+    assert queries.matches(DOG, {'code': 7.0})
+    assert not queries.matches(DOG, {'code': '7'})
+    assert queries.matches(DOG, {'tags': 'fast'})
+    assert queries.matches(DOG, {'owner.name': 'Ana'})
+    assert queries.matches(DOG, {'toys.name': 'rope'})
+    assert queries.matches(DOG, {'missing': None})
+    assert not queries.matches(DOG, {'code': {'$ne': 7}})
+
+
+def test_comparisons_dont_cross_types():
+    assert queries.matches(DOG, {'code': {'$gt': 5, '$lte': 7}})
+    assert not queries.matches(DOG, {'code': {'$gt': '5'}})
+    assert not queries.matches(DOG, {'breed': {'$lt': 5}})
+
+
+def test_operators():
+    assert queries.matches(DOG, {'code': {'$in': ['7', 7]}})
+    assert queries.matches(DOG, {'breed': {'$nin': ['Pug']}})
+    assert queries.matches(DOG, {'owner': {'$exists': True}, 'size': {'$exists': False}})
+    assert queries.matches(DOG, {'breed': {'$regex': re.compile('collie', re.IGNORECASE)}})
+    assert queries.matches(DOG, {'breed': {'$regex': '^border', '$options': 'i'}})
+    assert queries.matches(DOG, {'$or': [{'code': 1}, {'$and': [{'code': 7}, {'tags': 'smart'}]}]})
+    assert not queries.matches(DOG, {'$nor': [{'code': 7}]})
+
+
+def test_sort_by_type_then_value():
+    documents = [{'v': 'a'}, {'v': 2}, {}, {'v': 1.5}, {'v': None}]
+    assert [document.get('v') for document in queries.sort(documents, [('v', 1)])] == [None, None, 1.5, 2, 'a']
+
+    documents = [{'a': 1, 'b': 1}, {'a': 2, 'b': 1}, {'a': 1, 'b': 2}]
+    assert queries.sort(documents, [('b', -1), ('a', 1)]) == [{'a': 1, 'b': 2}, {'a': 1, 'b': 1}, {'a': 2, 'b': 1}]
+
+
+def test_projections():
+    assert queries.get_projector({'_id': 0, 'owner.name': 1, 'toys.name': 1})(DOG) == {'owner': {'name': 'Ana'}, 'toys': [{'name': 'ball'}, {'name': 'rope'}]}
+    assert queries.get_projector({'_id': 0, 'toys': 0, 'tags': 0, 'owner.name': 0})(DOG) == {'code': 7, 'breed': 'Border Collie', 'owner': {}}
+
+
+def test_projection_copies():
+    projected = queries.get_projector(None)(DOG)
+    projected['tags'].append('loyal')
+
+    assert DOG['tags'] == ['smart', 'fast']